@@ -0,0 +1,13 @@
+"""Benchmarks do bot, executados localmente sem conexão com o Discord.
+
+Os módulos do bot são importados de `src/` (como `utils.*` e `cogs.*`),
+do mesmo jeito que o `bot.py` faz ao ser executado.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
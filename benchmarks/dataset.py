@@ -0,0 +1,253 @@
+"""Geração de bancos sintéticos grandes para os benchmarks do banco de dados.
+
+Uso:
+    python -m benchmarks.dataset --preset large
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import time
+from typing import Iterator, Tuple
+
+from benchmarks import ROOT_DIR
+
+from utils.analytics import QuantileSketch
+from utils.database import INDEXES, Database
+
+DATASET_DIR = os.path.join(ROOT_DIR, "data", "benchmarks")
+
+# (servidores, tickets, linhas de ticket_logs)
+PRESETS = {
+    "small": (100, 20_000, 200_000),
+    "medium": (1_000, 200_000, 5_000_000),
+    "large": (10_000, 1_000_000, 50_000_000),
+}
+
+CATEGORIES = ("suporte", "compras", "denuncia", "parceria")
+URGENCIES = ("baixa", "média", "alta")
+USERS_PER_GUILD = 500
+STAFF_PER_GUILD = 10
+OPEN_FRACTION = 0.02
+DAY_MS = 86_400_000
+# Um ano de histórico terminando no momento da geração
+HISTORY_MS = 365 * DAY_MS
+CHUNK = 50_000
+
+GUILD_BASE = 100_000_000_000_000_000
+CHANNEL_BASE = 200_000_000_000_000_000
+USER_BASE = 300_000_000_000_000_000
+
+def guild_id(index: int) -> int:
+    return GUILD_BASE + index
+
+
+def user_id(guild_index: int, index: int) -> int:
+    return USER_BASE + guild_index * USERS_PER_GUILD + index
+
+
+def staff_id(guild_index: int, index: int) -> int:
+    return user_id(guild_index, USERS_PER_GUILD - STAFF_PER_GUILD + index)
+
+
+def dataset_path(guilds: int, tickets: int, logs: int) -> str:
+    return os.path.join(DATASET_DIR, f"dataset-{guilds}-{tickets}-{logs}.db")
+
+
+class DatasetGenerator:
+    """Preenche um banco com o esquema real do bot e dados sintéticos.
+    
+    Os tickets são distribuídos entre os servidores e ao longo de um ano;
+    os mais recentes ficam abertos. `ticket_logs` recebe, além das ações de
+    cada ticket, linhas `message` como as gravadas pelas versões antigas do
+    bot. Os índices são criados depois da carga, que é bem mais rápida assim.
+    """
+    
+    def __init__(self, path: str, guilds: int, tickets: int, logs: int, seed: int = 1):
+        self.path = path
+        self.guilds = guilds
+        self.tickets = tickets
+        self.logs = logs
+        self.random = random.Random(seed)
+        self.end_ms = int(time.time() * 1000)
+        self.start_ms = self.end_ms - HISTORY_MS
+    
+    def generate(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Gera em um arquivo temporário para nunca deixar um banco incompleto no caminho final
+        partial = self.path + ".partial"
+        for path in (partial, partial + "-wal", partial + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        
+        # O esquema vem do próprio bot, para não divergir
+        asyncio.run(Database(partial).init_db())
+        
+        connection = sqlite3.connect(partial)
+        try:
+            connection.execute("PRAGMA synchronous = OFF")
+            for statement in INDEXES:
+                connection.execute(f"DROP INDEX IF EXISTS {statement.split()[5]}")
+            
+            started = time.perf_counter()
+            self._insert(connection, "guild_config", 6, self._guild_configs())
+            self._insert(connection, "guild_categories", 8, self._guild_categories())
+            self._insert(connection, "panels", 6, self._panels())
+            self._insert(connection, "tickets", 13, self._tickets())
+            self._insert(connection, "ticket_logs", 6, self._ticket_logs())
+            self._insert(connection, "ticket_activity", 4, self._ticket_activity(connection))
+            self._insert(connection, "ticket_stats", 6, self._ticket_stats(connection))
+            self._insert(connection, "analytics_sketches", 5, self._sketches())
+            self._derive(connection)
+            
+            print("Criando índices...")
+            for statement in INDEXES:
+                connection.execute(statement)
+            connection.execute("ANALYZE")
+            connection.commit()
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            connection.close()
+        
+        os.replace(partial, self.path)
+        print(f"Banco gerado em {time.perf_counter() - started:.0f}s: {self.path}")
+    
+    def _insert(self, connection: sqlite3.Connection, table: str, columns: int, rows: Iterator[tuple]):
+        placeholders = ", ".join("?" * columns)
+        query = f"INSERT INTO {table} VALUES ({placeholders})"
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= CHUNK:
+                connection.executemany(query, batch)
+                total += len(batch)
+                batch.clear()
+        connection.executemany(query, batch)
+        total += len(batch)
+        connection.commit()
+        print(f"{table}: {total} linhas")
+    
+    def _guild_configs(self) -> Iterator[tuple]:
+        for index in range(self.guilds):
+            base = CHANNEL_BASE - (index + 1) * 10
+            yield (guild_id(index), base + 1, base + 2, base + 3, base + 4, None)
+    
+    def _guild_categories(self) -> Iterator[tuple]:
+        # Um em cada dez servidores personalizou as categorias
+        for index in range(0, self.guilds, 10):
+            for position, key in enumerate(CATEGORIES):
+                yield (guild_id(index), key, key.capitalize(), "📩", f"Categoria {key}", None, 60, position)
+    
+    def _panels(self) -> Iterator[tuple]:
+        for index in range(self.guilds):
+            base = CHANNEL_BASE - (index + 1) * 10
+            for offset, panel_type in enumerate(("simple", "categories")):
+                yield (None, guild_id(index), base + 5, base + 6 + offset, panel_type, self.start_ms)
+    
+    def ticket(self, number: int) -> Tuple[int, int]:
+        """(índice do servidor, data de criação) de um ticket"""
+        guild_index = self.random.randrange(self.guilds)
+        created_at = self.start_ms + number * HISTORY_MS // self.tickets
+        return guild_index, created_at
+    
+    def _tickets(self) -> Iterator[tuple]:
+        first_open = int(self.tickets * (1 - OPEN_FRACTION))
+        for number in range(self.tickets):
+            guild_index, created_at = self.ticket(number)
+            is_open = number >= first_open
+            claimed_by = staff_id(guild_index, self.random.randrange(STAFF_PER_GUILD))
+            if is_open and self.random.random() < 0.5:
+                claimed_by = None
+            closed_at = None if is_open else created_at + self.random.randrange(DAY_MS * 3)
+            yield (
+                number + 1, guild_id(guild_index), CHANNEL_BASE + number,
+                user_id(guild_index, self.random.randrange(USERS_PER_GUILD - STAFF_PER_GUILD)),
+                self.random.choice(CATEGORIES), "Motivo do ticket", "Descrição do ticket " * 4,
+                self.random.choice(URGENCIES), claimed_by, "open" if is_open else "closed",
+                created_at, closed_at, None if is_open else "Resolvido"
+            )
+    
+    def _ticket_logs(self) -> Iterator[tuple]:
+        per_ticket, extra = divmod(self.logs, self.tickets)
+        step = HISTORY_MS // self.tickets
+        log_id = 0
+        for number in range(self.tickets):
+            created_at = self.start_ms + number * step
+            count = per_ticket + (1 if number < extra else 0)
+            actions = ["created", "claimed", "closed"][:count]
+            actions += ["message"] * (count - len(actions))
+            for position, action in enumerate(actions):
+                log_id += 1
+                yield (log_id, number + 1, USER_BASE + number % USERS_PER_GUILD, action,
+                       None, created_at + position * 1000)
+    
+    def _ticket_activity(self, connection: sqlite3.Connection) -> Iterator[tuple]:
+        for ticket_id, channel_id, created_at in connection.execute(
+                "SELECT ticket_id, channel_id, created_at FROM tickets WHERE status = 'open'").fetchall():
+            yield (channel_id, ticket_id, created_at + 60_000, 0)
+    
+    def _ticket_stats(self, connection: sqlite3.Connection) -> Iterator[tuple]:
+        for ticket_id, guild, created_at in connection.execute(
+                "SELECT ticket_id, guild_id, created_at FROM tickets WHERE ticket_id % 2 = 0").fetchall():
+            yield (ticket_id, guild, 20, 1200, created_at + 300_000, created_at + 3_600_000)
+    
+    def _sketches(self) -> Iterator[tuple]:
+        sketch = QuantileSketch()
+        for _ in range(200):
+            sketch.add(self.random.expovariate(1 / 600))
+        data = sketch.to_json()
+        for index in range(self.guilds):
+            for metric in ("first_response", "resolution"):
+                yield (guild_id(index), metric, "guild", "all", data)
+                for category in CATEGORIES:
+                    yield (guild_id(index), metric, "category", category, data)
+    
+    def _derive(self, connection: sqlite3.Connection):
+        """Tabelas calculadas a partir dos tickets: contadores e agregados diários"""
+        connection.execute(
+            "INSERT INTO ticket_counters SELECT guild_id, COUNT(*) FROM tickets GROUP BY guild_id"
+        )
+        connection.execute(
+            """INSERT INTO daily_rollups (guild_id, day, category, urgency, staff_id, opened)
+               SELECT guild_id, date(created_at / 1000, 'unixepoch'), category, urgency, 0, COUNT(*)
+               FROM tickets GROUP BY 1, 2, 3, 4"""
+        )
+        connection.commit()
+
+
+def ensure_dataset(guilds: int, tickets: int, logs: int, seed: int = 1) -> str:
+    """Caminho de um banco com esses tamanhos, gerando-o se ainda não existir"""
+    path = dataset_path(guilds, tickets, logs)
+    if not os.path.exists(path):
+        print(f"Gerando banco sintético ({guilds} servidores, {tickets} tickets, {logs} logs)...")
+        DatasetGenerator(path, guilds, tickets, logs, seed).generate()
+    return path
+
+
+def add_size_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--preset", choices=PRESETS, default="small", help="Tamanho do banco sintético")
+    parser.add_argument("--guilds", type=int, help="Servidores (substitui o preset)")
+    parser.add_argument("--tickets", type=int, help="Tickets (substitui o preset)")
+    parser.add_argument("--logs", type=int, help="Linhas de ticket_logs (substitui o preset)")
+    parser.add_argument("--seed", type=int, default=1, help="Semente dos dados gerados")
+
+
+def sizes_from_args(args) -> Tuple[int, int, int]:
+    guilds, tickets, logs = PRESETS[args.preset]
+    return args.guilds or guilds, args.tickets or tickets, args.logs or logs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um banco sintético para os benchmarks")
+    add_size_arguments(parser)
+    parser.add_argument("--force", action="store_true", help="Gera novamente mesmo se o arquivo existir")
+    args = parser.parse_args()
+    
+    guilds, tickets, logs = sizes_from_args(args)
+    path = dataset_path(guilds, tickets, logs)
+    if args.force or not os.path.exists(path):
+        DatasetGenerator(path, guilds, tickets, logs, args.seed).generate()
+    else:
+        print(f"O banco já existe: {path} (use --force para gerar novamente)")
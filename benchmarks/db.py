@@ -0,0 +1,313 @@
+"""Benchmark de todos os métodos do `Database` sobre um banco sintético grande.
+
+Cada método é executado várias vezes com argumentos sorteados do banco. Todas
+as instruções SQL executadas são capturadas e analisadas com `EXPLAIN QUERY
+PLAN`: uma varredura completa de tabela (SCAN) faz o benchmark falhar.
+
+Uso:
+    python -m benchmarks.db --preset large --json resultados/db.json
+    python -m benchmarks.db --baseline resultados/db.json
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import aiosqlite
+
+from benchmarks.dataset import (CATEGORIES, DAY_MS, URGENCIES, add_size_arguments, ensure_dataset,
+                                sizes_from_args)
+from benchmarks.report import compare_with_baseline, print_table, summarize, write_json
+
+from utils.database import DB_BUSY_TIMEOUT, Database
+from utils.ticket_stats import PendingStats
+from utils.timeutils import ms_to_day, now_ms
+
+# Instruções que não consultam tabelas e não passam pelo EXPLAIN
+SKIPPED_STATEMENTS = ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "CREATE", "DROP", "ALTER", "ANALYZE")
+
+# Métodos que leem tabelas inteiras de propósito (carga do estado na inicialização).
+# Só a chamada sem `guild_id` pode varrer a tabela.
+FULL_SCAN_ALLOWED = {
+    ("get_analytics_sketches", "analytics_sketches"),
+    ("get_guild_configs", "guild_config"),
+}
+
+class _TracingConnection(sqlite3.Connection):
+    """Conexão que registra as instruções executadas em `statements`"""
+    
+    statements: List[str] = []
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_TracingConnection.statements.append)
+
+
+class TracingDatabase(Database):
+    """Database que registra todo o SQL executado pelos métodos"""
+    
+    def _connect(self) -> aiosqlite.Connection:
+        return aiosqlite.connect(self.db_path, timeout=DB_BUSY_TIMEOUT, factory=_TracingConnection)
+
+
+class Samples:
+    """IDs reais do banco sintético, sorteados como argumentos dos métodos"""
+    
+    def __init__(self, path: str, seed: int):
+        self.random = random.Random(seed)
+        connection = sqlite3.connect(path)
+        try:
+            self.guilds = [row[0] for row in connection.execute("SELECT guild_id FROM guild_config")]
+            self.tickets = connection.execute(
+                "SELECT ticket_id, guild_id, channel_id, user_id, status, created_at FROM tickets "
+                "ORDER BY random() LIMIT 5000"
+            ).fetchall()
+            self.open_tickets = [ticket for ticket in self.tickets if ticket[4] == "open"] or self.tickets
+            self.panels = [row[0] for row in connection.execute("SELECT message_id FROM panels LIMIT 5000")]
+            self.first_ms, self.last_ms = connection.execute(
+                "SELECT MIN(created_at), MAX(created_at) FROM tickets").fetchone()
+        finally:
+            connection.close()
+        self._next_id = 900_000_000_000_000_000
+    
+    def guild(self) -> int:
+        return self.random.choice(self.guilds)
+    
+    def ticket(self) -> tuple:
+        return self.random.choice(self.tickets)
+    
+    def open_ticket(self) -> tuple:
+        return self.random.choice(self.open_tickets)
+    
+    def new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+    
+    def time_range(self, days: int) -> Tuple[int, int]:
+        start = self.random.randrange(self.first_ms, max(self.last_ms - days * DAY_MS, self.first_ms + 1))
+        return start, start + days * DAY_MS
+    
+    def day_range(self, days: int) -> Tuple[str, str]:
+        start, end = self.time_range(days)
+        return ms_to_day(start), ms_to_day(end)
+
+
+def _pending_stats(samples: Samples) -> List[PendingStats]:
+    rows = []
+    for _ in range(20):
+        ticket = samples.open_ticket()
+        stats = PendingStats(ticket[0], ticket[1])
+        stats.messages = 3
+        stats.characters = 120
+        stats.last_message_at = now_ms()
+        stats.participants = {ticket[3]: [2, 80], samples.new_id(): [1, 40]}
+        rows.append(stats)
+    return rows
+
+
+# método -> (função que gera (args, kwargs), repetições)
+Case = Tuple[Callable[[Samples], Tuple[tuple, dict]], int]
+
+CASES: Dict[str, Case] = {
+    "init_db": (lambda s: ((), {}), 3),
+    "get_guild_config": (lambda s: ((s.guild(),), {}), 500),
+    "get_guild_configs": (lambda s: ((), {}), 3),
+    "set_guild_config": (lambda s: ((s.guild(),), {"staff_role_id": s.new_id()}), 200),
+    "get_guild_categories": (lambda s: ((s.guild(),), {}), 500),
+    "set_guild_category": (lambda s: ((s.guild(), "bench", "Bench", "🧪", "Categoria de teste"), {}), 200),
+    "delete_guild_category": (lambda s: ((s.guild(), "bench"), {}), 200),
+    "get_command_hash": (lambda s: (("global",), {}), 500),
+    "set_command_hash": (lambda s: (("global", f"{s.new_id():x}"), {}), 200),
+    "create_ticket": (lambda s: ((s.guild(), s.new_id(), s.new_id(), "suporte", "Motivo", "Descrição", "baixa"), {}), 200),
+    "next_ticket_number": (lambda s: ((s.guild(),), {}), 200),
+    "get_ticket_by_channel": (lambda s: ((s.ticket()[2],), {}), 500),
+    "get_user_open_tickets": (lambda s: ((s.ticket()[1], s.ticket()[3]), {}), 500),
+    "get_tickets_created_between": (lambda s: ((s.guild(), *s.time_range(30)), {"limit": 500}), 200),
+    "count_tickets_closed_between": (lambda s: ((s.guild(), *s.time_range(30)), {}), 200),
+    "claim_ticket": (lambda s: ((s.open_ticket()[2], s.new_id()), {}), 200),
+    "disclaim_ticket": (lambda s: ((s.open_ticket()[2],), {}), 200),
+    "close_ticket": (lambda s: ((s.ticket()[2], "Benchmark"), {}), 200),
+    "get_open_ticket_channels": (lambda s: ((), {}), 20),
+    "close_tickets": (lambda s: (([s.open_ticket()[2] for _ in range(20)], "Benchmark"), {}), 50),
+    "create_panel": (lambda s: ((s.guild(), s.new_id(), s.new_id(), "simple"), {}), 200),
+    "get_panel": (lambda s: ((s.random.choice(s.panels),), {}), 500),
+    "get_panels": (lambda s: (([s.guild() for _ in range(10)],), {}), 200),
+    "delete_panels": (lambda s: (([s.random.choice(s.panels) for _ in range(5)],), {}), 200),
+    "add_log": (lambda s: ((s.ticket()[0], s.new_id(), "claimed", "Benchmark"), {}), 200),
+    "has_log": (lambda s: ((s.ticket()[0], "claimed"), {}), 500),
+    "get_ticket_logs": (lambda s: ((s.ticket()[0],), {}), 200),
+    "enqueue_log": (lambda s: ((s.guild(), s.new_id(), '{"title":"Benchmark"}'), {}), 200),
+    "get_due_logs": (lambda s: ((now_ms(),), {}), 200),
+    "get_log_file": (lambda s: ((s.random.randint(1, 200),), {}), 500),
+    "reschedule_logs": (lambda s: ((s.new_id(), [s.random.randint(1, 200)], now_ms()), {}), 200),
+    "delete_logs": (lambda s: (([s.random.randint(1, 200)],), {}), 200),
+    "get_open_ticket_activity": (lambda s: ((s.guild(),), {}), 200),
+    "save_ticket_activity": (lambda s: (([(t[2], t[0], now_ms(), 0) for t in
+                                          (s.open_ticket() for _ in range(20))],), {}), 200),
+    "save_ticket_stats": (lambda s: ((_pending_stats(s),), {}), 200),
+    "get_ticket_stats": (lambda s: ((s.ticket()[0],), {}), 500),
+    "get_open_tickets_with_staff_response": (lambda s: ((s.guild(),), {}), 200),
+    "get_analytics_sketches": (lambda s: ((s.guild(),), {}), 500),
+    "save_analytics_sketches": (lambda s: (([(s.guild(), "first_response", "guild", "all", "{}")],), {}), 200),
+    "increment_rollup": (lambda s: ((s.guild(), ms_to_day(now_ms()), s.random.choice(CATEGORIES),
+                                     s.random.choice(URGENCIES)), {"opened": 1}), 200),
+    "get_rollup_report": (lambda s: ((s.guild(), *s.day_range(30)), {"group_by": "category"}), 200),
+    "rebuild_rollups": (lambda s: ((s.guild(),), {}), 10),
+}
+
+# Chamadas extras de métodos com variações importantes (ex.: sem filtro de servidor)
+EXTRA_CASES: Dict[str, Tuple[str, Case]] = {
+    "get_open_ticket_activity[all]": ("get_open_ticket_activity", (lambda s: ((), {}), 3)),
+    "get_open_tickets_with_staff_response[all]": ("get_open_tickets_with_staff_response", (lambda s: ((), {}), 3)),
+    "get_analytics_sketches[all]": ("get_analytics_sketches", (lambda s: ((), {}), 3)),
+    "get_rollup_report[staff]": ("get_rollup_report", (lambda s: ((s.guild(), *s.day_range(90)),
+                                                                   {"group_by": "staff"}), 200)),
+}
+
+def database_methods() -> Set[str]:
+    """Métodos assíncronos públicos do Database"""
+    return {
+        name for name, value in vars(Database).items()
+        if not name.startswith("_") and inspect.iscoroutinefunction(value)
+    }
+
+
+class PlanChecker:
+    """Analisa as instruções capturadas com EXPLAIN QUERY PLAN"""
+    
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.tables = {
+            row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        self._cache: Dict[str, List[str]] = {}
+    
+    def plan(self, statement: str) -> List[str]:
+        if statement not in self._cache:
+            rows = self.connection.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+            self._cache[statement] = [row[3] for row in rows]
+        return self._cache[statement]
+    
+    def full_scans(self, statement: str) -> List[str]:
+        """Tabelas lidas por inteiro (SCAN sem restrição de índice)"""
+        scans = []
+        for detail in self.plan(statement):
+            match = re.match(r"SCAN (\w+)", detail)
+            if match and match.group(1) in self.tables:
+                scans.append(match.group(1))
+        return scans
+    
+    def close(self):
+        self.connection.close()
+
+
+def _normalize(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def _is_query(statement: str) -> bool:
+    return not statement.lstrip().upper().startswith(SKIPPED_STATEMENTS)
+
+
+async def run_case(db: TracingDatabase, samples: Samples, method: str, case: Case,
+                   iterations: Optional[int]) -> Tuple[List[float], List[str]]:
+    build, default_iterations = case
+    function = getattr(db, method)
+    latencies = []
+    _TracingConnection.statements = statements = []
+    for _ in range(iterations or default_iterations):
+        args, kwargs = build(samples)
+        started = time.perf_counter()
+        await function(*args, **kwargs)
+        latencies.append(time.perf_counter() - started)
+    return latencies, statements
+
+
+async def main(args) -> int:
+    guilds, tickets, logs = sizes_from_args(args)
+    dataset = ensure_dataset(guilds, tickets, logs, args.seed)
+    
+    # Os métodos de escrita alteram o banco: cada execução usa uma cópia
+    directory = tempfile.mkdtemp(prefix="ticketbot-dbbench-")
+    path = os.path.join(directory, "tickets.db")
+    shutil.copyfile(dataset, path)
+    
+    failures = []
+    missing = database_methods() - set(CASES)
+    for method in sorted(missing):
+        failures.append(f"{method}: método sem caso de benchmark")
+    
+    cases = [(name, name, case) for name, case in CASES.items()]
+    cases += [(name, method, case) for name, (method, case) in EXTRA_CASES.items()]
+    if args.only:
+        cases = [entry for entry in cases if re.search(args.only, entry[0])]
+    
+    db = TracingDatabase(path)
+    samples = Samples(path, args.seed)
+    checker = PlanChecker(path)
+    results = {}
+    try:
+        for name, method, case in cases:
+            latencies, statements = await run_case(db, samples, method, case, args.iterations)
+            elapsed = sum(latencies)
+            
+            plans = {}
+            scans = set()
+            for statement in {_normalize(statement) for statement in statements if _is_query(statement)}:
+                template = re.sub(r"\b\d+\b|'[^']*'", "?", statement)
+                if template in plans:
+                    continue
+                plans[template] = checker.plan(statement)
+                scans.update(
+                    table for table in checker.full_scans(statement)
+                    if (method, table) not in FULL_SCAN_ALLOWED
+                )
+            
+            results[name] = summarize(latencies, elapsed)
+            results[name]["full_scans"] = sorted(scans)
+            results[name]["plans"] = plans
+            for table in sorted(scans):
+                failures.append(f"{name}: varredura completa da tabela {table}")
+    finally:
+        checker.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    print_table(f"Banco: {guilds} servidores, {tickets} tickets, {logs} logs", results)
+    
+    if args.json:
+        write_json(args.json, "db", {"guilds": guilds, "tickets": tickets, "logs": logs, "seed": args.seed},
+                   results)
+    if args.baseline:
+        failures += compare_with_baseline(args.baseline, results, args.tolerance)
+    
+    if failures:
+        print("\nFalhas:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nNenhuma varredura completa encontrada.")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos do banco de dados")
+    add_size_arguments(parser)
+    parser.add_argument("--iterations", type=int, help="Repetições por método (padrão: definido por método)")
+    parser.add_argument("--only", help="Expressão regular para escolher os métodos executados")
+    parser.add_argument("--json", help="Arquivo onde gravar os resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores (JSON) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Piora máxima aceita no p50 em relação à baseline (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
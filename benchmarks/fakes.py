@@ -0,0 +1,441 @@
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import discord
+
+_last_id = 0
+
+def new_id() -> int:
+    """Gera um snowflake crescente com a data atual (como os IDs do Discord)"""
+    global _last_id
+    _last_id = max(_last_id + 1, discord.utils.time_snowflake(discord.utils.utcnow()))
+    return _last_id
+
+
+def fill_text_input(text_input: discord.ui.TextInput, value: str):
+    """Preenche um campo de modal como se o usuário tivesse digitado"""
+    text_input._value = value
+
+
+def select_values(select: discord.ui.Select, values: List[str]):
+    """Define as opções escolhidas em um select"""
+    select._values = list(values)
+
+
+class RestSimulator:
+    """Simula a latência da API REST do Discord e respostas 429.
+    
+    Em um 429 o discord.py espera o `Retry-After` e repete a requisição, então
+    a simulação faz o mesmo: o limite aparece como latência extra da chamada.
+    """
+    
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, rate_limit_chance: float = 0.0,
+                 retry_after: float = 1.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_chance = rate_limit_chance
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+    
+    async def request(self, route: str):
+        self.calls[route] += 1
+        while True:
+            await asyncio.sleep(max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0))
+            if self.random.random() >= self.rate_limit_chance:
+                return
+            self.rate_limited[route] += 1
+            await asyncio.sleep(self.retry_after)
+
+
+class FakeGateway:
+    """Entrega ao bot os eventos que o Discord enviaria pelo gateway"""
+    
+    def __init__(self):
+        self.on_message: Optional[Callable[[discord.Message], Awaitable]] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    def dispatch_message(self, message: "FakeMessage"):
+        # O evento chega depois da resposta da API, como no gateway real
+        if self.on_message is None:
+            return
+        task = asyncio.get_running_loop().create_task(self.on_message(message))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def drain(self):
+        """Espera os eventos ainda não processados"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+
+class _FakeHTTPResponse:
+    def __init__(self, status: int, reason: str):
+        self.status = status
+        self.reason = reason
+
+
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeUser:
+    """Dados de usuário lidos pelos membros (equivalente a `discord.User`)"""
+    
+    def __init__(self, name: str, bot: bool = False):
+        self.id = new_id()
+        self.name = name
+        self.discriminator = "0"
+        self.global_name = None
+        self.bot = bot
+        self.avatar = None
+        self.display_avatar = FakeAsset(f"https://cdn.discordapp.com/embed/avatars/{self.id % 5}.png")
+    
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+class FakeRole:
+    def __init__(self, guild: "FakeGuild", name: str, role_id: Optional[int] = None):
+        self.id = role_id or new_id()
+        self.guild = guild
+        self.name = name
+    
+    @property
+    def mention(self) -> str:
+        return f"<@&{self.id}>"
+
+
+class FakeMember(discord.Member):
+    """Membro falso que passa nas verificações `isinstance(..., discord.Member)`"""
+    
+    def __init__(self, guild: "FakeGuild", user: FakeUser, roles: List[FakeRole] = (),
+                 administrator: bool = False):
+        self._user = user
+        self.guild = guild
+        self.nick = None
+        self._fake_roles = list(roles)
+        self._fake_permissions = discord.Permissions.all() if administrator else discord.Permissions.none()
+    
+    @property
+    def roles(self) -> List[FakeRole]:
+        return [self.guild.default_role] + self._fake_roles
+    
+    @property
+    def guild_permissions(self) -> discord.Permissions:
+        return self._fake_permissions
+    
+    @property
+    def display_avatar(self) -> FakeAsset:
+        return self._user.display_avatar
+    
+    def __repr__(self) -> str:
+        return f"<FakeMember id={self.id} name={self.name!r}>"
+
+
+class FakeAttachment:
+    def __init__(self, filename: str):
+        self.filename = filename
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeTextChannel", author: FakeMember, content: str = "",
+                 embeds: List[discord.Embed] = (), attachments: List[str] = (),
+                 view: Optional[discord.ui.View] = None):
+        self.id = new_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.embeds = list(embeds)
+        self.attachments = [FakeAttachment(filename) for filename in attachments]
+        self.view = view
+    
+    @property
+    def created_at(self) -> datetime:
+        return discord.utils.snowflake_time(self.id)
+    
+    @property
+    def components(self) -> list:
+        # Uma linha com os itens da view, no lugar das ActionRows vindas da API
+        return [FakeActionRow(self.view.children)] if self.view else []
+    
+    async def edit(self, *, content: Optional[str] = None, embed: Optional[discord.Embed] = None,
+                   view: Optional[discord.ui.View] = None):
+        await self.guild.rest.request("edit_message")
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+        if view is not None:
+            self.view = view
+        return self
+
+
+class FakeActionRow:
+    def __init__(self, children: list):
+        self.children = children
+
+
+class FakeCategoryChannel:
+    def __init__(self, guild: "FakeGuild", name: str):
+        self.id = new_id()
+        self.guild = guild
+        self.name = name
+
+
+class FakeTextChannel:
+    """Canal de texto que guarda as próprias mensagens em memória"""
+    
+    def __init__(self, guild: "FakeGuild", name: str, category: Optional[FakeCategoryChannel] = None,
+                 topic: Optional[str] = None):
+        self.id = new_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.topic = topic
+        self.messages: List[FakeMessage] = []
+        self._webhooks: List["FakeWebhook"] = []
+    
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+    
+    @property
+    def created_at(self) -> datetime:
+        return discord.utils.snowflake_time(self.id)
+    
+    def permissions_for(self, member) -> discord.Permissions:
+        return discord.Permissions.all()
+    
+    def receive(self, author: FakeMember, content: str = "", attachments: List[str] = ()) -> FakeMessage:
+        """Cria uma mensagem enviada por um usuário (sem chamada à API do bot)"""
+        message = FakeMessage(self, author, content, attachments=attachments)
+        self.messages.append(message)
+        return message
+    
+    async def send(self, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None,
+                   embeds: Optional[List[discord.Embed]] = None, file: Optional[discord.File] = None,
+                   view: Optional[discord.ui.View] = None) -> FakeMessage:
+        await self.guild.rest.request("send_message")
+        message = FakeMessage(
+            self, self.guild.me, content or "",
+            embeds=[embed] if embed else list(embeds or []),
+            attachments=[file.filename] if file else [],
+            view=view
+        )
+        self.messages.append(message)
+        self.guild.gateway.dispatch_message(message)
+        return message
+    
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self.guild.rest.request("fetch_message")
+        for message in self.messages:
+            if message.id == message_id:
+                return message
+        raise discord.NotFound(_FakeHTTPResponse(404, "Not Found"), "Unknown Message")
+    
+    async def history(self, limit: Optional[int] = 100, before=None, oldest_first: bool = False):
+        messages = self.messages
+        if before is not None:
+            messages = [message for message in messages if message.id < before.id]
+        if not oldest_first:
+            messages = list(reversed(messages))
+        if limit is not None:
+            messages = messages[:limit]
+        
+        # A API devolve no máximo 100 mensagens por requisição
+        for start in range(0, len(messages), 100):
+            await self.guild.rest.request("history")
+            for message in messages[start:start + 100]:
+                yield message
+    
+    async def edit(self, *, category: Optional[FakeCategoryChannel] = None, **kwargs):
+        await self.guild.rest.request("edit_channel")
+        if category is not None:
+            self.category = category
+    
+    async def set_permissions(self, target, **permissions):
+        await self.guild.rest.request("set_permissions")
+    
+    async def delete(self, reason: Optional[str] = None):
+        await self.guild.rest.request("delete_channel")
+        self.guild._channels.pop(self.id, None)
+
+    async def webhooks(self) -> List["FakeWebhook"]:
+        await self.guild.rest.request("channel_webhooks")
+        return list(self._webhooks)
+    
+    async def create_webhook(self, *, name: str, reason: Optional[str] = None) -> "FakeWebhook":
+        await self.guild.rest.request("create_webhook")
+        webhook = FakeWebhook(self, name)
+        self._webhooks.append(webhook)
+        return webhook
+
+
+class FakeWebhook:
+    """Webhook de um canal; as mensagens usam uma rota (limite de taxa) própria"""
+    
+    def __init__(self, channel: FakeTextChannel, name: str):
+        self.id = new_id()
+        self.channel = channel
+        self.name = name
+        self.token = f"token-{self.id}"
+        # Sem sessão no gateway a camada falsa não tem o usuário do bot
+        self.user = None
+    
+    async def send(self, content: Optional[str] = None, *, embeds: Optional[List[discord.Embed]] = None,
+                   file: Optional[discord.File] = None, username: Optional[str] = None,
+                   avatar_url: Optional[str] = None) -> None:
+        await self.channel.guild.rest.request("execute_webhook")
+        message = FakeMessage(
+            self.channel, self.channel.guild.me, content or "",
+            embeds=list(embeds or []),
+            attachments=[file.filename] if file else []
+        )
+        self.channel.messages.append(message)
+        self.channel.guild.gateway.dispatch_message(message)
+
+
+class FakeGuild:
+    def __init__(self, rest: RestSimulator, gateway: FakeGateway, name: str, shard_id: int = 0):
+        self.id = new_id()
+        self.name = name
+        self.rest = rest
+        self.gateway = gateway
+        self.shard_id = shard_id
+        self.unavailable = False
+        self._members: Dict[int, FakeMember] = {}
+        self._roles: Dict[int, FakeRole] = {}
+        self._channels: Dict[int, object] = {}
+        
+        self.default_role = FakeRole(self, "@everyone", role_id=self.id)
+        self._roles[self.default_role.id] = self.default_role
+        self.me = self.add_member("Ticket Bot", bot=True, administrator=True)
+        self.owner_id = self.me.id
+    
+    @property
+    def members(self) -> List[FakeMember]:
+        return list(self._members.values())
+    
+    @property
+    def channels(self) -> list:
+        return list(self._channels.values())
+    
+    def add_member(self, name: str, roles: List[FakeRole] = (), administrator: bool = False,
+                   bot: bool = False) -> FakeMember:
+        member = FakeMember(self, FakeUser(name, bot=bot), roles, administrator)
+        self._members[member.id] = member
+        return member
+    
+    def add_role(self, name: str) -> FakeRole:
+        role = FakeRole(self, name)
+        self._roles[role.id] = role
+        return role
+    
+    def add_category(self, name: str) -> FakeCategoryChannel:
+        category = FakeCategoryChannel(self, name)
+        self._channels[category.id] = category
+        return category
+    
+    def add_text_channel(self, name: str, category: Optional[FakeCategoryChannel] = None) -> FakeTextChannel:
+        channel = FakeTextChannel(self, name, category)
+        self._channels[channel.id] = channel
+        return channel
+    
+    def get_member(self, user_id: int) -> Optional[FakeMember]:
+        return self._members.get(user_id)
+    
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return self._roles.get(role_id)
+    
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+    
+    async def fetch_member(self, user_id: int) -> FakeMember:
+        await self.rest.request("fetch_member")
+        member = self._members.get(user_id)
+        if member is None:
+            raise discord.NotFound(_FakeHTTPResponse(404, "Not Found"), "Unknown Member")
+        return member
+    
+    async def create_text_channel(self, name: str, *, category: Optional[FakeCategoryChannel] = None,
+                                  overwrites: Optional[dict] = None, topic: Optional[str] = None) -> FakeTextChannel:
+        await self.rest.request("create_text_channel")
+        channel = self.add_text_channel(name, category)
+        channel.topic = topic
+        return channel
+
+
+class FakeFollowup:
+    def __init__(self, rest: RestSimulator):
+        self.rest = rest
+    
+    async def send(self, content: Optional[str] = None, **kwargs):
+        await self.rest.request("followup")
+
+
+class FakeInteractionResponse:
+    """Resposta de interação com as mesmas regras do discord.py (uma única resposta)"""
+    
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+        self.modal: Optional[discord.ui.Modal] = None
+    
+    def is_done(self) -> bool:
+        return self._done
+    
+    async def _respond(self, route: str):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        await self._interaction.guild.rest.request(route)
+        self._done = True
+    
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        await self._respond("interaction_response")
+    
+    async def send_modal(self, modal: discord.ui.Modal):
+        await self._respond("interaction_response")
+        self.modal = modal
+    
+    async def defer(self, **kwargs):
+        await self._respond("interaction_response")
+
+
+class FakeInteraction:
+    """Interação de slash command, botão, select ou modal"""
+    
+    def __init__(self, client, guild: FakeGuild, user: FakeMember, channel: FakeTextChannel,
+                 message: Optional[FakeMessage] = None,
+                 type: discord.InteractionType = discord.InteractionType.component):
+        self.id = new_id()
+        self.client = client
+        self.guild = guild
+        self.user = user
+        self.channel = channel
+        self.message = message
+        self.type = type
+        self.command = None
+        self.data: dict = {}
+        self.extras: dict = {}
+        self.created_at = discord.utils.snowflake_time(self.id)
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(guild.rest)
+    
+    @property
+    def guild_id(self) -> int:
+        return self.guild.id
+    
+    @property
+    def channel_id(self) -> int:
+        return self.channel.id
+    
+    async def edit_original_response(self, **kwargs):
+        await self.guild.rest.request("edit_original_response")
@@ -0,0 +1,219 @@
+"""Benchmark de memória do cache do gateway (bloco `cache` do config.json).
+
+Alimenta o ConnectionState real do discord.py, criado pelo TicketBot, com os
+eventos que o Discord enviaria para servidores sintéticos: GUILD_CREATE (com
+cargos e canais) e, quando `chunk_guilds_at_startup` está ativo, os
+GUILD_MEMBERS_CHUNK com todos os membros. Depois simula as buscas de membros
+feitas pelos tickets (que, sem o cache de membros, passam pelo LRU do
+MemberResolver) e mede a memória residente do processo.
+
+Cada perfil roda em um processo separado, já que o pico de RSS de um
+processo nunca diminui.
+
+Uso:
+    python -m benchmarks.gateway_cache --guilds 20 --members 5000
+"""
+import argparse
+import asyncio
+import gc
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+import discord
+from discord.state import ChunkRequest
+
+from benchmarks import ROOT_DIR
+from benchmarks.report import write_json
+
+from bot import TicketBot, peak_rss_mb
+from utils.config import CACHE_DEFAULTS
+
+CONFIG_PATH = os.path.join(ROOT_DIR, "config.json")
+
+# Perfil -> bloco "cache" usado na execução
+PROFILES: Dict[str, dict] = {
+    "all+chunk": {**CACHE_DEFAULTS, "members": "all", "chunk_guilds_at_startup": True},
+    "padrão": dict(CACHE_DEFAULTS),
+}
+
+# Membros por evento GUILD_MEMBERS_CHUNK (limite do Discord)
+CHUNK_SIZE = 1000
+
+def current_rss_mb() -> Optional[float]:
+    """Memória residente atual do processo em MB (None fora do Linux)"""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def member_payload(guild_id: int, index: int, role_ids) -> dict:
+    """Membro como enviado pelo gateway (determinístico para o mesmo índice)"""
+    user_id = guild_id * 1_000_000 + index + 1
+    payload = {
+        "user": {
+            "id": str(user_id),
+            "username": f"usuario{index}",
+            "global_name": f"Usuário {index}",
+            "discriminator": "0",
+            "avatar": hashlib.md5(str(user_id).encode()).hexdigest() if index % 3 else None,
+        },
+        "roles": [str(role_ids[index % len(role_ids)])] if index % 4 == 0 else [],
+        "joined_at": "2024-01-01T00:00:00.000000+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+    if index % 5 == 0:
+        payload["nick"] = f"apelido{index}"
+    return payload
+
+
+def guild_payload(guild_id: int, members: int, role_ids, channels: int) -> dict:
+    """GUILD_CREATE de um servidor grande: os membros só chegam pelo chunking"""
+    return {
+        "id": str(guild_id),
+        "name": f"Servidor {guild_id}",
+        "owner_id": str(guild_id * 1_000_000 + 1),
+        "member_count": members,
+        "large": members >= 250,
+        "roles": [
+            {"id": str(role_id), "name": f"cargo{position}", "permissions": "0", "position": position,
+             "color": 0, "hoist": False, "managed": False, "mentionable": False}
+            for position, role_id in enumerate([guild_id] + list(role_ids))
+        ],
+        "channels": [
+            {"id": str(guild_id * 1000 + index), "type": 0, "name": f"canal-{index}", "position": index,
+             "permission_overwrites": []}
+            for index in range(1, channels + 1)
+        ],
+        "members": [],
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+    }
+
+
+async def measure(profile: str, guilds: int, members: int, lookups: int) -> Dict[str, float]:
+    """Executa um perfil neste processo e retorna as medidas"""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    data["cache"] = PROFILES[profile]
+    directory = tempfile.mkdtemp(prefix="ticketbot-cache-")
+    config_path = os.path.join(directory, "config.json")
+    with open(config_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    
+    bot = TicketBot(config_path=config_path)
+    shutil.rmtree(directory, ignore_errors=True)
+    
+    gc.collect()
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    
+    state = bot._connection
+    state.loop = asyncio.get_running_loop()
+    
+    for number in range(1, guilds + 1):
+        guild_id = number * 10_000
+        role_ids = [guild_id + index for index in range(1, 11)]
+        guild = state._add_guild_from_data(guild_payload(guild_id, members, role_ids, channels=20))
+        
+        if state._guild_needs_chunking(guild):
+            # Mesmo caminho de state.chunk_guild, sem o pedido pelo websocket
+            request = ChunkRequest(guild_id, state.loop, state._get_guild, cache=state.member_cache_flags.joined)
+            state._chunk_requests[guild_id] = request
+            chunk_count = (members + CHUNK_SIZE - 1) // CHUNK_SIZE
+            for chunk_index in range(chunk_count):
+                state.parse_guild_members_chunk({
+                    "guild_id": str(guild_id),
+                    "members": [
+                        member_payload(guild_id, index, role_ids)
+                        for index in range(chunk_index * CHUNK_SIZE, min((chunk_index + 1) * CHUNK_SIZE, members))
+                    ],
+                    "chunk_index": chunk_index,
+                    "chunk_count": chunk_count,
+                    "nonce": request.nonce,
+                })
+        await asyncio.sleep(0)
+    
+    # Membros usados pelos tickets: sem o cache de membros, vêm de fetch_member e ficam no LRU
+    for lookup in range(lookups):
+        guild = bot.guilds[lookup % len(bot.guilds)]
+        index = (lookup * 7919) % members
+        role_ids = [guild.id + offset for offset in range(1, 11)]
+        user_id = guild.id * 1_000_000 + index + 1
+        if bot.members.get(guild, user_id) is None:
+            bot.members.update(discord.Member(data=member_payload(guild.id, index, role_ids), guild=guild, state=state))
+    
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    rss_after = current_rss_mb()
+    
+    return {
+        "guilds": len(bot.guilds),
+        "cached_members": sum(len(guild.members) for guild in bot.guilds),
+        "lru_members": len(bot.members),
+        "seconds": elapsed,
+        "rss_mb": rss_after or 0.0,
+        "rss_delta_mb": (rss_after - rss_before) if rss_after is not None and rss_before is not None else 0.0,
+        "peak_rss_mb": peak_rss_mb() or 0.0,
+    }
+
+
+def run_profile(profile: str, args) -> Dict[str, float]:
+    """Executa um perfil em um processo novo"""
+    command = [
+        sys.executable, "-m", "benchmarks.gateway_cache", "--child", profile,
+        "--guilds", str(args.guilds), "--members", str(args.members), "--lookups", str(args.lookups),
+    ]
+    output = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+    # A última linha é o resultado; as anteriores são as mensagens do bot
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args) -> int:
+    if args.child:
+        result = asyncio.run(measure(args.child, args.guilds, args.members, args.lookups))
+        print(json.dumps(result))
+        return 0
+    
+    results = {}
+    for profile in args.profiles:
+        results[profile] = run_profile(profile, args)
+    
+    print(f"\n{args.guilds} servidores x {args.members} membros, {args.lookups} buscas de membros")
+    print(f"{'perfil':<12} {'membros em cache':>17} {'LRU':>6} {'RSS MB':>8} {'+RSS MB':>8} {'pico MB':>8} {'tempo s':>8}")
+    for profile, result in results.items():
+        print(f"{profile:<12} {result['cached_members']:>17} {result['lru_members']:>6} {result['rss_mb']:>8.1f} "
+              f"{result['rss_delta_mb']:>8.1f} {result['peak_rss_mb']:>8.1f} {result['seconds']:>8.2f}")
+    
+    if args.json:
+        write_json(args.json, "gateway_cache", vars(args), results)
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de memória do cache do gateway")
+    parser.add_argument("--guilds", type=int, default=20, help="Servidores sintéticos")
+    parser.add_argument("--members", type=int, default=5000, help="Membros por servidor")
+    parser.add_argument("--lookups", type=int, default=2000,
+                        help="Buscas de membros feitas pelos tickets (autores, staff)")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES),
+                        help="Perfis do bloco cache a comparar")
+    parser.add_argument("--json", help="Arquivo onde gravar os resultados")
+    parser.add_argument("--child", choices=list(PROFILES), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
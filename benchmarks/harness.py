@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import List
+
+from benchmarks import ROOT_DIR
+from benchmarks.fakes import FakeGateway, FakeGuild, FakeMember, FakeRole, FakeTextChannel, RestSimulator
+
+from bot import TicketBot
+from utils.config import ConfigSnapshot
+
+CONFIG_PATH = os.path.join(ROOT_DIR, "config.json")
+
+class GuildFixture:
+    """Servidor falso já configurado como um servidor real do bot"""
+    
+    def __init__(self, guild: FakeGuild, users: List[FakeMember], staff: List[FakeMember],
+                 panel_channel: FakeTextChannel, log_channel: FakeTextChannel, staff_role: FakeRole):
+        self.guild = guild
+        self.users = users
+        self.staff = staff
+        self.panel_channel = panel_channel
+        self.log_channel = log_channel
+        self.staff_role = staff_role
+
+
+class Harness:
+    """Monta o TicketBot real sobre a camada falsa do Discord.
+    
+    Usa um banco SQLite temporário e o LogsCog real, recebendo pelo gateway
+    falso as mensagens que o bot envia. Nenhuma conexão com o Discord é feita.
+    """
+    
+    def __init__(self, rest: RestSimulator):
+        self.rest = rest
+        self.gateway = FakeGateway()
+        self.guilds: List[GuildFixture] = []
+        self._directory = tempfile.mkdtemp(prefix="ticketbot-bench-")
+    
+    async def start(self):
+        self.bot = TicketBot(config_path=CONFIG_PATH)
+        self.bot.db.db_path = os.path.join(self._directory, "tickets.db")
+        await self.bot.db.init_db()
+        # Canais dos servidores falsos (usado pela fila de logs)
+        self.bot.get_channel = self.get_channel
+        
+        await self.bot.load_extension("cogs.logs")
+        self.logs = self.bot.get_cog("LogsCog")
+        self.gateway.on_message = self.logs.on_message
+        # Trata os botões dos painéis (custom_id com a categoria)
+        await self.bot.load_extension("cogs.painel")
+        self.painel = self.bot.get_cog("PainelCog")
+        await self.bot.warm_up()
+        
+        self.bot.watchdog.start()
+    
+    async def add_guild(self, name: str, users: int, staff: int) -> GuildFixture:
+        """Cria um servidor com cargo de staff, canal de logs e categoria de tickets"""
+        guild = FakeGuild(self.rest, self.gateway, name)
+        staff_role = guild.add_role("Staff")
+        category = guild.add_category("Tickets")
+        log_channel = guild.add_text_channel("logs-tickets")
+        panel_channel = guild.add_text_channel("abrir-ticket")
+        
+        await self.bot.db.set_guild_config(
+            guild_id=guild.id,
+            staff_role_id=staff_role.id,
+            log_channel_id=log_channel.id,
+            open_category_id=category.id
+        )
+        self.bot.guild_configs.invalidate(guild.id)
+        
+        fixture = GuildFixture(
+            guild,
+            [guild.add_member(f"usuario{index}") for index in range(users)],
+            [guild.add_member(f"staff{index}", roles=[staff_role]) for index in range(staff)],
+            panel_channel,
+            log_channel,
+            staff_role
+        )
+        self.guilds.append(fixture)
+        return fixture
+    
+    def configure(self, **overrides):
+        """Troca o snapshot de configuração pelo config.json com os blocos informados substituídos"""
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        data.update(overrides)
+        self.bot.config_service.snapshot = ConfigSnapshot(data)
+    
+    def get_channel(self, channel_id: int):
+        for fixture in self.guilds:
+            channel = fixture.guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+    
+    async def stop(self):
+        # Entrega os logs que ainda estão na fila
+        await self.bot.log_outbox.flush()
+        await self.gateway.drain()
+        await self.bot.unload_extension("cogs.painel")
+        await self.bot.unload_extension("cogs.logs")
+        self.bot.watchdog.stop()
+        shutil.rmtree(self._directory, ignore_errors=True)
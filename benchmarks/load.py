@@ -0,0 +1,205 @@
+"""Teste de carga do ciclo de vida dos tickets sobre a camada falsa do Discord.
+
+Uso:
+    python -m benchmarks.load --guilds 10 --tickets 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import discord
+
+from benchmarks.fakes import FakeInteraction, RestSimulator, fill_text_input, select_values
+from benchmarks.harness import GuildFixture, Harness
+from benchmarks.report import print_table, summarize, write_json
+
+from cogs.painel import CategorySelectView, panel_button_id
+from utils.config import LOG_DELIVERY_MODES
+from utils.ticket_manager import CloseTicketModal, ConfirmDeleteView, TicketControlView
+from utils.traces import TRACES
+
+URGENCIES = ("baixa", "média", "alta")
+
+class LoadDriver:
+    """Executa ciclos completos de ticket com concorrência limitada.
+    
+    Cada ciclo abre o ticket pelo painel (botão ou select), preenche o modal,
+    troca mensagens entre usuário e staff, assume, libera, fecha e deleta o
+    ticket, medindo cada operação separadamente.
+    """
+    
+    def __init__(self, harness: Harness, tickets: int, concurrency: int, messages: int, seed: int):
+        self.harness = harness
+        self.bot = harness.bot
+        self.tickets = tickets
+        self.concurrency = concurrency
+        self.messages = messages
+        self.random = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+    
+    async def timed(self, operation: str, coroutine):
+        started = time.perf_counter()
+        try:
+            await coroutine
+        except Exception as e:
+            self.errors[operation] += 1
+            print(f"Erro em {operation}: {e!r}")
+            return
+        self.latencies[operation].append(time.perf_counter() - started)
+    
+    def _interaction(self, fixture: GuildFixture, user, channel, message=None,
+                     type: discord.InteractionType = discord.InteractionType.component) -> FakeInteraction:
+        return FakeInteraction(self.bot, fixture.guild, user, channel, message, type)
+    
+    async def open_ticket(self, fixture: GuildFixture, user):
+        """Abre um ticket pelo painel; devolve o canal e a mensagem com os botões"""
+        interaction = self._interaction(fixture, user, fixture.panel_channel)
+        if self.random.random() < 0.5:
+            interaction.data = {"custom_id": panel_button_id()}
+            await self.timed("panel_button", self.harness.painel.on_interaction(interaction))
+        else:
+            view = CategorySelectView(self.bot)
+            option = self.random.choice(view.category_select.options)
+            select_values(view.category_select, [option.value])
+            interaction.data = {"values": [option.value]}
+            await self.timed("category_select", view.select_callback(interaction))
+        
+        modal = interaction.response.modal
+        if modal is None:
+            return None, None
+        fill_text_input(modal.reason, "Não consigo acessar minha conta")
+        fill_text_input(modal.description, "Descrição gerada pelo teste de carga. " * 5)
+        fill_text_input(modal.urgency, self.random.choice(URGENCIES))
+        if not modal.selected_category:
+            fill_text_input(modal.category_field, "suporte")
+        
+        submit = self._interaction(fixture, user, fixture.panel_channel, type=discord.InteractionType.modal_submit)
+        await self.timed("ticket_create", modal.on_submit(submit))
+        
+        tickets = await self.bot.db.get_user_open_tickets(fixture.guild.id, user.id)
+        if not tickets:
+            return None, None
+        channel = fixture.guild.get_channel(tickets[0].channel_id)
+        control = next((message for message in channel.messages if message.view is not None), None)
+        return channel, control
+    
+    async def lifecycle(self, fixture: GuildFixture, user, staff):
+        channel, control = await self.open_ticket(fixture, user)
+        if channel is None:
+            return
+        
+        # Conversa entre usuário e staff
+        for index in range(self.messages):
+            author = user if index % 2 == 0 else staff
+            attachments = ["print.png"] if self.random.random() < 0.1 else []
+            message = channel.receive(author, f"mensagem {index} do ticket", attachments)
+            await self.timed("message", self.harness.logs.on_message(message))
+        
+        view = TicketControlView(self.bot, self.bot.db, self.bot.embed_builder, self.bot.permission_manager)
+        await self.timed("ticket_claim", view.claim_button.callback(
+            self._interaction(fixture, staff, channel, control)))
+        await self.timed("ticket_disclaim", view.disclaim_button.callback(
+            self._interaction(fixture, staff, channel, control)))
+        
+        modal = CloseTicketModal(self.bot, self.bot.db, self.bot.embed_builder, self.bot.permission_manager)
+        fill_text_input(modal.reason, "Resolvido")
+        await self.timed("ticket_close", modal.on_submit(
+            self._interaction(fixture, staff, channel, type=discord.InteractionType.modal_submit)))
+        
+        confirm = ConfirmDeleteView(self.bot, self.bot.db, self.bot.embed_builder, self.bot.permission_manager)
+        await self.timed("ticket_delete", confirm.confirm.callback(
+            self._interaction(fixture, staff, channel)))
+    
+    async def run(self) -> float:
+        """Executa todos os ciclos; devolve o tempo total em segundos"""
+        # Cada usuário tem no máximo um ticket aberto por vez (regra anti-spam)
+        free_users = {id(fixture): list(fixture.users) for fixture in self.harness.guilds}
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.tickets):
+            queue.put_nowait(self.random.choice(self.harness.guilds))
+        
+        async def worker():
+            while not queue.empty():
+                fixture = queue.get_nowait()
+                users = free_users[id(fixture)]
+                if not users:
+                    continue
+                user = users.pop(self.random.randrange(len(users)))
+                try:
+                    await self.lifecycle(fixture, user, self.random.choice(fixture.staff))
+                finally:
+                    users.append(user)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+
+
+async def main(args):
+    rest = RestSimulator(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        rate_limit_chance=args.rate_limit,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    harness = Harness(rest)
+    await harness.start()
+    harness.configure(logs={"delivery": args.log_delivery})
+    if args.record:
+        # Grava a carga sintética no mesmo formato dos traces de produção
+        TRACES.start(args.record)
+    try:
+        for index in range(args.guilds):
+            await harness.add_guild(f"Servidor {index}", users=args.users, staff=args.staff)
+        
+        driver = LoadDriver(harness, args.tickets, args.concurrency, args.messages, args.seed)
+        elapsed = await driver.run()
+    finally:
+        await TRACES.stop()
+        await harness.stop()
+    
+    results = {
+        operation: summarize(driver.latencies[operation], elapsed, driver.errors[operation])
+        for operation in sorted(set(driver.latencies) | set(driver.errors))
+    }
+    print_table(f"{args.tickets} tickets em {elapsed:.1f}s (concorrência {args.concurrency})", results)
+    print(f"\nChamadas REST: {sum(rest.calls.values())} • 429 simulados: {sum(rest.rate_limited.values())}")
+    print(f"Maior atraso do event loop: {harness.bot.watchdog.max_lag * 1000:.1f} ms")
+    
+    if args.json:
+        write_json(args.json, "load", vars(args), {
+            "elapsed_seconds": elapsed,
+            "operations": results,
+            "rest_calls": dict(rest.calls),
+            "rate_limited": dict(rest.rate_limited),
+            "max_loop_lag_ms": harness.bot.watchdog.max_lag * 1000,
+        })
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do bot de tickets sem conexão com o Discord")
+    parser.add_argument("--guilds", type=int, default=5, help="Servidores simulados")
+    parser.add_argument("--users", type=int, default=200, help="Usuários por servidor")
+    parser.add_argument("--staff", type=int, default=5, help="Membros da equipe por servidor")
+    parser.add_argument("--tickets", type=int, default=200, help="Ciclos de ticket executados")
+    parser.add_argument("--concurrency", type=int, default=20, help="Ciclos executados ao mesmo tempo")
+    parser.add_argument("--messages", type=int, default=10, help="Mensagens trocadas em cada ticket")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latência média da API REST")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Variação da latência da API REST")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Chance de uma chamada receber 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Espera após um 429, em segundos")
+    parser.add_argument("--seed", type=int, default=1, help="Semente dos números aleatórios")
+    parser.add_argument("--json", help="Arquivo onde gravar os resultados")
+    parser.add_argument("--record", help="Grava um trace da carga para benchmarks.replay")
+    parser.add_argument("--log-delivery", choices=LOG_DELIVERY_MODES, default="channel",
+                        help="Envio dos logs: pelo bot ou por webhook do canal de logs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
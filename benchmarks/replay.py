@@ -0,0 +1,319 @@
+"""Reprodução de traces gravados em produção sobre a camada falsa do Discord.
+
+Lê um ou mais arquivos gravados com `TRACE_PATH` (ou com `benchmarks.load
+--record`) e reproduz as interações e mensagens de tickets na mesma ordem e
+com os mesmos intervalos (ou acelerados), medindo a latência de cada handler.
+Gravando os resultados em JSON é possível comparar o perfil de latência de
+duas versões do bot com a mesma carga real.
+
+Uso:
+    python -m benchmarks.replay data/traces/trace.jsonl.gz --speed 10 --json resultados/replay.json
+    python -m benchmarks.replay data/traces/trace.jsonl.gz --speed 10 --baseline resultados/replay.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+from benchmarks.fakes import FakeInteraction, FakeMember, FakeTextChannel, RestSimulator, fill_text_input, select_values
+from benchmarks.harness import GuildFixture, Harness
+from benchmarks.report import compare_with_baseline, print_table, summarize, write_json
+
+from cogs.painel import CategorySelectView, panel_button_id
+from cogs.tickets import TicketModal
+from utils.ticket_manager import CloseTicketModal, ConfirmDeleteView, TicketControlView
+from utils.traces import read_trace
+
+URGENCIES = ("baixa", "média", "alta")
+
+# Handlers que abrem tickets: acontecem fora do canal do ticket, em sequência por usuário
+OPENING_HANDLERS = {
+    ("button", "panel_create_ticket"),
+    ("select", "panel_category_select"),
+    ("command", "ticket"),
+    ("modal", "ticket_create"),
+}
+# Handlers que exigem o cargo de staff; quem os usa na gravação vira staff na reprodução
+STAFF_HANDLERS = {
+    "ticket_claim", "ticket_disclaim", "ticket_close", "ticket_delete", "ticket_delete_confirm",
+    "ticket_delete_cancel",
+}
+# Tempo máximo de espera pela criação do canal de um ticket
+BIND_TIMEOUT = 10.0
+
+Key = Tuple[int, int, int]
+
+class Replayer:
+    """Reproduz os eventos de um trace, em paralelo entre canais e em ordem dentro de cada um.
+    
+    Os canais de ticket do trace são associados aos canais criados durante a
+    reprodução pelo dono do ticket, gravado nas mensagens (a primeira mensagem
+    de todo ticket é a de boas-vindas do bot).
+    """
+    
+    def __init__(self, harness: Harness, events: List[dict], speed: float, seed: int):
+        self.harness = harness
+        self.bot = harness.bot
+        self.events = events
+        self.speed = speed
+        self.random = random.Random(seed)
+        
+        self.staff = {
+            event["u"] for event in events
+            if event["e"] == "h" and event["n"] in STAFF_HANDLERS
+        }
+        self.guilds: Dict[Key, asyncio.Future] = {}
+        self.members: Dict[Tuple[Key, Key], FakeMember] = {}
+        self.channels: Dict[Key, FakeTextChannel] = {}
+        self.owned: Dict[Key, FakeTextChannel] = {}
+        self.modals: Dict[Key, TicketModal] = {}
+        self._created = asyncio.Condition()
+        
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.skipped: Counter = Counter()
+        self.max_behind = 0.0
+    
+    async def timed(self, operation: str, coroutine):
+        started = time.perf_counter()
+        try:
+            await coroutine
+        except Exception as e:
+            self.errors[operation] += 1
+            print(f"Erro em {operation}: {e!r}")
+            return
+        self.latencies[operation].append(time.perf_counter() - started)
+    
+    async def guild(self, key: Key) -> GuildFixture:
+        # Eventos simultâneos do mesmo servidor esperam a mesma criação
+        if key not in self.guilds:
+            self.guilds[key] = asyncio.ensure_future(self.harness.add_guild(f"Servidor {len(self.guilds)}", 0, 0))
+        return await self.guilds[key]
+    
+    def member(self, fixture: GuildFixture, guild_key: Key, user_key: Key) -> FakeMember:
+        member = self.members.get((guild_key, user_key))
+        if member is None:
+            roles = [fixture.staff_role] if user_key in self.staff else []
+            member = fixture.guild.add_member(f"usuario{len(self.members)}", roles=roles)
+            self.members[(guild_key, user_key)] = member
+        return member
+    
+    async def ticket_channel(self, event: dict) -> Optional[FakeTextChannel]:
+        """Canal criado na reprodução que corresponde ao canal do evento"""
+        channel = self.channels.get(event["c"])
+        if channel is not None:
+            return channel
+        
+        # O dono vem das mensagens; nos handlers, só o próprio dono pode ser associado
+        owner = event.get("o") or event["u"]
+        async with self._created:
+            try:
+                await asyncio.wait_for(self._created.wait_for(lambda: owner in self.owned), BIND_TIMEOUT)
+            except asyncio.TimeoutError:
+                return None
+            channel = self.channels[event["c"]] = self.owned.pop(owner)
+        return channel
+    
+    def _interaction(self, fixture: GuildFixture, member: FakeMember, channel, message=None,
+                     type: discord.InteractionType = discord.InteractionType.component) -> FakeInteraction:
+        return FakeInteraction(self.bot, fixture.guild, member, channel, message, type)
+    
+    async def handle(self, event: dict):
+        fixture = await self.guild(event["g"])
+        member = self.member(fixture, event["g"], event["u"])
+        
+        if event["e"] == "m":
+            channel = await self.ticket_channel(event)
+            if channel is None:
+                self.skipped["message (canal não encontrado)"] += 1
+            elif not event["b"]:
+                # As mensagens do bot são geradas pela própria reprodução
+                message = channel.receive(member, "x" * event["l"], [f"anexo{i}.png" for i in range(event["a"])])
+                await self.timed("message", self.harness.logs.on_message(message))
+            return
+        
+        kind, name = event["k"], event["n"]
+        operation = f"{kind}:{name}"
+        if (kind, name) in OPENING_HANDLERS:
+            await self.open_ticket(fixture, member, event, operation)
+            return
+        
+        channel = await self.ticket_channel(event)
+        if channel is None:
+            self.skipped[f"{operation} (canal não encontrado)"] += 1
+            return
+        
+        control = next((message for message in channel.messages if message.view is not None), None)
+        interaction = self._interaction(fixture, member, channel, control)
+        managers = (self.bot, self.bot.db, self.bot.embed_builder, self.bot.permission_manager)
+        if operation == "button:ticket_claim":
+            await self.timed(operation, TicketControlView(*managers).claim_button.callback(interaction))
+        elif operation == "button:ticket_disclaim":
+            await self.timed(operation, TicketControlView(*managers).disclaim_button.callback(interaction))
+        elif operation == "button:ticket_close":
+            await self.timed(operation, TicketControlView(*managers).close_button.callback(interaction))
+        elif operation == "button:ticket_delete":
+            await self.timed(operation, TicketControlView(*managers).delete_button.callback(interaction))
+        elif operation == "modal:ticket_close":
+            modal = CloseTicketModal(*managers)
+            fill_text_input(modal.reason, "Resolvido")
+            interaction.type = discord.InteractionType.modal_submit
+            await self.timed(operation, modal.on_submit(interaction))
+        elif operation == "button:ticket_delete_confirm":
+            await self.timed(operation, ConfirmDeleteView(*managers).confirm.callback(interaction))
+        elif operation == "button:ticket_delete_cancel":
+            await self.timed(operation, ConfirmDeleteView(*managers).cancel.callback(interaction))
+        else:
+            self.skipped[f"{operation} (não suportado)"] += 1
+    
+    async def open_ticket(self, fixture: GuildFixture, member: FakeMember, event: dict, operation: str):
+        user = event["u"]
+        interaction = self._interaction(fixture, member, fixture.panel_channel)
+        
+        if operation == "button:panel_create_ticket":
+            interaction.data = {"custom_id": panel_button_id()}
+            await self.timed(operation, self.harness.painel.on_interaction(interaction))
+        elif operation == "select:panel_category_select":
+            view = CategorySelectView(self.bot)
+            values = [option.value for option in view.category_select.options]
+            chosen = [value for value in event.get("v", []) if value in values] or values[:1]
+            select_values(view.category_select, chosen)
+            interaction.data = {"values": chosen}
+            await self.timed(operation, view.select_callback(interaction))
+        elif operation == "command:ticket":
+            interaction.type = discord.InteractionType.application_command
+            cog = self.bot.get_cog("TicketsCog")
+            await self.timed(operation, cog.ticket_command.callback(cog, interaction))
+        
+        modal = interaction.response.modal
+        if modal is not None:
+            self.modals[user] = modal
+            return
+        if operation != "modal:ticket_create":
+            return
+        
+        # Modal enviado: usa o aberto antes pelo mesmo usuário (ou um novo, sem categoria)
+        modal = self.modals.pop(user, None) or TicketModal(
+            self.bot, self.bot.db, self.bot.embed_builder, self.bot.permission_manager, self.bot.ticket_manager
+        )
+        fill_text_input(modal.reason, "Motivo reproduzido do trace")
+        fill_text_input(modal.description, "Descrição reproduzida do trace. " * 5)
+        fill_text_input(modal.urgency, self.random.choice(URGENCIES))
+        if not modal.selected_category:
+            fill_text_input(modal.category_field, next(iter(self.bot.config_service.snapshot.categories)))
+        
+        interaction.type = discord.InteractionType.modal_submit
+        await self.timed(operation, modal.on_submit(interaction))
+        
+        tickets = await self.bot.db.get_user_open_tickets(fixture.guild.id, member.id)
+        if tickets:
+            async with self._created:
+                self.owned[user] = fixture.guild.get_channel(tickets[0].channel_id)
+                self._created.notify_all()
+    
+    async def run(self) -> float:
+        """Reproduz todos os eventos; devolve o tempo total em segundos"""
+        # Cada canal (ou usuário, ao abrir tickets) é uma fila: um evento só
+        # começa depois do anterior da mesma fila
+        chains: Dict[tuple, asyncio.Task] = {}
+        
+        async def run_after(previous: Optional[asyncio.Task], event: dict):
+            if previous is not None:
+                await asyncio.wait([previous])
+            await self.handle(event)
+        
+        started = time.perf_counter()
+        for event in self.events:
+            if self.speed > 0:
+                due = started + event["t"] / 1000 / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_behind = max(self.max_behind, -delay)
+            
+            if event["e"] == "h" and (event["k"], event["n"]) in OPENING_HANDLERS:
+                key = ("u", event["u"])
+            else:
+                key = ("c", event["c"])
+            chains[key] = asyncio.create_task(run_after(chains.get(key), event))
+        
+        if chains:
+            await asyncio.wait(list(chains.values()))
+        return time.perf_counter() - started
+
+
+async def main(args) -> int:
+    events = []
+    for source, path in enumerate(args.traces):
+        events += read_trace(path, source)
+    events.sort(key=lambda event: event["t"])
+    if not events:
+        print("Nenhum evento encontrado nos traces.")
+        return 1
+    
+    rest = RestSimulator(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        rate_limit_chance=args.rate_limit,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    harness = Harness(rest)
+    await harness.start()
+    try:
+        await harness.bot.load_extension("cogs.tickets")
+        replayer = Replayer(harness, events, args.speed, args.seed)
+        elapsed = await replayer.run()
+    finally:
+        await harness.stop()
+    
+    results = {
+        operation: summarize(replayer.latencies[operation], elapsed, replayer.errors[operation])
+        for operation in sorted(set(replayer.latencies) | set(replayer.errors))
+    }
+    recorded = events[-1]["t"] / 1000
+    print_table(f"{len(events)} eventos ({recorded:.0f}s gravados) reproduzidos em {elapsed:.1f}s "
+                f"(velocidade {args.speed:g}x)", results)
+    print(f"\nServidores: {len(replayer.guilds)} • membros: {len(replayer.members)} • staff: {len(replayer.staff)}")
+    print(f"Maior atraso da reprodução em relação ao trace: {replayer.max_behind * 1000:.0f} ms")
+    print(f"Maior atraso do event loop: {harness.bot.watchdog.max_lag * 1000:.1f} ms")
+    for reason, count in sorted(replayer.skipped.items()):
+        print(f"Ignorados: {count} × {reason}")
+    
+    if args.json:
+        write_json(args.json, "replay", vars(args), results)
+    if args.baseline:
+        regressions = compare_with_baseline(args.baseline, results, args.tolerance)
+        if regressions:
+            print("\nFalhas:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduz traces gravados sobre a camada falsa do Discord")
+    parser.add_argument("traces", nargs="+", help="Arquivos de trace (.jsonl.gz), por exemplo um por processo")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Velocidade da reprodução (1 = tempo real, 10 = 10x; 0 = sem esperas)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latência média da API REST")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Variação da latência da API REST")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Chance de uma chamada receber 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Espera após um 429, em segundos")
+    parser.add_argument("--seed", type=int, default=1, help="Semente dos números aleatórios")
+    parser.add_argument("--json", help="Arquivo onde gravar os resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores (JSON) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Piora máxima aceita no p50 em relação à baseline (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,96 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, Iterable, List, Optional
+
+from benchmarks import ROOT_DIR
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo (lista já ordenada)"""
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(latencies: Iterable[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Vazão e latências (em ms) de uma operação"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "ops_per_sec": count / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": sum(values) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+
+def print_table(title: str, results: Dict[str, Dict[str, float]]):
+    """Imprime os resultados por operação em uma tabela"""
+    width = max([28] + [len(name) for name in results])
+    print(f"\n{title}")
+    print(f"{'operação':<{width}} {'n':>8} {'erros':>6} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<{width}} {result['count']:>8} {result['errors']:>6} {result['ops_per_sec']:>10.1f} "
+            f"{result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['max_ms']:>10.2f}"
+        )
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(path: str, suite: str, parameters: dict, results: dict):
+    """Grava os resultados com os metadados necessários para comparar versões"""
+    payload = {
+        "suite": suite,
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(payload, file, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {path}")
+
+
+def compare_with_baseline(path: str, results: Dict[str, Dict[str, float]], tolerance: float,
+                          metric: str = "p50_ms", min_difference_ms: float = 0.1) -> List[str]:
+    """Compara com resultados gravados antes; devolve as operações que pioraram.
+    
+    Diferenças menores que `min_difference_ms` são tratadas como ruído.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    
+    print(f"\nComparação com {path} (revisão {baseline.get('revision') or '?'}), {metric}:")
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if not previous or metric not in previous:
+            continue
+        
+        before, after = previous[metric], result[metric]
+        change = (after - before) / before if before else 0.0
+        print(f"  {name:<40} {before:>10.2f} -> {after:>10.2f} ({change:+.0%})")
+        if change > tolerance and after - before > min_difference_ms:
+            regressions.append(f"{name}: {metric} piorou {change:.0%} ({before:.2f} -> {after:.2f})")
+    return regressions
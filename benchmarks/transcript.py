@@ -0,0 +1,150 @@
+"""Benchmark da geração de transcrições com orçamento de tempo e memória.
+
+Gera canais sintéticos (com embeds e anexos) na camada falsa do Discord e
+mede, para cada tamanho, o tempo de `generate_transcript`, o pico de memória
+alocada durante a geração e o tamanho do arquivo. O benchmark falha se algum
+tamanho passar do orçamento.
+
+Uso:
+    python -m benchmarks.transcript --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import discord
+
+from benchmarks.fakes import FakeMember, FakeMessage, FakeTextChannel, RestSimulator
+from benchmarks.harness import Harness
+from benchmarks.report import compare_with_baseline, write_json
+
+# mensagens -> (segundos, MB de pico). O arquivo de 100 mil mensagens tem ~15 MB.
+BUDGETS: Dict[int, Tuple[float, float]] = {
+    1_000: (0.1, 1.0),
+    10_000: (1.0, 6.0),
+    100_000: (10.0, 48.0),
+}
+
+WORDS = ("olá", "preciso", "de", "ajuda", "com", "minha", "conta", "pedido", "pagamento", "obrigado",
+         "o", "acesso", "não", "funciona", "desde", "ontem", "segue", "print", "do", "erro")
+
+async def build_channel(harness: Harness, size: int, seed: int) -> FakeTextChannel:
+    """Canal de ticket com `size` mensagens entre usuário, staff e bot"""
+    fixture = harness.guilds[0]
+    generator = random.Random(seed)
+    channel = fixture.guild.add_text_channel(f"ticket-bench-{size}")
+    authors: List[FakeMember] = fixture.users + fixture.staff + [fixture.guild.me]
+    
+    for index in range(size):
+        if index % 1000 == 0:
+            # Não trava o event loop (nem dispara o watchdog) durante a montagem
+            await asyncio.sleep(0)
+        author = generator.choice(authors)
+        content = " ".join(generator.choices(WORDS, k=generator.randint(0, 40)))
+        embeds = [discord.Embed(title="Embed")] if generator.random() < 0.1 else []
+        attachments = [f"arquivo{generator.randrange(100)}.png"] if generator.random() < 0.1 else []
+        message = FakeMessage(channel, author, content, embeds=embeds, attachments=attachments)
+        channel.messages.append(message)
+        # Como no bot real, só as mensagens mais recentes ficam no cache do ticket
+        harness.bot.message_store.record(message, create=True)
+    return channel
+
+
+async def measure(harness: Harness, channel: FakeTextChannel, repeat: int) -> Dict[str, float]:
+    manager = harness.bot.ticket_manager
+    
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        transcript = await manager.generate_transcript(channel)
+        timings.append(time.perf_counter() - started)
+    size = len(transcript.getvalue())
+    del transcript
+    
+    # O tracemalloc deixa a execução mais lenta: o pico é medido em uma execução separada
+    tracemalloc.start()
+    try:
+        transcript = await manager.generate_transcript(channel)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del transcript
+    
+    timings.sort()
+    return {
+        "messages": len(channel.messages),
+        "best_seconds": timings[0],
+        "median_seconds": timings[len(timings) // 2],
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "peak_mb": peak / 1024 / 1024,
+        "output_mb": size / 1024 / 1024,
+    }
+
+
+async def main(args) -> int:
+    rest = RestSimulator(latency=args.latency_ms / 1000, jitter=0.0, seed=args.seed)
+    harness = Harness(rest)
+    await harness.start()
+    results = {}
+    try:
+        await harness.add_guild("Transcrições", users=20, staff=3)
+        for size in args.sizes:
+            channel = await build_channel(harness, size, args.seed)
+            results[str(size)] = await measure(harness, channel, args.repeat)
+            channel.messages.clear()
+            harness.bot.message_store.drop(channel.id)
+    finally:
+        await harness.stop()
+    
+    failures = []
+    print(f"\n{'mensagens':>10} {'mediana s':>10} {'melhor s':>10} {'pico MB':>10} {'arquivo MB':>11} {'orçamento':>16}")
+    for name, result in results.items():
+        budget = BUDGETS.get(int(name))
+        if args.budget_seconds is not None or args.budget_mb is not None:
+            budget = (args.budget_seconds or float("inf"), args.budget_mb or float("inf"))
+        
+        label = f"{budget[0]:g}s / {budget[1]:g}MB" if budget else "-"
+        print(f"{name:>10} {result['median_seconds']:>10.3f} {result['best_seconds']:>10.3f} "
+              f"{result['peak_mb']:>10.1f} {result['output_mb']:>11.1f} {label:>16}")
+        if budget and result["median_seconds"] > budget[0]:
+            failures.append(f"{name} mensagens: {result['median_seconds']:.2f}s (orçamento {budget[0]:g}s)")
+        if budget and result["peak_mb"] > budget[1]:
+            failures.append(f"{name} mensagens: pico de {result['peak_mb']:.1f}MB (orçamento {budget[1]:g}MB)")
+    
+    if args.json:
+        write_json(args.json, "transcript", vars(args), results)
+    if args.baseline:
+        failures += compare_with_baseline(args.baseline, results, args.tolerance)
+    
+    if failures:
+        print("\nFalhas:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nTodas as transcrições dentro do orçamento.")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da geração de transcrições")
+    parser.add_argument("--sizes", type=int, nargs="+", default=sorted(BUDGETS),
+                        help="Quantidades de mensagens dos canais gerados")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções cronometradas por tamanho")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Latência de cada página do histórico (100 mensagens)")
+    parser.add_argument("--budget-seconds", type=float, help="Orçamento de tempo (substitui o padrão)")
+    parser.add_argument("--budget-mb", type=float, help="Orçamento de memória (substitui o padrão)")
+    parser.add_argument("--seed", type=int, default=1, help="Semente das mensagens geradas")
+    parser.add_argument("--json", help="Arquivo onde gravar os resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores (JSON) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Piora máxima aceita no tempo em relação à baseline (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -1,8 +1,13 @@
 import discord
 from discord.ext import commands
 import os
-from dotenv import load_dotenv
+import sys
 import json
+import time
+import asyncio
+import hashlib
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -11,16 +16,39 @@ load_dotenv()
 from utils.database import Database
 from utils.embeds import EmbedBuilder
 from utils.permissions import PermissionManager
-from utils.ticket_manager import TicketManager
+from utils.ticket_manager import TicketManager, TicketControlView
+from utils.activity import ActivityTracker
+from utils.ticket_stats import TicketStatsCollector
+from utils.analytics import Analytics
+from utils.config import ConfigService, ConfigError
+from utils.categories import CategoryRegistry
+from utils.guild_configs import GuildConfigCache
+from utils.cluster import FileLock, shard_for_guild, wait_for_identify
+from utils.members import MemberResolver
+from utils.message_store import TicketMessageStore
+from utils.metrics import REGISTRY, InstrumentedCommandTree, observe_command, start_metrics_server
+from utils.watchdog import LoopWatchdog
+from utils.traces import TRACES
+from utils.log_outbox import LogOutbox
 
-# Carregar configurações
-with open("config.json", "r", encoding="utf-8") as f:
-    config = json.load(f)
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memória residente do processo em MB (None se indisponível)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
 
-class TicketBot(commands.Bot):
+class TicketBot(commands.AutoShardedBot):
     """Classe principal do bot"""
     
-    def __init__(self, guild_id: int):
+    def __init__(self, dev_guild_id: Optional[int] = None, shard_count: Optional[int] = None,
+                 config_path: str = "config.json", force_sync: bool = False,
+                 shard_ids: Optional[List[int]] = None, cluster_id: Optional[int] = None,
+                 metrics_port: Optional[int] = None, trace_path: Optional[str] = None):
         # Definir intents (permissões) do bot
         intents = discord.Intents.default()
         intents.guilds = True
@@ -28,27 +56,112 @@ class TicketBot(commands.Bot):
         intents.messages = True
         intents.message_content = True
         
-        super().__init__(command_prefix="!", intents=intents)
+        # Carregar configurações (recarregadas automaticamente quando o arquivo muda)
+        config_service = ConfigService(config_path)
+        cache = config_service.snapshot.cache
+        
+        # shard_count None usa o número de shards recomendado pelo Discord;
+        # shard_ids restringe este processo a uma faixa de shards (launcher.py).
+        # As opções de cache só são lidas aqui, na inicialização.
+        super().__init__(
+            command_prefix="!",
+            intents=intents,
+            shard_count=shard_count,
+            shard_ids=shard_ids,
+            member_cache_flags=config_service.snapshot.member_cache_flags(intents),
+            chunk_guilds_at_startup=cache["chunk_guilds_at_startup"],
+            max_messages=cache["max_messages"],
+            tree_cls=InstrumentedCommandTree
+        )
+        
+        self.cluster_id = cluster_id
+        self.metrics_port = metrics_port
+        self._metrics_runner = None
+        # Arquivo onde gravar o trace anonimizado das interações (opcional)
+        self.trace_path = trace_path
         
-        self.guild_id = guild_id
+        # Com um servidor de desenvolvimento os comandos são sincronizados só nele
+        self.dev_guild_id = dev_guild_id
+        self.force_sync = force_sync
+        
+        # Tempos das fases de inicialização (em segundos)
+        self.startup_timings: Dict[str, float] = {}
+        self._started_at = time.perf_counter()
+        
+        self.config_service = config_service
+        self.config_service.add_listener(self._apply_config)
+        self._config_watcher = None
         
         # Inicializar utilitários
         self.db = Database()
         self.embed_builder = EmbedBuilder(
-            bot_name=config.get("bot_name", "Ticket Bot"),
-            color=int(config.get("bot_color", "0x5865F2"), 16)
+            bot_name=self.config_service.snapshot.bot_name,
+            color=self.config_service.snapshot.color
         )
-        self.permission_manager = PermissionManager(self.db)
+        self.guild_configs = GuildConfigCache(self.db)
+        self.permission_manager = PermissionManager(self.db, self.guild_configs)
         self.ticket_manager = TicketManager(self, self.db, self.embed_builder, self.permission_manager)
+        self.log_outbox = LogOutbox(self, self.db)
+        self.activity_tracker = ActivityTracker(self.db)
+        self.ticket_stats = TicketStatsCollector(self.db)
+        self.analytics = Analytics(self.db)
+        self.category_registry = CategoryRegistry(self.db, self.config_service)
+        self.members = MemberResolver(cache["member_lru_size"])
+        self.message_store = TicketMessageStore(cache["ticket_messages"])
+        self.watchdog = LoopWatchdog()
+        self._register_gauges()
 
+    def _register_gauges(self):
+        """Métricas lidas do estado do bot no momento da coleta"""
+        REGISTRY.gauge("ticketbot_guilds", "Servidores atendidos por este processo").set_function(
+            lambda: len(self.guilds))
+        REGISTRY.gauge("ticketbot_open_tickets", "Tickets abertos acompanhados em memória").set_function(
+            lambda: len(self.activity_tracker))
+        REGISTRY.gauge("ticketbot_cached_ticket_channels", "Tickets com mensagens em cache").set_function(
+            lambda: len(self.message_store))
+        REGISTRY.gauge("ticketbot_cached_members", "Membros guardados pelo resolvedor").set_function(
+            lambda: len(self.members))
+        REGISTRY.gauge("ticketbot_gateway_latency_seconds", "Latência média do heartbeat do gateway").set_function(
+            lambda: self.latency if self.latency == self.latency else 0.0)
+        REGISTRY.gauge("ticketbot_loop_lag_max_seconds", "Maior atraso do event loop desde o início").set_function(
+            lambda: self.watchdog.max_lag)
+    
+    def _apply_config(self, snapshot):
+        """Aplica a aparência de um novo snapshot de configuração"""
+        self.embed_builder.bot_name = snapshot.bot_name
+        self.embed_builder.color = snapshot.color
+    
     async def setup_hook(self):
         """Função executada quando o bot está pronto para iniciar"""
         
         # Inicializar o banco de dados
-        await self.db.init_db()
+        phase_start = time.perf_counter()
+        async with FileLock("schema"):
+            await self.db.init_db()
+        self.startup_timings["db_init"] = time.perf_counter() - phase_start
         print("Banco de dados inicializado.")
         
+        # Observa alterações no config.json
+        self._config_watcher = asyncio.create_task(self.config_service.watch())
+        
+        # Mede o atraso do event loop e captura a pilha quando ele trava
+        self.watchdog.start()
+        
+        # Endpoint /metrics (apenas local)
+        if self.metrics_port:
+            try:
+                self._metrics_runner = await start_metrics_server(self.metrics_port)
+                print(f"Métricas disponíveis em http://127.0.0.1:{self.metrics_port}/metrics")
+            except OSError as e:
+                print(f"Erro ao iniciar o endpoint de métricas: {e}")
+        
+        # Gravação do trace das interações para o benchmark de replay
+        if self.trace_path:
+            TRACES.start(self.trace_path)
+            print(f"Gravando trace das interações em {self.trace_path}")
+        
         # Carregar cogs
+        phase_start = time.perf_counter()
         for filename in os.listdir("./src/cogs"):
             if filename.endswith(".py"):
                 try:
@@ -56,43 +169,229 @@ class TicketBot(commands.Bot):
                     print(f"Cog carregado: {filename}")
                 except Exception as e:
                     print(f"Erro ao carregar cog {filename}: {e}")
+        self.startup_timings["cogs"] = time.perf_counter() - phase_start
+        
+        # Registra as views e carrega os caches antes de conectar ao gateway
+        phase_start = time.perf_counter()
+        await self.warm_up()
+        self.prune_foreign_guilds()
+        self.startup_timings["warmup"] = time.perf_counter() - phase_start
+        
+        # Sincronizar comandos de barra (slash commands) apenas se mudaram; com
+        # vários processos, o primeiro sincroniza e os outros encontram o hash salvo
+        phase_start = time.perf_counter()
+        async with FileLock("command-sync"):
+            await self.sync_commands()
+        self.startup_timings["sync"] = time.perf_counter() - phase_start
+    
+    async def warm_up(self):
+        """Aquecimento feito uma única vez na inicialização.
+        
+        Registra as views persistentes (em on_ready elas seriam registradas
+        de novo a cada reconexão ao gateway) e carrega de uma vez, em
+        paralelo, as configurações dos servidores (com o cargo de staff), a
+        atividade e as respostas dos tickets abertos e os sketches de métricas.
+        O setup_hook termina antes da conexão ao gateway, então nenhuma
+        interação chega antes do fim do aquecimento.
+        """
+        self.add_view(TicketControlView(self, self.db, self.embed_builder, self.permission_manager))
+        if self.get_cog("PainelCog") is not None:
+            from cogs.painel import CategorySelectView
+            self.add_view(CategorySelectView(self))
+        
+        components = {
+            "configurações": self.guild_configs,
+            "atividade dos tickets": self.activity_tracker,
+            "estatísticas dos tickets": self.ticket_stats,
+            "métricas": self.analytics,
+        }
+        results = await asyncio.gather(
+            *(component.load() for component in components.values()),
+            return_exceptions=True
+        )
+        for name, result in zip(components, results):
+            if isinstance(result, Exception):
+                print(f"Erro ao carregar {name}: {result}")
+        
+        print(f"Cache aquecido: {len(self.guild_configs)} servidor(es) configurado(s), "
+              f"{len(self.activity_tracker)} ticket(s) aberto(s).")
+    
+    def command_tree_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> str:
+        """Hash estável dos comandos que seriam enviados ao Discord (globais ou de um servidor)"""
+        payload = sorted(
+            (command.to_dict() for command in self.tree.get_commands(guild=guild)),
+            key=lambda command: (command.get("type", 1), command["name"])
+        )
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    async def sync_commands(self):
+        """Sincroniza a árvore de comandos se ela mudou desde a última sincronização"""
+        guild = None
+        scope = "global"
+        if self.dev_guild_id:
+            guild = discord.Object(id=self.dev_guild_id)
+            self.tree.copy_global_to(guild=guild)
+            scope = f"guild:{self.dev_guild_id}"
         
-        # Sincronizar comandos de barra (slash commands)
-        guild = discord.Object(id=self.guild_id)
-        self.tree.copy_global_to(guild=guild)
-        await self.tree.sync(guild=guild)
-        print("Comandos de barra sincronizados.")
+        tree_hash = self.command_tree_hash(guild)
+        
+        if not self.force_sync and await self.db.get_command_hash(scope) == tree_hash:
+            print("Comandos de barra inalterados, sincronização ignorada.")
+            return
+        
+        try:
+            await self.tree.sync(guild=guild)
+        except discord.HTTPException as e:
+            # O hash não é salvo, então a próxima inicialização tenta de novo
+            print(f"Erro ao sincronizar comandos de barra: {e}")
+            return
+        
+        await self.db.set_command_hash(scope, tree_hash)
+        print(f"Comandos de barra sincronizados ({scope}).")
+    
+    def owns_guild(self, guild_id: int) -> bool:
+        """Indica se o servidor pertence a um dos shards deste processo"""
+        if self.shard_ids is None:
+            return True
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+    
+    def prune_foreign_guilds(self):
+        """Descarta o estado carregado de servidores atendidos por outros processos"""
+        if self.shard_ids is None:
+            return
+        
+        for component in (self.guild_configs, self.activity_tracker, self.ticket_stats, self.analytics):
+            for guild_id in component.guild_ids():
+                if not self.owns_guild(guild_id):
+                    component.evict_guild(guild_id)
+    
+    async def before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False):
+        """Espaça as conexões ao gateway entre todos os processos do cluster"""
+        if self.cluster_id is None:
+            await super().before_identify_hook(shard_id, initial=initial)
+            return
+        
+        await wait_for_identify()
+    
+    async def load_guild_state(self, guild_id: int):
+        """Carrega em memória o estado de um servidor (ao entrar nele)"""
+        await self.activity_tracker.load(guild_id)
+        await self.ticket_stats.load(guild_id)
+        await self.analytics.load(guild_id)
+        self.guild_configs.invalidate(guild_id)
+        self.category_registry.invalidate(guild_id)
+    
+    async def evict_guild_state(self, guild_id: int):
+        """Persiste e descarta da memória o estado de um servidor (ao sair dele)"""
+        for component in (self.activity_tracker, self.ticket_stats, self.analytics):
+            try:
+                await component.flush()
+            except Exception as e:
+                print(f"Erro ao salvar estado antes de sair do servidor {guild_id}: {e}")
+        
+        self.activity_tracker.evict_guild(guild_id)
+        self.ticket_stats.evict_guild(guild_id)
+        self.analytics.evict_guild(guild_id)
+        self.guild_configs.evict_guild(guild_id)
+        self.category_registry.invalidate(guild_id)
+        self.members.evict_guild(guild_id)
+        self.message_store.evict_guild(guild_id)
+    
+    async def on_guild_join(self, guild: discord.Guild):
+        """Evento executado quando o bot é adicionado a um servidor"""
+        try:
+            await self.load_guild_state(guild.id)
+        except Exception as e:
+            print(f"Erro ao carregar o servidor {guild.id}: {e}")
+        print(f"Adicionado ao servidor {guild.name} ({guild.id}), shard {guild.shard_id}.")
+    
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Evento executado quando o bot é removido de um servidor"""
+        await self.evict_guild_state(guild.id)
+        print(f"Removido do servidor {guild.name} ({guild.id}).")
 
+    async def close(self):
+        """Encerra as tarefas de fundo antes de desconectar"""
+        if self._config_watcher:
+            self._config_watcher.cancel()
+        self.watchdog.stop()
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+        await TRACES.stop()
+        await super().close()
+    
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Acompanha se cada interação é respondida dentro do prazo"""
+        self.watchdog.track_interaction(interaction)
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Registra a duração de slash commands concluídos"""
+        observe_command(interaction, command)
+    
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Mantém atualizados os membros guardados pelo resolvedor"""
+        self.members.refresh(after)
+    
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        """Esquece membros que saíram do servidor"""
+        self.members.forget(payload.guild_id, payload.user.id)
+    
     async def on_ready(self):
         """Evento executado quando o bot está online e pronto"""
         print("-" * 30)
         print(f"Bot conectado como {self.user}")
         print(f"ID do Bot: {self.user.id}")
-        print(f"Servidor alvo: {self.guild_id}")
+        if self.cluster_id is not None:
+            print(f"Cluster {self.cluster_id}: shards {self.shard_ids} de {self.shard_count}")
+        print(f"Servidores: {len(self.guilds)} em {self.shard_count} shard(s)")
         print(f"Versão do discord.py: {discord.__version__}")
+        
+        # on_ready pode ser disparado de novo após reconexões
+        if "gateway_ready" not in self.startup_timings:
+            self.startup_timings["gateway_ready"] = time.perf_counter() - self._started_at
+            print("Tempos de inicialização: " + ", ".join(
+                f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_timings.items()
+            ))
+            
+            rss = peak_rss_mb()
+            if rss is not None:
+                print(f"Memória (pico de RSS): {rss:.1f} MB")
         print("-" * 30)
         
         # Define a presença do bot
         await self.change_presence(
             activity=discord.Activity(
                 type=discord.ActivityType.watching,
-                name=f"o servidor com {self.user.name}"
+                name=f"{len(self.guilds)} servidores com {self.user.name}"
             )
         )
 
 if __name__ == "__main__":
-    # Obter token e ID do servidor do .env
+    # Obter token do .env; GUILD_ID (servidor de desenvolvimento) e SHARD_COUNT são opcionais
     DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
     GUILD_ID = os.getenv("GUILD_ID")
+    SHARD_COUNT = os.getenv("SHARD_COUNT")
+    METRICS_PORT = os.getenv("METRICS_PORT")
+    TRACE_PATH = os.getenv("TRACE_PATH")
     
-    if not DISCORD_TOKEN or not GUILD_ID:
-        print("Erro: DISCORD_TOKEN e GUILD_ID devem ser definidos no arquivo .env")
+    if not DISCORD_TOKEN:
+        print("Erro: DISCORD_TOKEN deve ser definido no arquivo .env")
     else:
         try:
             # Criar e executar o bot
-            bot = TicketBot(guild_id=int(GUILD_ID))
+            force_sync = "--force-sync" in sys.argv or os.getenv("FORCE_SYNC", "").lower() in ("1", "true")
+            bot = TicketBot(
+                dev_guild_id=int(GUILD_ID) if GUILD_ID else None,
+                shard_count=int(SHARD_COUNT) if SHARD_COUNT else None,
+                force_sync=force_sync,
+                metrics_port=int(METRICS_PORT) if METRICS_PORT else None,
+                trace_path=TRACE_PATH or None
+            )
             bot.run(DISCORD_TOKEN)
+        except ConfigError as e:
+            print(f"Erro no config.json: {e}")
         except ValueError:
-            print("Erro: GUILD_ID deve ser um número inteiro.")
+            print("Erro: GUILD_ID, SHARD_COUNT e METRICS_PORT devem ser números inteiros.")
         except Exception as e:
             print(f"Ocorreu um erro ao iniciar o bot: {e}")
@@ -1,7 +1,14 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional
+import io
+import time
+from typing import List, Optional
+
+from utils.categories import DEFAULT_CATEGORY_EMOJI, normalize_category_key, parse_category_emoji
+from utils.config import MAX_SELECT_OPTIONS
+from utils.profiling import Profiler
+from utils.watchdog import ACK_WINDOW
 
 class AdminCog(commands.Cog):
     """Cog para comandos administrativos e configuração"""
@@ -11,10 +18,12 @@ class AdminCog(commands.Cog):
         self.db = bot.db
         self.embed_builder = bot.embed_builder
         self.permission_manager = bot.permission_manager
+        self.profiler = Profiler()
     
     config_group = app_commands.Group(
         name="config",
-        description="Comandos de configuração do sistema de tickets"
+        description="Comandos de configuração do sistema de tickets",
+        guild_only=True
     )
     
     @config_group.command(name="staff", description="Define o cargo de staff")
@@ -37,6 +46,7 @@ class AdminCog(commands.Cog):
             guild_id=interaction.guild.id,
             staff_role_id=cargo.id
         )
+        self.bot.guild_configs.invalidate(interaction.guild.id)
         
         await interaction.response.send_message(
             embed=self.embed_builder.create_success_embed(
@@ -81,6 +91,7 @@ class AdminCog(commands.Cog):
             guild_id=interaction.guild.id,
             log_channel_id=canal.id
         )
+        self.bot.guild_configs.invalidate(interaction.guild.id)
         
         await interaction.response.send_message(
             embed=self.embed_builder.create_success_embed(
@@ -125,6 +136,7 @@ class AdminCog(commands.Cog):
             guild_id=interaction.guild.id,
             open_category_id=categoria.id
         )
+        self.bot.guild_configs.invalidate(interaction.guild.id)
         
         await interaction.response.send_message(
             embed=self.embed_builder.create_success_embed(
@@ -153,6 +165,7 @@ class AdminCog(commands.Cog):
             guild_id=interaction.guild.id,
             closed_category_id=categoria.id
         )
+        self.bot.guild_configs.invalidate(interaction.guild.id)
         
         await interaction.response.send_message(
             embed=self.embed_builder.create_success_embed(
@@ -176,7 +189,7 @@ class AdminCog(commands.Cog):
             )
             return
         
-        config = await self.db.get_guild_config(interaction.guild.id)
+        config = await self.bot.guild_configs.get(interaction.guild.id)
         
         embed = discord.Embed(
             title="⚙️ Configurações do Sistema de Tickets",
@@ -187,7 +200,7 @@ class AdminCog(commands.Cog):
         
         if config:
             # Cargo de staff
-            staff_role = interaction.guild.get_role(config.get("staff_role_id")) if config.get("staff_role_id") else None
+            staff_role = interaction.guild.get_role(config.staff_role_id) if config.staff_role_id else None
             embed.add_field(
                 name="👥 Cargo de Staff",
                 value=staff_role.mention if staff_role else "❌ Não configurado",
@@ -195,7 +208,7 @@ class AdminCog(commands.Cog):
             )
             
             # Canal de logs
-            log_channel = interaction.guild.get_channel(config.get("log_channel_id")) if config.get("log_channel_id") else None
+            log_channel = interaction.guild.get_channel(config.log_channel_id) if config.log_channel_id else None
             embed.add_field(
                 name="📋 Canal de Logs",
                 value=log_channel.mention if log_channel else "❌ Não configurado",
@@ -203,7 +216,7 @@ class AdminCog(commands.Cog):
             )
             
             # Categoria de tickets abertos
-            open_category = interaction.guild.get_channel(config.get("open_category_id")) if config.get("open_category_id") else None
+            open_category = interaction.guild.get_channel(config.open_category_id) if config.open_category_id else None
             embed.add_field(
                 name="📂 Categoria - Tickets Abertos",
                 value=f"**{open_category.name}**" if open_category else "❌ Não configurado",
@@ -211,7 +224,7 @@ class AdminCog(commands.Cog):
             )
             
             # Categoria de tickets fechados
-            closed_category = interaction.guild.get_channel(config.get("closed_category_id")) if config.get("closed_category_id") else None
+            closed_category = interaction.guild.get_channel(config.closed_category_id) if config.closed_category_id else None
             embed.add_field(
                 name="🔒 Categoria - Tickets Fechados",
                 value=f"**{closed_category.name}**" if closed_category else "❌ Não configurado",
@@ -224,7 +237,380 @@ class AdminCog(commands.Cog):
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    categorias_group = app_commands.Group(
+        name="categorias",
+        description="Gerencia as categorias de ticket deste servidor",
+        guild_only=True
+    )
+    
+    async def _require_admin(self, interaction: discord.Interaction) -> bool:
+        """Responde com erro se o usuário não for administrador"""
+        if interaction.user.guild_permissions.administrator:
+            return True
+        
+        await interaction.response.send_message(
+            embed=self.embed_builder.create_error_embed(
+                "Sem Permissão",
+                "Apenas administradores podem usar este comando."
+            ),
+            ephemeral=True
+        )
+        return False
+    
+    @categorias_group.command(name="adicionar", description="Adiciona ou atualiza uma categoria de ticket")
+    @app_commands.describe(
+        chave="Identificador da categoria (ex: suporte)",
+        nome="Nome exibido no painel",
+        emoji="Emoji da categoria (opcional)",
+        descricao="Descrição exibida no menu (opcional)",
+        categoria_discord="Categoria do Discord onde esses tickets serão criados (opcional)",
+        sla_minutos="Tempo de resposta esperado em minutos (opcional)"
+    )
+    async def categorias_adicionar(
+        self,
+        interaction: discord.Interaction,
+        chave: str,
+        nome: str,
+        emoji: Optional[str] = None,
+        descricao: Optional[str] = None,
+        categoria_discord: Optional[discord.CategoryChannel] = None,
+        sla_minutos: Optional[app_commands.Range[int, 1, 10080]] = None
+    ):
+        """Cria ou atualiza uma categoria do servidor"""
+        
+        if not await self._require_admin(interaction):
+            return
+        
+        key = normalize_category_key(chave)
+        
+        # Um emoji inválido faz o Discord recusar o select inteiro (e o painel) do servidor
+        if emoji:
+            parsed_emoji = parse_category_emoji(emoji)
+            if parsed_emoji is None:
+                await interaction.response.send_message(
+                    embed=self.embed_builder.create_error_embed(
+                        "Emoji Inválido",
+                        "Use um emoji padrão (ex: 🎫) ou um emoji personalizado do servidor."
+                    ),
+                    ephemeral=True
+                )
+                return
+            emoji = parsed_emoji
+        
+        current = await self.db.get_guild_categories(interaction.guild.id)
+        
+        if len(current) >= MAX_SELECT_OPTIONS and key not in {row["category_key"] for row in current}:
+            await interaction.response.send_message(
+                embed=self.embed_builder.create_error_embed(
+                    "Limite Atingido",
+                    f"Cada servidor pode ter no máximo {MAX_SELECT_OPTIONS} categorias."
+                ),
+                ephemeral=True
+            )
+            return
+        
+        await self.db.set_guild_category(
+            guild_id=interaction.guild.id,
+            category_key=key,
+            name=nome[:100],
+            emoji=emoji,
+            description=(descricao or "")[:100],
+            target_category_id=categoria_discord.id if categoria_discord else None,
+            sla_minutes=sla_minutos
+        )
+        self.bot.category_registry.invalidate(interaction.guild.id)
+        
+        details = [f"**Chave:** `{key}`", f"**Nome:** {emoji or DEFAULT_CATEGORY_EMOJI} {nome}"]
+        if categoria_discord:
+            details.append(f"**Criados em:** {categoria_discord.name}")
+        if sla_minutos:
+            details.append(f"**SLA:** {sla_minutos} minutos")
+        
+        await interaction.response.send_message(
+            embed=self.embed_builder.create_success_embed(
+                "Categoria Salva",
+                "\n".join(details)
+            ),
+            ephemeral=True
+        )
+    
+    @categorias_group.command(name="remover", description="Remove uma categoria de ticket")
+    @app_commands.describe(chave="Identificador da categoria")
+    async def categorias_remover(self, interaction: discord.Interaction, chave: str):
+        """Remove uma categoria do servidor"""
+        
+        if not await self._require_admin(interaction):
+            return
+        
+        key = normalize_category_key(chave)
+        removed = await self.db.delete_guild_category(interaction.guild.id, key)
+        self.bot.category_registry.invalidate(interaction.guild.id)
+        
+        if removed:
+            embed = self.embed_builder.create_success_embed(
+                "Categoria Removida",
+                f"A categoria `{key}` foi removida."
+            )
+        else:
+            embed = self.embed_builder.create_error_embed(
+                "Categoria Não Encontrada",
+                f"A categoria `{key}` não está cadastrada neste servidor."
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @categorias_remover.autocomplete("chave")
+    async def categorias_autocomplete(self, interaction: discord.Interaction,
+                                      current: str) -> List[app_commands.Choice[str]]:
+        """Sugere as categorias cadastradas no servidor"""
+        categories = await self.bot.category_registry.get(interaction.guild.id)
+        current = current.lower()
+        return [
+            app_commands.Choice(name=f"{info.emoji} {info.name}", value=key)
+            for key, info in categories.categories.items()
+            if current in key.lower() or current in info.name.lower()
+        ][:25]
+    
+    @categorias_group.command(name="listar", description="Lista as categorias de ticket do servidor")
+    async def categorias_listar(self, interaction: discord.Interaction):
+        """Lista as categorias em uso no servidor"""
+        
+        if not await self._require_admin(interaction):
+            return
+        
+        categories = await self.bot.category_registry.get(interaction.guild.id)
+        
+        embed = discord.Embed(
+            title="📂 Categorias de Ticket",
+            description=(
+                "Usando as categorias padrão do `config.json`. Use `/categorias adicionar` "
+                "ou `/categorias importar` para personalizar."
+                if categories.from_config else
+                "Categorias personalizadas deste servidor."
+            ),
+            color=self.embed_builder.color,
+            timestamp=discord.utils.utcnow()
+        )
+        
+        for key, info in categories.categories.items():
+            lines = [f"`{key}` • {info.description or 'Sem descrição'}"]
+            if info.target_category_id:
+                target = interaction.guild.get_channel(info.target_category_id)
+                lines.append(f"**Criados em:** {target.name if target else 'categoria removida'}")
+            if info.sla_minutes:
+                lines.append(f"**SLA:** {info.sla_minutes} minutos")
+            
+            embed.add_field(name=f"{info.emoji} {info.name}", value="\n".join(lines), inline=False)
+        
+        embed.set_footer(text=f"{self.embed_builder.bot_name} • Configuration")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @categorias_group.command(name="importar", description="Copia as categorias padrão do config.json para este servidor")
+    async def categorias_importar(self, interaction: discord.Interaction):
+        """Importa as categorias do config.json como categorias do servidor"""
+        
+        if not await self._require_admin(interaction):
+            return
+        
+        snapshot = self.bot.config_service.snapshot
+        for position, info in enumerate(snapshot.categories.values()):
+            await self.db.set_guild_category(
+                guild_id=interaction.guild.id,
+                category_key=info.key,
+                name=info.name,
+                emoji=info.emoji,
+                description=info.description[:100],
+                position=position
+            )
+        self.bot.category_registry.invalidate(interaction.guild.id)
+        
+        await interaction.response.send_message(
+            embed=self.embed_builder.create_success_embed(
+                "Categorias Importadas",
+                f"{len(snapshot.categories)} categoria(s) copiadas do `config.json`.\n"
+                f"Agora você pode editá-las com `/categorias adicionar`."
+            ),
+            ephemeral=True
+        )
+    
+    debug_group = app_commands.Group(
+        name="debug",
+        description="Diagnóstico de desempenho do bot",
+        guild_only=True
+    )
+    
+    @debug_group.command(name="loop", description="Mostra o atraso do event loop e os últimos travamentos")
+    async def debug_loop(self, interaction: discord.Interaction):
+        """Mostra as medições do watchdog do event loop"""
+        
+        if not await self._require_admin(interaction):
+            return
+        
+        watchdog = self.bot.watchdog
+        snapshots = watchdog.recent_snapshots()
+        
+        embed = discord.Embed(
+            title="🩺 Event Loop",
+            color=self.embed_builder.color,
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Atraso atual", value=f"{watchdog.last_lag * 1000:.1f} ms", inline=True)
+        embed.add_field(name="Maior atraso", value=f"{watchdog.max_lag * 1000:.1f} ms", inline=True)
+        embed.add_field(name="Latência do gateway", value=f"{self.bot.latency * 1000:.0f} ms", inline=True)
+        embed.add_field(
+            name="Travamentos",
+            value=f"{watchdog.stalls} acima de {watchdog.stall_threshold * 1000:.0f} ms",
+            inline=True
+        )
+        
+        late = "\n".join(
+            f"`{kind}`: {count}" for kind, count in sorted(watchdog.late_interactions.items())
+        )
+        embed.add_field(
+            name=f"Interações sem resposta em {ACK_WINDOW:.0f}s",
+            value=late or "Nenhuma",
+            inline=True
+        )
+        
+        if snapshots:
+            last = snapshots[-1]
+            duration = last.duration if last.duration is not None else last.blocked_for
+            embed.add_field(
+                name="Último travamento",
+                value=f"<t:{int(last.captured_at)}:R> • {duration * 1000:.0f} ms",
+                inline=False
+            )
+        
+        embed.set_footer(text=f"{self.embed_builder.bot_name} • Debug")
+        
+        if not snapshots:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        # As pilhas completas vão em anexo (não cabem no embed)
+        report = io.StringIO()
+        for snapshot in reversed(snapshots):
+            duration = snapshot.duration if snapshot.duration is not None else snapshot.blocked_for
+            captured = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.captured_at))
+            report.write(f"=== {captured} • bloqueado por {duration * 1000:.0f} ms ===\n")
+            report.write(snapshot.stack)
+            report.write("\n")
+        
+        await interaction.response.send_message(
+            embed=embed,
+            file=discord.File(io.BytesIO(report.getvalue().encode("utf-8")), filename="travamentos.txt"),
+            ephemeral=True
+        )
+    
+    @debug_group.command(name="profile", description="Amostra o uso de CPU do bot por alguns segundos")
+    @app_commands.describe(segundos="Duração da amostragem (1 a 60 segundos)")
+    async def debug_profile(self, interaction: discord.Interaction,
+                            segundos: app_commands.Range[int, 1, 60] = 10):
+        """Executa o profiler por amostragem e anexa o resumo"""
+        
+        if not await self._require_admin(interaction) or not await self._require_profiler_idle(interaction):
+            return
+        
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        profile = await self.profiler.profile_cpu(segundos)
+        
+        top = profile.top_functions(15)
+        summary = io.StringIO()
+        summary.write(f"{profile.samples} amostras em {profile.duration:.1f}s\n")
+        summary.write(f"Pilhas completas (collapsed, para flamegraph): {profile.path}\n\n")
+        summary.write(f"{'própria':>8} {'total':>8}  função\n")
+        for function, own, total in top:
+            summary.write(f"{own / profile.samples:>8.1%} {total / profile.samples:>8.1%}  {function}\n")
+        
+        embed = discord.Embed(
+            title="🔥 Perfil de CPU",
+            description=(
+                f"{profile.samples} amostras em {profile.duration:.1f}s.\n"
+                f"Pilhas salvas em `{profile.path}`."
+            ),
+            color=self.embed_builder.color,
+            timestamp=discord.utils.utcnow()
+        )
+        if top:
+            embed.add_field(
+                name="Funções mais frequentes",
+                value="\n".join(
+                    f"`{own / profile.samples:.1%}` {function[:80]}" for function, own, _ in top[:5]
+                ),
+                inline=False
+            )
+        else:
+            embed.add_field(name="Funções mais frequentes", value="O bot ficou ocioso durante a amostragem.", inline=False)
+        embed.set_footer(text=f"{self.embed_builder.bot_name} • Debug")
+        
+        await interaction.followup.send(
+            embed=embed,
+            file=discord.File(io.BytesIO(summary.getvalue().encode("utf-8")), filename="cpu.txt"),
+            ephemeral=True
+        )
+    
+    @debug_group.command(name="memory", description="Mostra onde o bot mais alocou memória em alguns segundos")
+    @app_commands.describe(segundos="Intervalo entre os dois snapshots (1 a 120 segundos)")
+    async def debug_memory(self, interaction: discord.Interaction,
+                           segundos: app_commands.Range[int, 1, 120] = 30):
+        """Compara dois snapshots do tracemalloc e anexa os maiores alocadores"""
+        
+        if not await self._require_admin(interaction) or not await self._require_profiler_idle(interaction):
+            return
+        
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        diff = await self.profiler.profile_memory(segundos)
+        
+        summary = io.StringIO()
+        summary.write(f"Intervalo de {diff.duration:.1f}s • memória rastreada {diff.current / 1024:.0f} KiB ")
+        summary.write(f"(pico {diff.peak / 1024:.0f} KiB)\n")
+        summary.write(f"Diferença completa: {diff.path}\n\n")
+        for stat in diff.stats:
+            summary.write(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocos  {stat.traceback}\n")
+        
+        embed = discord.Embed(
+            title="🧠 Alocações de Memória",
+            description=(
+                f"Memória alocada durante {diff.duration:.1f}s e ainda em uso: "
+                f"{diff.current / 1024:.0f} KiB (pico {diff.peak / 1024:.0f} KiB).\n"
+                f"Relatório salvo em `{diff.path}`."
+            ),
+            color=self.embed_builder.color,
+            timestamp=discord.utils.utcnow()
+        )
+        if diff.stats:
+            embed.add_field(
+                name="Maiores alocadores",
+                value="\n".join(
+                    f"`{stat.size_diff / 1024:+.1f} KiB` {str(stat.traceback)[:80]}" for stat in diff.stats[:5]
+                ),
+                inline=False
+            )
+        embed.set_footer(text=f"{self.embed_builder.bot_name} • Debug")
+        
+        await interaction.followup.send(
+            embed=embed,
+            file=discord.File(io.BytesIO(summary.getvalue().encode("utf-8")), filename="memoria.txt"),
+            ephemeral=True
+        )
+    
+    async def _require_profiler_idle(self, interaction: discord.Interaction) -> bool:
+        """Responde com erro se já houver um perfil em andamento"""
+        if not self.profiler.busy:
+            return True
+        
+        await interaction.response.send_message(
+            embed=self.embed_builder.create_error_embed(
+                "Perfil em Andamento",
+                "Aguarde o perfil atual terminar antes de iniciar outro."
+            ),
+            ephemeral=True
+        )
+        return False
+    
     @app_commands.command(name="setup", description="Configuração rápida inicial do bot")
+    @app_commands.guild_only()
     async def setup_wizard(self, interaction: discord.Interaction):
         """Wizard de configuração inicial"""
         
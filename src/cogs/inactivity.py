@@ -0,0 +1,109 @@
+import discord
+from discord.ext import commands, tasks
+from typing import Optional
+
+from utils.timeutils import HOUR_MS
+
+class InactivityCog(commands.Cog):
+    """Cog que avisa e fecha automaticamente tickets inativos"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = bot.db
+        self.embed_builder = bot.embed_builder
+        self.tracker = bot.activity_tracker
+    
+    async def cog_load(self):
+        """Inicia as tarefas (a atividade dos tickets abertos é carregada no aquecimento do bot)"""
+        settings = self.bot.config_service.snapshot.inactivity
+        self.sweeper.change_interval(minutes=settings.get("check_interval_minutes") or 5)
+        
+        self.flusher.start()
+        self.sweeper.start()
+    
+    async def cog_unload(self):
+        """Para as tarefas e persiste a atividade pendente"""
+        self.sweeper.cancel()
+        self.flusher.cancel()
+        await self.tracker.flush()
+    
+    def _threshold(self, category: str, key: str) -> Optional[int]:
+        """Obtém o limite de inatividade (em ms) de uma categoria"""
+        return self.bot.config_service.snapshot.inactivity_threshold(category, key)
+    
+    def _warn_after(self, category: str) -> Optional[int]:
+        """Limite para avisar; usa o limite de fechamento se não houver aviso"""
+        return self._threshold(category, "warn_after_hours") or self._threshold(category, "close_after_hours")
+    
+    @tasks.loop(seconds=60)
+    async def flusher(self):
+        """Persiste periodicamente a última atividade dos tickets"""
+        try:
+            await self.tracker.flush()
+        except Exception as e:
+            print(f"Erro ao salvar atividade dos tickets: {e}")
+    
+    @tasks.loop(minutes=5)
+    async def sweeper(self):
+        """Procura tickets inativos, avisando e depois fechando"""
+        now = self.tracker.now()
+        
+        for entry in list(self.tracker.idle(self._warn_after, now)):
+            guild = self.bot.get_guild(entry.guild_id)
+            if not guild or guild.unavailable:
+                # Servidor indisponível no momento; tenta de novo na próxima verificação
+                continue
+            
+            channel = guild.get_channel(entry.channel_id)
+            if not channel:
+                # Canal não existe mais (ou não está acessível)
+                self.tracker.untrack(entry.channel_id)
+                continue
+            
+            idle_ms = now - entry.last_activity
+            close_after = self._threshold(entry.category, "close_after_hours")
+            
+            try:
+                if close_after and idle_ms >= close_after:
+                    hours = idle_ms // HOUR_MS
+                    closed = await self.bot.ticket_manager.close_ticket(
+                        channel,
+                        channel.guild.me,
+                        f"Fechado automaticamente por inatividade ({hours}h sem mensagens)"
+                    )
+                    if not closed:
+                        # Sem ticket aberto no banco para o canal: para de tentar a cada verificação
+                        self.tracker.untrack(entry.channel_id)
+                elif not entry.warned:
+                    await self._send_warning(channel, close_after, idle_ms)
+                    self.tracker.mark_warned(entry.channel_id)
+            except Exception as e:
+                print(f"Erro ao processar ticket inativo {entry.channel_id}: {e}")
+    
+    @sweeper.before_loop
+    async def before_sweeper(self):
+        await self.bot.wait_until_ready()
+    
+    async def _send_warning(self, channel: discord.TextChannel, close_after: Optional[int], idle_ms: int):
+        """Envia o aviso de inatividade no canal do ticket"""
+        if close_after:
+            remaining = max(close_after - idle_ms, 0)
+            hours = max(remaining // HOUR_MS, 1)
+            description = (
+                f"Este ticket está sem mensagens há **{idle_ms // HOUR_MS}h**.\n\n"
+                f"Ele será fechado automaticamente em aproximadamente **{hours}h** "
+                f"caso não haja nova atividade."
+            )
+        else:
+            description = (
+                f"Este ticket está sem mensagens há **{idle_ms // HOUR_MS}h**.\n\n"
+                f"Envie uma mensagem caso ainda precise de atendimento."
+            )
+        
+        await channel.send(
+            embed=self.embed_builder.create_info_embed("Ticket Inativo", description)
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(InactivityCog(bot))
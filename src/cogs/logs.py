@@ -1,6 +1,11 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from datetime import datetime
+import time
+from typing import Dict, List
+
+from utils.log_outbox import LOG_FLUSH_SECONDS
+from utils.traces import TRACES
 
 class LogsCog(commands.Cog):
     """Cog para sistema de logs profissionais"""
@@ -9,21 +14,96 @@ class LogsCog(commands.Cog):
         self.bot = bot
         self.db = bot.db
         self.embed_builder = bot.embed_builder
+        self.permission_manager = bot.permission_manager
+        self.ticket_stats = bot.ticket_stats
+        self.message_store = bot.message_store
+        self.log_outbox = bot.log_outbox
+        self._reconciled = False
+
+    async def cog_load(self):
+        """Inicia o flush periódico das estatísticas (carregadas no aquecimento do bot) e o envio dos logs"""
+        self.stats_flusher.start()
+        self.log_sender.start()
+    
+    async def cog_unload(self):
+        """Para o flush periódico e grava os contadores pendentes"""
+        self.stats_flusher.cancel()
+        self.log_sender.cancel()
+        await self.ticket_stats.flush()
+    
+    @tasks.loop(seconds=30)
+    async def stats_flusher(self):
+        """Grava periodicamente os contadores de mensagens"""
+        try:
+            await self.ticket_stats.flush()
+        except Exception as e:
+            print(f"Erro ao salvar estatísticas dos tickets: {e}")
+    
+    @tasks.loop(seconds=LOG_FLUSH_SECONDS)
+    async def log_sender(self):
+        """Envia ao canal de logs os logs pendentes (inclusive os de antes de um reinício)"""
+        try:
+            await self.log_outbox.flush()
+        except Exception as e:
+            print(f"Erro ao enviar logs: {e}")
     
-    async def send_log(self, guild: discord.Guild, embed: discord.Embed, file: discord.File = None):
-        """Envia um log para o canal de logs configurado"""
-        config = await self.db.get_guild_config(guild.id)
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Fecha os tickets cujos canais foram deletados enquanto o bot estava offline"""
+        # on_ready pode ser disparado de novo após reconexões; a reconciliação só roda na inicialização
+        if self._reconciled:
+            return
+        self._reconciled = True
+        try:
+            await self.reconcile_tickets()
+        except Exception as e:
+            print(f"Erro na reconciliação dos tickets: {e}")
+    
+    async def reconcile_tickets(self) -> int:
+        """Compara os tickets abertos no banco com os canais existentes e fecha os órfãos de uma vez"""
+        started = time.perf_counter()
+        
+        checked = 0
+        orphans: Dict[int, List[tuple]] = {}
+        for ticket_id, guild_id, channel_id in await self.db.get_open_ticket_channels():
+            guild = self.bot.get_guild(guild_id)
+            # Servidores de outros processos, que o bot deixou ou indisponíveis ficam para depois
+            if guild is None or guild.unavailable:
+                continue
+            checked += 1
+            if guild.get_channel(channel_id) is None:
+                orphans.setdefault(guild_id, []).append((ticket_id, channel_id))
         
-        if config and config.get("log_channel_id"):
-            log_channel = guild.get_channel(config["log_channel_id"])
-            if log_channel:
-                try:
-                    if file:
-                        await log_channel.send(embed=embed, file=file)
-                    else:
-                        await log_channel.send(embed=embed)
-                except Exception as e:
-                    print(f"Erro ao enviar log: {e}")
+        channel_ids = [channel_id for tickets in orphans.values() for _, channel_id in tickets]
+        closed = await self.db.close_tickets(channel_ids, "Canal deletado com o bot offline")
+        # Os agregados diários já foram atualizados junto com o fechamento; falta o sketch de SLA
+        for ticket in closed:
+            self.bot.analytics.record_close(ticket, None)
+
+        for guild_id, tickets in orphans.items():
+            for ticket_id, channel_id in tickets:
+                self.bot.activity_tracker.untrack(channel_id)
+                self.ticket_stats.forget(guild_id, ticket_id)
+                self.message_store.drop(channel_id)
+            
+            embed = discord.Embed(
+                title="🧹 Tickets Fechados na Inicialização",
+                description=f"{len(tickets)} ticket(s) tiveram o canal deletado enquanto o bot estava offline.",
+                color=0xFF9900,
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(
+                name="🎫 Tickets",
+                value=", ".join(f"#{ticket_id}" for ticket_id, _ in tickets)[:1024],
+                inline=False
+            )
+            embed.set_footer(text=f"{self.embed_builder.bot_name} • Log System")
+            await self.log_outbox.send(self.bot.get_guild(guild_id), embed)
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Reconciliação: {checked} ticket(s) aberto(s) verificado(s), {len(closed)} fechado(s) "
+              f"sem canal em {len(orphans)} servidor(es) ({elapsed:.0f} ms).")
+        return len(closed)
     
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.TextChannel):
@@ -31,9 +111,9 @@ class LogsCog(commands.Cog):
         # Verifica se era um canal de ticket
         ticket_data = await self.db.get_ticket_by_channel(channel.id)
         
-        if ticket_data and ticket_data['status'] == 'open':
+        if ticket_data and ticket_data.status == 'open':
             # Canal foi deletado sem usar o sistema
-            user = channel.guild.get_member(ticket_data['user_id'])
+            user = await self.bot.members.resolve(channel.guild, ticket_data.user_id)
             
             embed = discord.Embed(
                 title="⚠️ Ticket Deletado Manualmente",
@@ -44,13 +124,13 @@ class LogsCog(commands.Cog):
             
             embed.add_field(
                 name="🎫 Ticket ID",
-                value=f"#{ticket_data['ticket_id']}",
+                value=f"#{ticket_data.ticket_id}",
                 inline=True
             )
             
             embed.add_field(
                 name="📂 Categoria",
-                value=ticket_data['category'].capitalize(),
+                value=ticket_data.category.capitalize(),
                 inline=True
             )
             
@@ -63,40 +143,72 @@ class LogsCog(commands.Cog):
             
             embed.add_field(
                 name="📝 Motivo",
-                value=ticket_data['reason'],
+                value=ticket_data.reason,
                 inline=False
             )
             
             embed.set_footer(text=f"{self.embed_builder.bot_name} • Log System")
             
-            await self.send_log(channel.guild, embed)
+            await self.log_outbox.send(channel.guild, embed)
             
-            # Atualiza status no banco
-            await self.db.close_ticket(channel.id, "Deletado manualmente")
+            # Atualiza status no banco e contabiliza o fechamento como os feitos pelo botão
+            if await self.db.close_ticket(channel.id, "Deletado manualmente"):
+                await self.bot.ticket_manager.record_close(ticket_data, None)
+        
+        self.message_store.drop(channel.id)
     
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        """Registra mensagens em canais de ticket para estatísticas"""
+        """Contabiliza mensagens em canais de ticket para estatísticas"""
+        # Ignora DMs
+        if not message.guild:
+            return
+        
+        # Guarda a mensagem no cache do ticket (inclusive as do bot, para a transcrição)
+        ticket = self.bot.activity_tracker.get(message.channel.id)
+        if self.message_store.record(message, create=ticket is not None):
+            TRACES.record_message(message, owner_id=ticket.user_id if ticket else None)
+        
         # Ignora mensagens do bot
         if message.author.bot:
             return
         
-        # Ignora DMs
-        if not message.guild:
+        # Atualiza a última atividade do ticket (apenas em memória)
+        activity = self.bot.activity_tracker.touch(message.channel.id)
+        if not activity:
             return
         
-        # Verifica se é um canal de ticket
-        ticket_data = await self.db.get_ticket_by_channel(message.channel.id)
+        # Primeira resposta da equipe (verificada apenas até acontecer)
+        staff_response = False
+        if (not self.ticket_stats.has_staff_response(activity.guild_id, activity.ticket_id)
+                and message.author.id != activity.user_id
+                and isinstance(message.author, discord.Member)):
+            staff_response = await self.permission_manager.is_staff(message.author)
         
-        if ticket_data:
-            # Registra atividade (pode ser usado para métricas de tempo de resposta)
-            # Por enquanto, apenas registramos no log do ticket
-            await self.db.add_log(
-                ticket_id=ticket_data['ticket_id'],
-                user_id=message.author.id,
-                action="message",
-                details=f"Mensagem enviada: {len(message.content)} caracteres"
-            )
+        # Contabiliza a mensagem nos contadores agregados do ticket
+        self.ticket_stats.record_message(
+            ticket_id=activity.ticket_id,
+            guild_id=activity.guild_id,
+            user_id=message.author.id,
+            characters=len(message.content),
+            staff_response=staff_response
+        )
+    
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Mantém o cache do ticket atualizado quando uma mensagem é editada"""
+        if "content" in payload.data:
+            self.message_store.edit(payload.channel_id, payload.message_id, payload.data["content"])
+    
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Remove do cache do ticket as mensagens apagadas"""
+        self.message_store.delete(payload.channel_id, (payload.message_id,))
+    
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """Remove do cache do ticket as mensagens apagadas em massa"""
+        self.message_store.delete(payload.channel_id, payload.message_ids)
 
 
 async def setup(bot):
@@ -1,63 +1,89 @@
+import asyncio
+import time
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional
-import json
+from typing import List, Optional, Tuple
+
+from utils.metrics import instrument
+
+# custom_id dos botões de painel; nos painéis de categoria a chave vem depois de ":"
+PANEL_BUTTON_ID = "panel_create_ticket"
+
+# Mensagens de painel verificadas (ou reenviadas) ao mesmo tempo na inicialização
+PANEL_SYNC_CONCURRENCY = 5
+
+def panel_button_id(category: Optional[str] = None) -> str:
+    """custom_id do botão de um painel (ex.: "panel_create_ticket:suporte")"""
+    return f"{PANEL_BUTTON_ID}:{category}" if category else PANEL_BUTTON_ID
+
+
+def panel_signature(embeds, components) -> tuple:
+    """Resumo do conteúdo de um painel, para comparar a mensagem enviada com a versão atual.
+    
+    Aceita tanto os embeds e componentes de uma mensagem quanto os itens de uma view.
+    """
+    embed_signature = tuple(
+        (
+            embed.title,
+            embed.description,
+            embed.colour.value if embed.colour else None,
+            embed.footer.text,
+            tuple((field.name, field.value) for field in embed.fields)
+        )
+        for embed in embeds
+    )
+    
+    items = []
+    for component in components:
+        # Mensagens trazem linhas (ActionRow); views trazem os itens diretamente
+        items.extend(getattr(component, "children", [component]))
+    
+    component_signature = tuple(
+        (
+            item.custom_id,
+            getattr(item, "label", None) or getattr(item, "placeholder", None),
+            tuple(
+                (option.value, option.label, str(option.emoji) if option.emoji else None, option.description or None)
+                for option in getattr(item, "options", ())
+            )
+        )
+        for item in items
+    )
+    return embed_signature, component_signature
+
 
 class PanelButtonView(discord.ui.View):
-    """View com botão para criar ticket do painel"""
+    """View com botão para criar ticket do painel.
+    
+    O clique é tratado pelo `PainelCog.on_interaction`, que lê a categoria
+    do custom_id: a view não precisa ser registrada e os painéis de categoria
+    continuam funcionando depois de reiniciar o bot.
+    """
     
     def __init__(self, bot, category: str = None):
         super().__init__(timeout=None)
         self.bot = bot
         self.category = category
-    
-    @discord.ui.button(
-        label="📩 Criar Ticket",
-        style=discord.ButtonStyle.primary,
-        custom_id="panel_create_ticket"
-    )
-    async def create_ticket_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Botão para criar ticket via painel"""
-        from cogs.tickets import TicketModal
         
-        # Abre o modal (igual ao comando /ticket)
-        modal = TicketModal(
-            self.bot,
-            self.bot.db,
-            self.bot.embed_builder,
-            self.bot.permission_manager,
-            self.bot.ticket_manager,
-            category=self.category
-        )
-        
-        await interaction.response.send_modal(modal)
+        self.add_item(discord.ui.Button(
+            label="📩 Criar Ticket",
+            style=discord.ButtonStyle.primary,
+            custom_id=panel_button_id(category)
+        ))
 
 
 class CategorySelectView(discord.ui.View):
     """View com select menu para escolher categoria"""
     
-    def __init__(self, bot):
+    def __init__(self, bot, options=None):
         super().__init__(timeout=None)
         self.bot = bot
         
-        # Carrega categorias do config
-        with open("config.json", "r", encoding="utf-8") as f:
-            config = json.load(f)
-        
-        categories = config.get("categories", {})
-        
-        # Cria opções do select menu
-        options = []
-        for key, cat_info in categories.items():
-            options.append(
-                discord.SelectOption(
-                    label=cat_info.get("name", key.capitalize()),
-                    value=key,
-                    description=cat_info.get("description", "")[:100],
-                    emoji=cat_info.get("emoji", "📝")
-                )
-            )
+        # Opções já compiladas (do servidor ou, por padrão, do config.json)
+        if options is None:
+            options = bot.config_service.snapshot.select_options
+        options = list(options)
         
         # Adiciona o select menu
         self.category_select = discord.ui.Select(
@@ -68,6 +94,7 @@ class CategorySelectView(discord.ui.View):
         self.category_select.callback = self.select_callback
         self.add_item(self.category_select)
     
+    @instrument("select", "panel_category_select")
     async def select_callback(self, interaction: discord.Interaction):
         """Callback quando uma categoria é selecionada"""
         from cogs.tickets import TicketModal
@@ -95,10 +122,12 @@ class PainelCog(commands.Cog):
         self.db = bot.db
         self.embed_builder = bot.embed_builder
         self.permission_manager = bot.permission_manager
+        self._panels_synced = False
     
     painel_group = app_commands.Group(
         name="painel",
-        description="Comandos de gerenciamento de painéis de tickets"
+        description="Comandos de gerenciamento de painéis de tickets",
+        guild_only=True
     )
     
     @painel_group.command(name="criar", description="Cria um painel fixo de tickets")
@@ -146,31 +175,20 @@ class PainelCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            if tipo.value == "simple":
-                # Painel simples com um botão
-                embed = self.embed_builder.create_panel_embed()
-                view = PanelButtonView(self.bot)
-                
-                message = await target_channel.send(embed=embed, view=view)
-                
-            else:  # categories
-                # Painel com menu de categorias
-                embed = discord.Embed(
-                    title="📩 Sistema de Tickets - Escolha a Categoria",
-                    description=(
-                        "**Bem-vindo ao sistema de suporte!**\n\n"
-                        "Selecione abaixo a categoria que melhor descreve seu ticket.\n"
-                        "Após selecionar, você preencherá um formulário com mais detalhes."
+            # Painel simples (um botão) ou com menu de categorias
+            panel = await self.render_panel(interaction.guild.id, tipo.value)
+            if panel is None:
+                await interaction.followup.send(
+                    embed=self.embed_builder.create_error_embed(
+                        "Sem Categorias",
+                        "Nenhuma categoria está configurada. Use `/categorias adicionar` primeiro."
                     ),
-                    color=self.embed_builder.color,
-                    timestamp=discord.utils.utcnow()
+                    ephemeral=True
                 )
-                
-                embed.set_footer(text=f"{self.embed_builder.bot_name} • Ticket System")
-                
-                view = CategorySelectView(self.bot)
-                
-                message = await target_channel.send(embed=embed, view=view)
+                return
+            
+            embed, view = panel
+            message = await target_channel.send(embed=embed, view=view)
             
             # Registra o painel no banco de dados
             await self.db.create_panel(
@@ -204,17 +222,10 @@ class PainelCog(commands.Cog):
         categoria="Categoria do painel",
         canal="Canal onde o painel será enviado (opcional, padrão: canal atual)"
     )
-    @app_commands.choices(categoria=[
-        app_commands.Choice(name="🛠️ Suporte", value="suporte"),
-        app_commands.Choice(name="🛒 Compras", value="compras"),
-        app_commands.Choice(name="⚠️ Denúncia", value="denuncia"),
-        app_commands.Choice(name="🤝 Parcerias", value="parcerias"),
-        app_commands.Choice(name="📝 Customizado", value="customizado")
-    ])
     async def painel_categoria(
         self,
         interaction: discord.Interaction,
-        categoria: app_commands.Choice[str],
+        categoria: str,
         canal: Optional[discord.TextChannel] = None
     ):
         """Cria um painel fixo para uma categoria específica"""
@@ -244,25 +255,24 @@ class PainelCog(commands.Cog):
             )
             return
         
+        # Obtém a categoria configurada no servidor
+        categories = await self.bot.category_registry.get(interaction.guild.id)
+        category_info = categories.get(categoria)
+        if not category_info:
+            await interaction.response.send_message(
+                embed=self.embed_builder.create_error_embed(
+                    "Categoria Inválida",
+                    f"A categoria **{categoria}** não está configurada neste servidor."
+                ),
+                ephemeral=True
+            )
+            return
+        
         await interaction.response.defer(ephemeral=True)
         
         try:
-            # Carrega informações da categoria
-            with open("config.json", "r", encoding="utf-8") as f:
-                config = json.load(f)
-            
-            category_info = config.get("categories", {}).get(categoria.value, {})
-            
-            # Cria embed específico da categoria
-            embed = self.embed_builder.create_panel_embed(
-                category=categoria.value,
-                category_info=category_info
-            )
-            
-            # Cria view com botão
-            view = PanelButtonView(self.bot, category=categoria.value)
-            
-            # Envia o painel
+            # Cria o embed e o botão da categoria e envia o painel
+            embed, view = await self.render_panel(interaction.guild.id, f"category_{category_info.key}")
             message = await target_channel.send(embed=embed, view=view)
             
             # Registra no banco de dados
@@ -270,13 +280,13 @@ class PainelCog(commands.Cog):
                 guild_id=interaction.guild.id,
                 channel_id=target_channel.id,
                 message_id=message.id,
-                panel_type=f"category_{categoria.value}"
+                panel_type=f"category_{category_info.key}"
             )
             
             await interaction.followup.send(
                 embed=self.embed_builder.create_success_embed(
                     "Painel de Categoria Criado!",
-                    f"O painel de **{categoria.name}** foi criado com sucesso em {target_channel.mention}\n"
+                    f"O painel de **{category_info.emoji} {category_info.name}** foi criado com sucesso em {target_channel.mention}\n"
                     f"**Link:** [Clique aqui]({message.jump_url})"
                 ),
                 ephemeral=True
@@ -291,14 +301,127 @@ class PainelCog(commands.Cog):
                 ephemeral=True
             )
     
+    @painel_categoria.autocomplete("categoria")
+    async def categoria_autocomplete(self, interaction: discord.Interaction,
+                                     current: str) -> List[app_commands.Choice[str]]:
+        """Sugere as categorias configuradas no servidor"""
+        categories = await self.bot.category_registry.get(interaction.guild.id)
+        current = current.lower()
+        return [
+            app_commands.Choice(name=f"{info.emoji} {info.name}", value=key)
+            for key, info in categories.categories.items()
+            if current in key.lower() or current in info.name.lower()
+        ][:25]
+    
+    async def render_panel(self, guild_id: int, panel_type: str) -> Optional[Tuple[discord.Embed, discord.ui.View]]:
+        """Embed e view atuais de um painel (None se as categorias dele não existem mais)"""
+        if panel_type == "simple":
+            return self.embed_builder.create_panel_embed(), PanelButtonView(self.bot)
+        
+        categories = await self.bot.category_registry.get(guild_id)
+        if panel_type == "categories":
+            if not categories.select_options:
+                return None
+            return self.embed_builder.create_category_menu_embed(), CategorySelectView(self.bot, categories.select_options)
+        
+        category_info = categories.get(panel_type[len("category_"):])
+        if not category_info:
+            return None
+        embed = self.embed_builder.create_panel_embed(
+            category=category_info.key,
+            category_info=category_info.to_dict()
+        )
+        return embed, PanelButtonView(self.bot, category=category_info.key)
+    
     @commands.Cog.listener()
-    async def on_ready(self):
-        """Registra views persistentes quando o bot inicia"""
-        # Registra view de botão simples
-        self.bot.add_view(PanelButtonView(self.bot))
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Trata os botões de todos os painéis (a categoria vem no custom_id)"""
+        if interaction.type is not discord.InteractionType.component:
+            return
+        
+        custom_id = (interaction.data or {}).get("custom_id", "")
+        if custom_id == PANEL_BUTTON_ID or custom_id.startswith(f"{PANEL_BUTTON_ID}:"):
+            await self.open_ticket_modal(interaction, custom_id[len(PANEL_BUTTON_ID) + 1:] or None)
+    
+    @instrument("button", "panel_create_ticket")
+    async def open_ticket_modal(self, interaction: discord.Interaction, category: Optional[str] = None):
+        """Abre o modal de criação de ticket (igual ao comando /ticket)"""
+        from cogs.tickets import TicketModal
         
-        # Registra view de categorias
-        self.bot.add_view(CategorySelectView(self.bot))
+        modal = TicketModal(
+            self.bot,
+            self.bot.db,
+            self.bot.embed_builder,
+            self.bot.permission_manager,
+            self.bot.ticket_manager,
+            category=category
+        )
+        
+        await interaction.response.send_modal(modal)
+    
+    async def sync_panels(self) -> Tuple[int, int, int]:
+        """Confere os painéis salvos: remove os que não existem mais e atualiza os desatualizados.
+        
+        Retorna (verificados, removidos, atualizados).
+        """
+        started = time.perf_counter()
+        guilds = {guild.id: guild for guild in self.bot.guilds if not guild.unavailable}
+        panels = await self.db.get_panels(list(guilds))
+        semaphore = asyncio.Semaphore(PANEL_SYNC_CONCURRENCY)
+        
+        dead: List[int] = []
+        stale: List[Tuple[discord.Message, Tuple[discord.Embed, discord.ui.View]]] = []
+        
+        async def check(panel):
+            channel = guilds[panel.guild_id].get_channel(panel.channel_id)
+            if channel is None:
+                dead.append(panel.message_id)
+                return
+            
+            async with semaphore:
+                try:
+                    message = await channel.fetch_message(panel.message_id)
+                except discord.NotFound:
+                    dead.append(panel.message_id)
+                    return
+                except discord.HTTPException as e:
+                    # Sem acesso ao canal: o painel é mantido e conferido na próxima inicialização
+                    print(f"Erro ao verificar o painel {panel.message_id}: {e}")
+                    return
+            
+            rendered = await self.render_panel(panel.guild_id, panel.panel_type)
+            if rendered and panel_signature(message.embeds, message.components) != panel_signature(
+                    [rendered[0]], rendered[1].children):
+                stale.append((message, rendered))
+        
+        async def rerender(message, rendered):
+            embed, view = rendered
+            async with semaphore:
+                try:
+                    await message.edit(embed=embed, view=view)
+                except discord.HTTPException as e:
+                    print(f"Erro ao atualizar o painel {message.id}: {e}")
+        
+        await asyncio.gather(*(check(panel) for panel in panels))
+        await self.db.delete_panels(dead)
+        await asyncio.gather(*(rerender(message, rendered) for message, rendered in stale))
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Painéis: {len(panels)} verificado(s), {len(dead)} removido(s), "
+              f"{len(stale)} atualizado(s) ({elapsed:.0f} ms).")
+        return len(panels), len(dead), len(stale)
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Confere os painéis quando o bot inicia (as views persistentes são registradas em TicketBot.warm_up)"""
+        # on_ready pode ser disparado de novo após reconexões; os painéis só precisam ser conferidos uma vez
+        if self._panels_synced:
+            return
+        self._panels_synced = True
+        try:
+            await self.sync_panels()
+        except Exception as e:
+            print(f"Erro ao conferir os painéis: {e}")
 
 
 async def setup(bot):
@@ -0,0 +1,258 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from datetime import datetime
+from typing import Optional
+
+from utils.analytics import FIRST_RESPONSE, RESOLUTION
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Formata uma duração em segundos de forma compacta"""
+    if seconds is None:
+        return "N/A"
+    
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+class StatsCog(commands.Cog):
+    """Cog de métricas de SLA dos tickets"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = bot.db
+        self.embed_builder = bot.embed_builder
+        self.permission_manager = bot.permission_manager
+        self.analytics = bot.analytics
+    
+    async def cog_load(self):
+        """Inicia o flush periódico dos sketches (carregados no aquecimento do bot)"""
+        self.analytics_flusher.start()
+    
+    async def cog_unload(self):
+        """Para o flush periódico e grava os sketches pendentes"""
+        self.analytics_flusher.cancel()
+        await self.analytics.flush()
+    
+    @tasks.loop(seconds=60)
+    async def analytics_flusher(self):
+        """Persiste periodicamente os sketches de métricas"""
+        try:
+            await self.analytics.flush()
+        except Exception as e:
+            print(f"Erro ao salvar métricas de SLA: {e}")
+    
+    def _metric_field(self, guild_id: int, metric: str, dimension: str, key: str) -> str:
+        """Texto de um campo com contagem e percentis"""
+        summary = self.analytics.summary(guild_id, metric, dimension, key)
+        if not summary:
+            return "Sem dados"
+        
+        return (
+            f"**Tickets:** {summary['count']}\n"
+            f"**Média:** {format_duration(summary['mean'])}\n"
+            f"**p50:** {format_duration(summary['p50'])}\n"
+            f"**p90:** {format_duration(summary['p90'])}\n"
+            f"**p99:** {format_duration(summary['p99'])}"
+        )
+    
+    @app_commands.command(name="stats", description="Mostra métricas de tempo de resposta e resolução")
+    @app_commands.guild_only()
+    @app_commands.describe(
+        categoria="Filtra por categoria (opcional)",
+        urgencia="Filtra por urgência (opcional)",
+        staff="Filtra por membro da equipe (opcional)"
+    )
+    @app_commands.choices(urgencia=[
+        app_commands.Choice(name="🟢 Baixa", value="baixa"),
+        app_commands.Choice(name="🟡 Média", value="média"),
+        app_commands.Choice(name="🔴 Alta", value="alta")
+    ])
+    async def stats_command(
+        self,
+        interaction: discord.Interaction,
+        categoria: Optional[str] = None,
+        urgencia: Optional[app_commands.Choice[str]] = None,
+        staff: Optional[discord.Member] = None
+    ):
+        """Comando /stats para staff"""
+        
+        if not await self.permission_manager.is_staff(interaction.user):
+            await interaction.response.send_message(
+                embed=self.embed_builder.create_error_embed(
+                    "Sem Permissão",
+                    "Apenas membros da equipe podem ver as métricas."
+                ),
+                ephemeral=True
+            )
+            return
+        
+        # Define a dimensão consultada (um filtro por vez)
+        if staff:
+            dimension, key, label = "staff", str(staff.id), staff.mention
+        elif urgencia:
+            dimension, key, label = "urgency", urgencia.value, f"Urgência {urgencia.value.capitalize()}"
+        elif categoria:
+            category = categoria.lower().strip()
+            dimension, key, label = "category", category, f"Categoria {category.capitalize()}"
+        else:
+            dimension, key, label = "guild", "all", "Todo o servidor"
+        
+        embed = discord.Embed(
+            title="📊 Métricas de Atendimento",
+            description=f"**Escopo:** {label}",
+            color=self.embed_builder.color,
+            timestamp=discord.utils.utcnow()
+        )
+        
+        embed.add_field(
+            name="⏱️ Primeira Resposta (claim)",
+            value=self._metric_field(interaction.guild.id, FIRST_RESPONSE, dimension, key),
+            inline=True
+        )
+        
+        embed.add_field(
+            name="🔒 Tempo até Fechamento",
+            value=self._metric_field(interaction.guild.id, RESOLUTION, dimension, key),
+            inline=True
+        )
+        
+        embed.set_footer(text=f"{self.embed_builder.bot_name} • Stats")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    relatorio_group = app_commands.Group(
+        name="relatorio",
+        description="Relatórios de tickets por período",
+        guild_only=True
+    )
+    
+    @relatorio_group.command(name="gerar", description="Gera um relatório de tickets em um intervalo de datas")
+    @app_commands.describe(
+        inicio="Data inicial (DD/MM/AAAA)",
+        fim="Data final (DD/MM/AAAA, opcional, padrão: hoje)",
+        agrupar="Agrupa o relatório por categoria, urgência ou staff (opcional)"
+    )
+    @app_commands.choices(agrupar=[
+        app_commands.Choice(name="Categoria", value="category"),
+        app_commands.Choice(name="Urgência", value="urgency"),
+        app_commands.Choice(name="Staff", value="staff")
+    ])
+    async def relatorio_gerar(
+        self,
+        interaction: discord.Interaction,
+        inicio: str,
+        fim: Optional[str] = None,
+        agrupar: Optional[app_commands.Choice[str]] = None
+    ):
+        """Gera um relatório a partir dos agregados diários"""
+        
+        if not await self.permission_manager.is_staff(interaction.user):
+            await interaction.response.send_message(
+                embed=self.embed_builder.create_error_embed(
+                    "Sem Permissão",
+                    "Apenas membros da equipe podem gerar relatórios."
+                ),
+                ephemeral=True
+            )
+            return
+        
+        try:
+            start = datetime.strptime(inicio.strip(), "%d/%m/%Y").date()
+            end = datetime.strptime(fim.strip(), "%d/%m/%Y").date() if fim else datetime.utcnow().date()
+        except ValueError:
+            await interaction.response.send_message(
+                embed=self.embed_builder.create_error_embed(
+                    "Data Inválida",
+                    "Use o formato **DD/MM/AAAA**, por exemplo `01/10/2024`."
+                ),
+                ephemeral=True
+            )
+            return
+        
+        if start > end:
+            start, end = end, start
+        
+        group_by = agrupar.value if agrupar else None
+        rows = await self.db.get_rollup_report(
+            interaction.guild.id, start.isoformat(), end.isoformat(), group_by
+        )
+        
+        embed = discord.Embed(
+            title="📈 Relatório de Tickets",
+            description=f"**Período:** {start.strftime('%d/%m/%Y')} a {end.strftime('%d/%m/%Y')}",
+            color=self.embed_builder.color,
+            timestamp=discord.utils.utcnow()
+        )
+        
+        if not rows:
+            embed.description += "\n\nNenhum ticket registrado no período."
+        
+        # Ordena pelos grupos com mais tickets e limita ao máximo de campos do embed
+        rows.sort(key=lambda row: (row["opened"] + row["closed"] + row["claimed"]), reverse=True)
+        for row in rows[:24]:
+            if group_by == "staff":
+                field_name = "👤 Staff" if row["key"] else "📩 Sem staff"
+                header = f"<@{row['key']}>\n" if row["key"] else ""
+            elif group_by:
+                field_name = str(row["key"] or "N/A").capitalize()
+                header = ""
+            else:
+                field_name = "📊 Total"
+                header = ""
+            
+            value = (
+                f"{header}"
+                f"**Abertos:** {row['opened']}\n"
+                f"**Assumidos:** {row['claimed']}\n"
+                f"**Fechados:** {row['closed']}\n"
+                f"**1ª resposta média:** {format_duration(row['first_response_avg'])}\n"
+                f"**Resolução média:** {format_duration(row['resolution_avg'])}"
+            )
+            
+            embed.add_field(name=field_name, value=value, inline=True)
+        
+        embed.set_footer(text=f"{self.embed_builder.bot_name} • Relatório")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @relatorio_group.command(name="recalcular", description="Recalcula os relatórios a partir do histórico de tickets")
+    async def relatorio_recalcular(self, interaction: discord.Interaction):
+        """Reconstrói os agregados diários do servidor (backfill)"""
+        
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                embed=self.embed_builder.create_error_embed(
+                    "Sem Permissão",
+                    "Apenas administradores podem recalcular os relatórios."
+                ),
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        rows = await self.db.rebuild_rollups(interaction.guild.id)
+        
+        await interaction.followup.send(
+            embed=self.embed_builder.create_success_embed(
+                "Relatórios Recalculados",
+                f"Os agregados diários foram reconstruídos a partir do histórico.\n"
+                f"**Linhas geradas:** {rows}"
+            ),
+            ephemeral=True
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(StatsCog(bot))
@@ -1,12 +1,14 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
+
+from utils.metrics import instrument
 
 class TicketModal(discord.ui.Modal, title="Criar Ticket"):
     """Modal para criação de ticket"""
     
-    def __init__(self, bot, db, embed_builder, permission_manager, ticket_manager, category: str = None):
+    def __init__(self, bot, db, embed_builder, permission_manager, ticket_manager, category: str = None,
+                 category_placeholder: str = None):
         super().__init__()
         self.bot = bot
         self.db = db
@@ -19,7 +21,7 @@ class TicketModal(discord.ui.Modal, title="Criar Ticket"):
         if not category:
             self.category_field = discord.ui.TextInput(
                 label="Categoria",
-                placeholder="suporte, compras, denúncia, parcerias, customizado",
+                placeholder=category_placeholder or bot.config_service.snapshot.category_placeholder,
                 required=True,
                 max_length=50
             )
@@ -47,6 +49,7 @@ class TicketModal(discord.ui.Modal, title="Criar Ticket"):
         max_length=10
     )
     
+    @instrument("modal", "ticket_create")
     async def on_submit(self, interaction: discord.Interaction):
         # Obtém a categoria
         if self.selected_category:
@@ -72,7 +75,7 @@ class TicketModal(discord.ui.Modal, title="Criar Ticket"):
         # Verifica se usuário já tem ticket aberto (anti-spam)
         open_tickets = await self.db.get_user_open_tickets(interaction.guild.id, interaction.user.id)
         if open_tickets:
-            ticket_mentions = ", ".join([f"<#{t['channel_id']}>" for t in open_tickets])
+            ticket_mentions = ", ".join([f"<#{t.channel_id}>" for t in open_tickets])
             await interaction.response.send_message(
                 embed=self.embed_builder.create_error_embed(
                     "Ticket Já Existe",
@@ -116,16 +119,12 @@ class TicketModal(discord.ui.Modal, title="Criar Ticket"):
             # Envia log para canal de logs
             ticket_data = await self.db.get_ticket_by_channel(channel.id)
             if ticket_data:
-                config = await self.db.get_guild_config(interaction.guild.id)
-                if config and config.get("log_channel_id"):
-                    log_channel = interaction.guild.get_channel(config["log_channel_id"])
-                    if log_channel:
-                        log_embed = self.embed_builder.create_log_embed(
-                            action="created",
-                            ticket_data=ticket_data,
-                            user=interaction.user
-                        )
-                        await log_channel.send(embed=log_embed)
+                log_embed = self.embed_builder.create_log_embed(
+                    action="created",
+                    ticket_data=ticket_data,
+                    user=interaction.user
+                )
+                await self.bot.log_outbox.send(interaction.guild, log_embed)
             
             # Atualiza mensagem de confirmação
             await interaction.edit_original_response(
@@ -157,32 +156,24 @@ class TicketsCog(commands.Cog):
         self.ticket_manager = bot.ticket_manager
     
     @app_commands.command(name="ticket", description="Abre um ticket de suporte")
+    @app_commands.guild_only()
     async def ticket_command(self, interaction: discord.Interaction):
         """Comando /ticket para usuários"""
         
+        # Categorias do servidor (em cache após o primeiro uso)
+        categories = await self.bot.category_registry.get(interaction.guild.id)
+        
         # Abre o modal
         modal = TicketModal(
             self.bot,
             self.db,
             self.embed_builder,
             self.permission_manager,
-            self.ticket_manager
+            self.ticket_manager,
+            category_placeholder=categories.placeholder
         )
         
         await interaction.response.send_modal(modal)
-    
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Registra views persistentes quando o bot inicia"""
-        from utils.ticket_manager import TicketControlView
-        
-        # Registra a view de controle de tickets
-        self.bot.add_view(TicketControlView(
-            self.bot,
-            self.db,
-            self.embed_builder,
-            self.permission_manager
-        ))
 
 
 async def setup(bot):
@@ -0,0 +1,222 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+from utils.cluster import shard_ranges
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+# Código de saída de um processo que não deve ser reiniciado (ex: token inválido)
+EXIT_FATAL = 2
+
+# Espera entre reinícios de um processo que caiu (dobra a cada queda seguida)
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 60.0
+
+# Tempo rodando sem cair para a espera voltar ao mínimo
+HEALTHY_AFTER = 300.0
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def cluster_trace_path(path: str, cluster_id: int) -> str:
+    """Arquivo de trace de um processo do cluster (um arquivo por processo)"""
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f"cluster{cluster_id}-{filename}")
+
+
+def run_worker(cluster_id: int, shard_ids: List[int], shard_count: int, token: str,
+               dev_guild_id: Optional[int], force_sync: bool, metrics_port: Optional[int] = None,
+               trace_path: Optional[str] = None):
+    """Ponto de entrada de um processo do cluster"""
+    # SIGTERM encerra o bot normalmente, salvando o estado pendente
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    
+    import discord
+    from bot import TicketBot
+    from utils.config import ConfigError
+    
+    try:
+        bot = TicketBot(
+            dev_guild_id=dev_guild_id,
+            shard_count=shard_count,
+            shard_ids=shard_ids,
+            cluster_id=cluster_id,
+            force_sync=force_sync,
+            metrics_port=metrics_port,
+            trace_path=trace_path
+        )
+        bot.run(token)
+    except (discord.LoginFailure, ConfigError) as e:
+        print(f"[cluster {cluster_id}] Erro fatal: {e}")
+        sys.exit(EXIT_FATAL)
+
+
+async def fetch_recommended_shards(token: str) -> int:
+    """Consulta o número de shards recomendado pelo Discord"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"}
+        ) as response:
+            if response.status == 401:
+                raise ValueError("DISCORD_TOKEN inválido")
+            response.raise_for_status()
+            data = await response.json()
+            return data["shards"]
+
+
+class Worker:
+    """Estado de supervisão de um processo do cluster"""
+    
+    __slots__ = ("cluster_id", "shard_ids", "process", "started_at", "backoff", "restart_at")
+    
+    def __init__(self, cluster_id: int, shard_ids: List[int]):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.backoff = RESTART_BACKOFF_MIN
+        self.restart_at: Optional[float] = None
+
+
+class ClusterSupervisor:
+    """Inicia um processo por faixa de shards e reinicia os que caírem"""
+    
+    def __init__(self, ranges: List[List[int]], shard_count: int, token: str,
+                 dev_guild_id: Optional[int] = None, force_sync: bool = False,
+                 metrics_port: Optional[int] = None, trace_path: Optional[str] = None):
+        self.shard_count = shard_count
+        self.token = token
+        self.dev_guild_id = dev_guild_id
+        self.force_sync = force_sync
+        self.metrics_port = metrics_port
+        self.trace_path = trace_path
+        self.workers: Dict[int, Worker] = {
+            cluster_id: Worker(cluster_id, shard_ids)
+            for cluster_id, shard_ids in enumerate(ranges)
+        }
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = False
+    
+    def _start(self, worker: Worker):
+        worker.process = self._context.Process(
+            target=run_worker,
+            args=(worker.cluster_id, worker.shard_ids, self.shard_count, self.token,
+                  self.dev_guild_id, self.force_sync,
+                  # Cada processo usa a porta base + o número do cluster
+                  self.metrics_port + worker.cluster_id if self.metrics_port else None,
+                  cluster_trace_path(self.trace_path, worker.cluster_id) if self.trace_path else None),
+            name=f"ticket-bot-cluster-{worker.cluster_id}"
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        print(f"Cluster {worker.cluster_id} iniciado (PID {worker.process.pid}, shards {worker.shard_ids}).")
+    
+    def _check(self, worker: Worker):
+        """Agenda ou executa o reinício de um processo que terminou"""
+        now = time.monotonic()
+        
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                self._start(worker)
+            return
+        
+        if worker.process.is_alive():
+            if now - worker.started_at >= HEALTHY_AFTER:
+                worker.backoff = RESTART_BACKOFF_MIN
+            return
+        
+        exitcode = worker.process.exitcode
+        if exitcode == EXIT_FATAL:
+            print(f"Cluster {worker.cluster_id} terminou com erro fatal; encerrando o cluster.")
+            self.stop()
+            return
+        
+        print(f"Cluster {worker.cluster_id} terminou (código {exitcode}); "
+              f"reiniciando em {worker.backoff:.0f}s.")
+        worker.restart_at = now + worker.backoff
+        worker.backoff = min(worker.backoff * 2, RESTART_BACKOFF_MAX)
+    
+    def stop(self, *args):
+        """Encerra todos os processos"""
+        self._stopping = True
+    
+    def run(self):
+        """Inicia os processos e os supervisiona até receber um sinal de parada"""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        
+        for worker in self.workers.values():
+            self._start(worker)
+            # Espaça os inícios; a identificação no gateway é coordenada pelos próprios processos
+            time.sleep(1.0)
+        
+        try:
+            while not self._stopping:
+                for worker in self.workers.values():
+                    if self._stopping:
+                        break
+                    self._check(worker)
+                time.sleep(1.0)
+        finally:
+            self._shutdown()
+    
+    def _shutdown(self):
+        processes = [worker.process for worker in self.workers.values()
+                     if worker.process and worker.process.is_alive()]
+        
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                print(f"Processo {process.pid} não encerrou a tempo; finalizando.")
+                process.kill()
+        
+        print("Cluster encerrado.")
+
+
+def main():
+    DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+    if not DISCORD_TOKEN:
+        print("Erro: DISCORD_TOKEN deve ser definido no arquivo .env")
+        return
+    
+    try:
+        GUILD_ID = os.getenv("GUILD_ID")
+        dev_guild_id = int(GUILD_ID) if GUILD_ID else None
+        clusters = int(os.getenv("CLUSTERS") or os.cpu_count() or 1)
+        METRICS_PORT = os.getenv("METRICS_PORT")
+        metrics_port = int(METRICS_PORT) if METRICS_PORT else None
+        trace_path = os.getenv("TRACE_PATH") or None
+        
+        SHARD_COUNT = os.getenv("SHARD_COUNT")
+        if SHARD_COUNT:
+            shard_count = int(SHARD_COUNT)
+        else:
+            shard_count = asyncio.run(fetch_recommended_shards(DISCORD_TOKEN))
+    except (ValueError, aiohttp.ClientError) as e:
+        print(f"Erro ao preparar o cluster: {e}")
+        return
+    
+    ranges = shard_ranges(shard_count, clusters)
+    print(f"Iniciando {len(ranges)} processo(s) para {shard_count} shard(s).")
+    
+    force_sync = "--force-sync" in sys.argv or os.getenv("FORCE_SYNC", "").lower() in ("1", "true")
+    ClusterSupervisor(ranges, shard_count, DISCORD_TOKEN, dev_guild_id, force_sync, metrics_port,
+                      trace_path).run()
+
+
+if __name__ == "__main__":
+    main()
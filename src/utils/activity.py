@@ -0,0 +1,199 @@
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Set
+
+from utils.timeutils import now_ms
+
+class TicketActivity:
+    """Estado de atividade de um ticket aberto"""
+    
+    __slots__ = ("ticket_id", "guild_id", "channel_id", "user_id", "category", "last_activity", "warned")
+    
+    def __init__(self, ticket_id: int, guild_id: int, channel_id: int, user_id: int,
+                 category: str, last_activity: int, warned: bool = False):
+        self.ticket_id = ticket_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.category = category
+        self.last_activity = last_activity
+        self.warned = warned
+
+
+class ActivityTracker:
+    """Índice em memória da última atividade de cada ticket aberto.
+    
+    Os tickets são agrupados por servidor e categoria em um OrderedDict
+    ordenado pela última atividade (o mais antigo primeiro), então encontrar
+    tickets inativos percorre apenas o prefixo já vencido de cada categoria
+    e o estado de um servidor pode ser carregado ou descartado por inteiro.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._entries: Dict[int, TicketActivity] = {}
+        self._by_guild: Dict[int, Dict[str, "OrderedDict[int, TicketActivity]"]] = {}
+        self._dirty: Set[int] = set()
+        self._removed: Set[int] = set()
+    
+    @staticmethod
+    def now() -> int:
+        """Timestamp atual em milissegundos"""
+        return now_ms()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, channel_id: int) -> Optional[TicketActivity]:
+        """Obtém o estado de atividade de um canal de ticket"""
+        return self._entries.get(channel_id)
+    
+    def track(self, ticket_id: int, guild_id: int, channel_id: int, user_id: int,
+              category: str, last_activity: Optional[int] = None, warned: bool = False,
+              persist: bool = True) -> TicketActivity:
+        """Passa a acompanhar um ticket aberto"""
+        self.untrack(channel_id, persist=False)
+        
+        entry = TicketActivity(
+            ticket_id, guild_id, channel_id, user_id, category,
+            last_activity if last_activity is not None else self.now(), warned
+        )
+        self._entries[channel_id] = entry
+        self._by_guild.setdefault(guild_id, {}).setdefault(category, OrderedDict())[channel_id] = entry
+        
+        self._removed.discard(channel_id)
+        if persist:
+            self._dirty.add(channel_id)
+        
+        return entry
+    
+    def touch(self, channel_id: int, timestamp: Optional[int] = None) -> Optional[TicketActivity]:
+        """Registra atividade em um ticket, movendo-o para o fim da fila"""
+        entry = self._entries.get(channel_id)
+        if not entry:
+            return None
+        
+        entry.last_activity = timestamp if timestamp is not None else self.now()
+        entry.warned = False
+        self._by_guild[entry.guild_id][entry.category].move_to_end(channel_id)
+        self._dirty.add(channel_id)
+        
+        return entry
+    
+    def mark_warned(self, channel_id: int):
+        """Marca que o aviso de inatividade já foi enviado"""
+        entry = self._entries.get(channel_id)
+        if entry:
+            entry.warned = True
+            self._dirty.add(channel_id)
+    
+    def untrack(self, channel_id: int, persist: bool = True) -> Optional[TicketActivity]:
+        """Deixa de acompanhar um ticket (fechado ou deletado)"""
+        entry = self._entries.pop(channel_id, None)
+        if not entry:
+            return None
+        
+        categories = self._by_guild.get(entry.guild_id, {})
+        bucket = categories.get(entry.category)
+        if bucket is not None:
+            bucket.pop(channel_id, None)
+            if not bucket:
+                del categories[entry.category]
+            if not categories:
+                del self._by_guild[entry.guild_id]
+        
+        self._dirty.discard(channel_id)
+        if persist:
+            self._removed.add(channel_id)
+        
+        return entry
+    
+    def idle(self, warn_after, now: Optional[int] = None) -> Iterator[TicketActivity]:
+        """Percorre os tickets inativos há mais que o limite de aviso da categoria.
+        
+        `warn_after` recebe o nome da categoria e retorna o limite em
+        milissegundos (ou None para desativar a categoria).
+        """
+        now = now if now is not None else self.now()
+        
+        for categories in list(self._by_guild.values()):
+            for category, bucket in list(categories.items()):
+                threshold = warn_after(category)
+                if not threshold:
+                    continue
+                
+                for entry in list(bucket.values()):
+                    if now - entry.last_activity < threshold:
+                        break
+                    yield entry
+    
+    def guild_ids(self) -> List[int]:
+        """Servidores com tickets em memória"""
+        return list(self._by_guild)
+    
+    def evict_guild(self, guild_id: int) -> int:
+        """Descarta da memória os tickets de um servidor, sem alterar o banco"""
+        categories = self._by_guild.pop(guild_id, {})
+        count = 0
+        for bucket in categories.values():
+            for channel_id in bucket:
+                self._entries.pop(channel_id, None)
+                self._dirty.discard(channel_id)
+                self._removed.discard(channel_id)
+                count += 1
+        return count
+    
+    async def load(self, guild_id: Optional[int] = None):
+        """Carrega os tickets abertos (de todos os servidores ou de um só) do banco de dados"""
+        rows = await self.db.get_open_ticket_activity(guild_id)
+        
+        if guild_id is None:
+            self._entries.clear()
+            self._by_guild.clear()
+            self._dirty.clear()
+            self._removed.clear()
+        else:
+            self.evict_guild(guild_id)
+        
+        # Ordena pela última atividade para manter as filas ordenadas
+        entries = []
+        for row in rows:
+            last_activity = row["last_activity"]
+            if last_activity is None:
+                last_activity = row["created_at"] or self.now()
+            entries.append((last_activity, row))
+        
+        entries.sort(key=lambda item: item[0])
+        
+        for last_activity, row in entries:
+            self.track(
+                ticket_id=row["ticket_id"],
+                guild_id=row["guild_id"],
+                channel_id=row["channel_id"],
+                user_id=row["user_id"],
+                category=row["category"],
+                last_activity=last_activity,
+                warned=bool(row["warned"]),
+                persist=False
+            )
+    
+    async def flush(self):
+        """Persiste as alterações pendentes no banco de dados"""
+        if not self._dirty and not self._removed:
+            return
+        
+        dirty, self._dirty = self._dirty, set()
+        removed, self._removed = self._removed, set()
+        
+        rows = [
+            (entry.channel_id, entry.ticket_id, entry.last_activity, int(entry.warned))
+            for entry in (self._entries.get(channel_id) for channel_id in dirty)
+            if entry
+        ]
+        
+        try:
+            await self.db.save_ticket_activity(rows, removed)
+        except Exception:
+            # Mantém as alterações para a próxima tentativa
+            self._dirty |= {row[0] for row in rows if row[0] in self._entries}
+            self._removed |= removed
+            raise
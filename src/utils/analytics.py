@@ -0,0 +1,215 @@
+import json
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.records import Ticket
+from utils.timeutils import elapsed_seconds
+
+# Métricas acompanhadas (em segundos)
+FIRST_RESPONSE = "first_response"
+RESOLUTION = "resolution"
+
+# Dimensões de agregação
+DIMENSIONS = ("guild", "category", "urgency", "staff")
+
+# (guild_id, métrica, dimensão, chave)
+SketchKey = Tuple[int, str, str, str]
+
+class QuantileSketch:
+    """Sketch de quantis com erro relativo limitado (estilo DDSketch).
+    
+    Cada valor cai em um bucket logarítmico, então o quantil estimado fica a
+    no máximo `relative_accuracy` do valor real usando memória proporcional
+    ao log do intervalo de valores, independente de quantos foram inseridos.
+    """
+    
+    __slots__ = ("relative_accuracy", "_gamma_log", "buckets", "zeros", "count", "total", "min", "max")
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._gamma_log = math.log(gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float):
+        """Adiciona um valor (negativos são tratados como zero)"""
+        value = max(value, 0.0)
+        
+        if value < 1e-9:
+            self.zeros += 1
+        else:
+            index = math.ceil(math.log(value) / self._gamma_log)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estima o quantil `q` (entre 0 e 1)"""
+        if not self.count:
+            return None
+        
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+        
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Ponto médio do bucket em escala logarítmica
+                estimate = 2 * math.exp(index * self._gamma_log) / (1 + math.exp(self._gamma_log))
+                return min(max(estimate, self.min), self.max)
+        
+        return self.max
+    
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+    
+    def to_json(self) -> str:
+        return json.dumps({
+            "a": self.relative_accuracy,
+            "b": self.buckets,
+            "z": self.zeros,
+            "n": self.count,
+            "s": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        })
+    
+    @classmethod
+    def from_json(cls, data: str) -> "QuantileSketch":
+        raw = json.loads(data)
+        sketch = cls(raw.get("a", 0.01))
+        sketch.buckets = {int(index): count for index, count in raw.get("b", {}).items()}
+        sketch.zeros = raw.get("z", 0)
+        sketch.count = raw.get("n", 0)
+        sketch.total = raw.get("s", 0.0)
+        if sketch.count:
+            sketch.min = raw["min"]
+            sketch.max = raw["max"]
+        return sketch
+
+
+class Analytics:
+    """Métricas de SLA incrementais por servidor, categoria, urgência e staff.
+    
+    Os sketches são atualizados nos eventos de claim e fechamento e ficam em
+    memória, separados por servidor, então as consultas não dependem do
+    tamanho do histórico. O estado é persistido em `analytics_sketches`
+    periodicamente.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        # guild_id -> (métrica, dimensão, chave) -> sketch
+        self._sketches: Dict[int, Dict[Tuple[str, str, str], QuantileSketch]] = {}
+        self._dirty: Set[SketchKey] = set()
+    
+    def _observe(self, guild_id: int, metric: str, dimensions: Dict[str, str], value: float):
+        """Adiciona um valor em todas as dimensões informadas"""
+        sketches = self._sketches.setdefault(guild_id, {})
+        
+        for dimension, key in dimensions.items():
+            if key is None:
+                continue
+            sketch_key = (metric, dimension, str(key))
+            sketch = sketches.get(sketch_key)
+            if sketch is None:
+                sketch = sketches[sketch_key] = QuantileSketch()
+            sketch.add(value)
+            self._dirty.add((guild_id, *sketch_key))
+    
+    def record_first_response(self, ticket_data: Ticket, staff_id: int, at: Optional[int] = None):
+        """Registra o tempo até o primeiro claim de um ticket"""
+        elapsed = elapsed_seconds(ticket_data.created_at, at)
+        if elapsed is None:
+            return
+        
+        self._observe(ticket_data.guild_id, FIRST_RESPONSE, {
+            "guild": "all",
+            "category": ticket_data.category,
+            "urgency": ticket_data.urgency,
+            "staff": staff_id
+        }, elapsed)
+    
+    def record_close(self, ticket_data: Ticket, closer_id: int, at: Optional[int] = None):
+        """Registra o tempo até o fechamento de um ticket"""
+        elapsed = elapsed_seconds(ticket_data.created_at, at)
+        if elapsed is None:
+            return
+        
+        self._observe(ticket_data.guild_id, RESOLUTION, {
+            "guild": "all",
+            "category": ticket_data.category,
+            "urgency": ticket_data.urgency,
+            "staff": ticket_data.claimed_by or closer_id
+        }, elapsed)
+    
+    def get(self, guild_id: int, metric: str, dimension: str = "guild",
+            key: str = "all") -> Optional[QuantileSketch]:
+        """Obtém o sketch de uma métrica em uma dimensão"""
+        return self._sketches.get(guild_id, {}).get((metric, dimension, str(key)))
+    
+    def summary(self, guild_id: int, metric: str, dimension: str = "guild",
+                key: str = "all") -> Optional[Dict]:
+        """Resumo com contagem, média e percentis p50/p90/p99"""
+        sketch = self.get(guild_id, metric, dimension, key)
+        if not sketch or not sketch.count:
+            return None
+        
+        return {
+            "count": sketch.count,
+            "mean": sketch.mean,
+            "p50": sketch.quantile(0.50),
+            "p90": sketch.quantile(0.90),
+            "p99": sketch.quantile(0.99)
+        }
+    
+    def guild_ids(self) -> List[int]:
+        """Servidores com sketches em memória"""
+        return list(self._sketches)
+    
+    def evict_guild(self, guild_id: int):
+        """Descarta da memória os sketches de um servidor (chame flush antes)"""
+        self._sketches.pop(guild_id, None)
+        self._dirty = {sketch_key for sketch_key in self._dirty if sketch_key[0] != guild_id}
+    
+    async def load(self, guild_id: Optional[int] = None):
+        """Carrega os sketches persistidos (de todos os servidores ou de um só)"""
+        rows = await self.db.get_analytics_sketches(guild_id)
+        
+        if guild_id is None:
+            self._sketches = {}
+            self._dirty.clear()
+        else:
+            self.evict_guild(guild_id)
+        
+        for row_guild_id, metric, dimension, key, data in rows:
+            self._sketches.setdefault(row_guild_id, {})[(metric, dimension, key)] = QuantileSketch.from_json(data)
+    
+    async def flush(self):
+        """Persiste os sketches alterados desde o último flush"""
+        if not self._dirty:
+            return
+        
+        dirty, self._dirty = self._dirty, set()
+        rows: List[tuple] = []
+        for guild_id, metric, dimension, key in dirty:
+            sketch = self._sketches.get(guild_id, {}).get((metric, dimension, key))
+            if sketch is not None:
+                rows.append((guild_id, metric, dimension, key, sketch.to_json()))
+        
+        try:
+            await self.db.save_analytics_sketches(rows)
+        except Exception:
+            self._dirty |= dirty
+            raise
@@ -0,0 +1,151 @@
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+import discord
+
+from utils.config import MAX_SELECT_OPTIONS
+
+# Emoji usado quando a categoria não tem um (ou o salvo não é válido)
+DEFAULT_CATEGORY_EMOJI = "📝"
+
+# Caracteres que só aparecem junto de um emoji: ZWJ, seletor de variação, keycap,
+# tons de pele e tags das bandeiras regionais
+_EMOJI_JOINERS = {"\u200d", "\ufe0f", "\u20e3"}
+
+def normalize_category_key(value: str) -> str:
+    """Chave de categoria como é salva no banco (ex: "Suporte VIP" -> "suporte-vip")"""
+    return value.lower().strip().replace(" ", "-")[:50]
+
+
+def _is_unicode_emoji(text: str) -> bool:
+    if not text or len(text) > 16:
+        return False
+    
+    has_symbol = "\u20e3" in text  # keycap (1️⃣, #️⃣)
+    for char in text:
+        code = ord(char)
+        if unicodedata.category(char) == "So" or 0x1F1E6 <= code <= 0x1F1FF:
+            has_symbol = True
+        elif (char in _EMOJI_JOINERS or 0x1F3FB <= code <= 0x1F3FF or 0xE0020 <= code <= 0xE007F
+              or char in "0123456789#*"):
+            continue
+        elif unicodedata.category(char) in ("Po", "Sm") and "\ufe0f" in text:
+            # ‼️, ⁉️ e outros sinais que viram emoji com o seletor de variação
+            has_symbol = True
+        else:
+            return False
+    return has_symbol
+
+
+def parse_category_emoji(value: Optional[str]) -> Optional[str]:
+    """Emoji aceito pelo Discord em um SelectOption (unicode ou `<:nome:id>`), ou None se inválido"""
+    if not value:
+        return None
+    
+    emoji = discord.PartialEmoji.from_str(value.strip())
+    if emoji.id is not None:
+        return str(emoji)
+    if _is_unicode_emoji(emoji.name):
+        return emoji.name
+    return None
+
+
+class GuildCategory(NamedTuple):
+    """Categoria de ticket de um servidor"""
+    key: str
+    name: str
+    emoji: str
+    description: str
+    target_category_id: Optional[int] = None
+    sla_minutes: Optional[int] = None
+    
+    def to_dict(self) -> dict:
+        """Formato de dicionário usado pelos embeds de painel"""
+        return {"name": self.name, "emoji": self.emoji, "description": self.description}
+
+
+class GuildCategories:
+    """Categorias de um servidor já compiladas para uso nas interações"""
+    
+    __slots__ = ("guild_id", "categories", "select_options", "placeholder", "from_config")
+    
+    def __init__(self, guild_id: int, categories: Tuple[GuildCategory, ...], from_config: bool):
+        self.guild_id = guild_id
+        self.from_config = from_config
+        self.categories: Mapping[str, GuildCategory] = MappingProxyType(
+            {category.key: category for category in categories}
+        )
+        self.select_options: Tuple[discord.SelectOption, ...] = tuple(
+            discord.SelectOption(
+                label=category.name[:100],
+                value=category.key,
+                description=category.description[:100],
+                emoji=category.emoji
+            )
+            for category in categories
+        )
+        self.placeholder = ", ".join(self.categories)[:100]
+    
+    def get(self, key: str) -> Optional[GuildCategory]:
+        return self.categories.get(key)
+
+
+class CategoryRegistry:
+    """Cache das categorias de cada servidor.
+    
+    Servidores sem categorias próprias usam as do config.json. O resultado
+    compilado (incluindo as opções do select menu) fica em cache até as
+    categorias do servidor mudarem ou o config.json ser recarregado.
+    """
+    
+    def __init__(self, db, config_service):
+        self.db = db
+        self.config_service = config_service
+        self._cache: Dict[int, GuildCategories] = {}
+        config_service.add_listener(self._on_config_reload)
+    
+    async def get(self, guild_id: int) -> GuildCategories:
+        """Obtém as categorias compiladas de um servidor"""
+        compiled = self._cache.get(guild_id)
+        if compiled is None:
+            compiled = self._cache[guild_id] = await self._compile(guild_id)
+        return compiled
+    
+    def get_cached(self, guild_id: int) -> Optional[GuildCategories]:
+        """Obtém as categorias apenas se já estiverem em cache"""
+        return self._cache.get(guild_id)
+    
+    def invalidate(self, guild_id: int):
+        """Descarta o cache de um servidor (após alterar suas categorias)"""
+        self._cache.pop(guild_id, None)
+    
+    def _on_config_reload(self, snapshot):
+        """Descarta os servidores que usam as categorias do config.json"""
+        for guild_id in [guild_id for guild_id, compiled in self._cache.items() if compiled.from_config]:
+            del self._cache[guild_id]
+    
+    async def _compile(self, guild_id: int) -> GuildCategories:
+        rows = await self.db.get_guild_categories(guild_id)
+        
+        if rows:
+            categories = tuple(
+                GuildCategory(
+                    key=row["category_key"],
+                    name=row["name"],
+                    # Valores salvos antes da validação não podem derrubar o select do servidor
+                    emoji=parse_category_emoji(row["emoji"]) or DEFAULT_CATEGORY_EMOJI,
+                    description=row["description"] or "",
+                    target_category_id=row["target_category_id"],
+                    sla_minutes=row["sla_minutes"]
+                )
+                for row in rows[:MAX_SELECT_OPTIONS]
+            )
+            return GuildCategories(guild_id, categories, from_config=False)
+        
+        snapshot = self.config_service.snapshot
+        categories = tuple(
+            GuildCategory(key=info.key, name=info.name, emoji=info.emoji, description=info.description)
+            for info in snapshot.categories.values()
+        )
+        return GuildCategories(guild_id, categories, from_config=True)
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = "data/locks"
+
+# O Discord aceita uma identificação no gateway a cada 5 segundos por bot
+IDENTIFY_INTERVAL = 5.0
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """Shard responsável por um servidor (regra de distribuição do Discord)"""
+    return (guild_id >> 22) % shard_count
+
+
+def shard_ranges(shard_count: int, clusters: int) -> List[List[int]]:
+    """Divide os shards em faixas contíguas, uma por processo"""
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    
+    ranges = []
+    start = 0
+    for index in range(clusters):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class FileLock:
+    """Trava exclusiva entre processos baseada em arquivo.
+    
+    Usada pelos processos do cluster para tarefas que precisam de um único
+    executor por vez (migrações do banco, sincronização de comandos e
+    identificação no gateway). Também funciona com um único processo.
+    """
+    
+    def __init__(self, name: str, directory: str = LOCK_DIR):
+        self.path = os.path.join(directory, f"{name}.lock")
+        self._file = None
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Obtém a trava, bloqueando até `timeout` segundos (None = sem limite)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        file = open(self.path, "a+")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                self._file = file
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    file.close()
+                    return False
+                time.sleep(0.05)
+    
+    def release(self):
+        """Libera a trava"""
+        if not self._file:
+            return
+        
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+    
+    async def __aenter__(self):
+        # A espera acontece em uma thread para não travar o event loop
+        await asyncio.to_thread(self.acquire)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+async def wait_for_identify(interval: float = IDENTIFY_INTERVAL, directory: str = LOCK_DIR):
+    """Espera a vez deste processo de se identificar no gateway.
+    
+    O instante da última identificação do cluster fica em `identify.last`,
+    ao lado da trava; só se espera o que falta da janela de `interval`
+    segundos (nada, se ninguém se identificou recentemente).
+    """
+    path = os.path.join(directory, "identify.last")
+    async with FileLock("identify", directory):
+        try:
+            with open(path, "r") as file:
+                last = float(file.read().strip() or 0)
+        except (OSError, ValueError):
+            last = 0.0
+        
+        remaining = last + interval - time.time()
+        if remaining > 0:
+            # Limitado a uma janela, caso o relógio tenha voltado
+            await asyncio.sleep(min(remaining, interval))
+        
+        with open(path, "w") as file:
+            file.write(repr(time.time()))
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+from types import MappingProxyType
+from typing import Any, Callable, List, Mapping, NamedTuple, Optional, Tuple
+
+import discord
+
+from utils.timeutils import HOUR_MS
+
+# Limite de opções de um select menu do Discord
+MAX_SELECT_OPTIONS = 25
+
+class ConfigError(ValueError):
+    """Erro de validação do config.json"""
+
+
+class CategoryInfo(NamedTuple):
+    """Metadados imutáveis de uma categoria de ticket"""
+    key: str
+    name: str
+    emoji: str
+    description: str
+    inactivity: Mapping[str, Any]
+    
+    def to_dict(self) -> dict:
+        """Formato de dicionário usado pelos embeds de painel"""
+        return {"name": self.name, "emoji": self.emoji, "description": self.description}
+
+
+def _freeze(value):
+    """Converte dicts e listas em estruturas somente leitura"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _validate_inactivity(settings, where: str) -> Mapping[str, Any]:
+    """Valida um bloco de limites de inatividade"""
+    if settings is None:
+        return MappingProxyType({})
+    if not isinstance(settings, dict):
+        raise ConfigError(f"{where}: 'inactivity' deve ser um objeto")
+    
+    for key in ("warn_after_hours", "close_after_hours", "check_interval_minutes"):
+        value = settings.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value < 0):
+            raise ConfigError(f"{where}: '{key}' deve ser um número maior ou igual a zero")
+    
+    return _freeze(settings)
+
+
+# Valores padrão do bloco "cache" (aplicado apenas na inicialização)
+CACHE_DEFAULTS = {
+    "members": "none",
+    "chunk_guilds_at_startup": False,
+    "max_messages": None,
+    "member_lru_size": 1000,
+    "ticket_messages": 200
+}
+
+MEMBER_CACHE_MODES = ("none", "joined", "voice", "all")
+
+def _validate_cache(settings) -> Mapping[str, Any]:
+    """Valida o bloco de cache do gateway, completando com os padrões"""
+    if settings is None:
+        settings = {}
+    if not isinstance(settings, dict):
+        raise ConfigError("'cache' deve ser um objeto")
+    
+    merged = {**CACHE_DEFAULTS, **settings}
+    
+    if merged["members"] not in MEMBER_CACHE_MODES:
+        raise ConfigError(f"cache: 'members' deve ser um de {', '.join(MEMBER_CACHE_MODES)}")
+    if not isinstance(merged["chunk_guilds_at_startup"], bool):
+        raise ConfigError("cache: 'chunk_guilds_at_startup' deve ser true ou false")
+    if merged["max_messages"] is not None and (not isinstance(merged["max_messages"], int) or merged["max_messages"] < 0):
+        raise ConfigError("cache: 'max_messages' deve ser um inteiro maior ou igual a zero (ou null)")
+    for key in ("member_lru_size", "ticket_messages"):
+        if not isinstance(merged[key], int) or merged[key] < 1:
+            raise ConfigError(f"cache: '{key}' deve ser um inteiro positivo")
+    
+    return _freeze(merged)
+
+
+# Valores padrão do bloco "logs"
+LOGS_DEFAULTS = {
+    "delivery": "channel"
+}
+
+# channel: enviados pelo bot; webhook: por um webhook do canal de logs (limites de taxa próprios)
+LOG_DELIVERY_MODES = ("channel", "webhook")
+
+def _validate_logs(settings) -> Mapping[str, Any]:
+    """Valida o bloco de entrega dos logs, completando com os padrões"""
+    if settings is None:
+        settings = {}
+    if not isinstance(settings, dict):
+        raise ConfigError("'logs' deve ser um objeto")
+    
+    merged = {**LOGS_DEFAULTS, **settings}
+    
+    if merged["delivery"] not in LOG_DELIVERY_MODES:
+        raise ConfigError(f"logs: 'delivery' deve ser um de {', '.join(LOG_DELIVERY_MODES)}")
+    
+    return _freeze(merged)
+
+
+class ConfigSnapshot:
+    """Configuração já validada e pré-processada, tratada como imutável.
+    
+    Um novo snapshot é criado a cada recarga; quem precisa da configuração
+    lê sempre `ConfigService.snapshot` em vez de guardar valores.
+    """
+    
+    __slots__ = ("version", "raw", "bot_name", "color", "inactivity", "cache", "logs", "categories",
+                 "select_options", "category_placeholder")
+    
+    def __init__(self, data: dict, version: int = 1):
+        if not isinstance(data, dict):
+            raise ConfigError("o config.json deve conter um objeto")
+        
+        bot_name = data.get("bot_name", "Ticket Bot")
+        if not isinstance(bot_name, str) or not bot_name.strip():
+            raise ConfigError("'bot_name' deve ser um texto não vazio")
+        
+        try:
+            color = int(str(data.get("bot_color", "0x5865F2")), 16)
+        except ValueError:
+            raise ConfigError("'bot_color' deve ser uma cor hexadecimal (ex: 0x5865F2)")
+        
+        raw_categories = data.get("categories", {})
+        if not isinstance(raw_categories, dict):
+            raise ConfigError("'categories' deve ser um objeto")
+        if len(raw_categories) > MAX_SELECT_OPTIONS:
+            raise ConfigError(f"no máximo {MAX_SELECT_OPTIONS} categorias são suportadas")
+        
+        categories = {}
+        for key, info in raw_categories.items():
+            if not isinstance(info, dict):
+                raise ConfigError(f"categoria '{key}' deve ser um objeto")
+            categories[key] = CategoryInfo(
+                key=key,
+                name=str(info.get("name", key.capitalize())),
+                emoji=str(info.get("emoji", "📝")),
+                description=str(info.get("description", "")),
+                inactivity=_validate_inactivity(info.get("inactivity"), f"categoria '{key}'")
+            )
+        
+        self.version = version
+        self.raw = _freeze(data)
+        self.bot_name = bot_name
+        self.color = color
+        self.inactivity = _validate_inactivity(data.get("inactivity"), "config")
+        self.cache = _validate_cache(data.get("cache"))
+        self.logs = _validate_logs(data.get("logs"))
+        self.categories: Mapping[str, CategoryInfo] = MappingProxyType(categories)
+        
+        # Opções do select menu montadas uma única vez por snapshot
+        self.select_options: Tuple[discord.SelectOption, ...] = tuple(
+            discord.SelectOption(
+                label=info.name[:100],
+                value=key,
+                description=info.description[:100],
+                emoji=info.emoji
+            )
+            for key, info in categories.items()
+        )
+        self.category_placeholder = ", ".join(categories)[:100]
+    
+    def member_cache_flags(self, intents: discord.Intents) -> discord.MemberCacheFlags:
+        """Flags do cache de membros do discord.py conforme `cache.members`"""
+        mode = self.cache["members"]
+        if mode == "all":
+            return discord.MemberCacheFlags.from_intents(intents)
+        if mode == "joined":
+            return discord.MemberCacheFlags(joined=True, voice=False)
+        if mode == "voice":
+            return discord.MemberCacheFlags(joined=False, voice=True)
+        return discord.MemberCacheFlags.none()
+    
+    def get_category(self, key: str) -> Optional[CategoryInfo]:
+        """Obtém os metadados de uma categoria"""
+        return self.categories.get(key)
+    
+    def inactivity_threshold(self, category: str, key: str) -> Optional[int]:
+        """Limite de inatividade (em ms) de uma categoria, ou None se desativado"""
+        info = self.categories.get(category)
+        overrides = info.inactivity if info else {}
+        
+        hours = overrides.get(key, self.inactivity.get(key))
+        if not hours:
+            return None
+        return int(hours * HOUR_MS)
+
+
+class ConfigService:
+    """Mantém o snapshot atual do config.json e recarrega quando o arquivo muda"""
+    
+    def __init__(self, path: str = "config.json"):
+        self.path = path
+        self._listeners: List[Callable[[ConfigSnapshot], Any]] = []
+        self._stamp = self._file_stamp()
+        self.snapshot = ConfigSnapshot(self._read())
+    
+    def _read(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError as e:
+                raise ConfigError(f"JSON inválido: {e}")
+    
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def add_listener(self, callback: Callable[[ConfigSnapshot], Any]):
+        """Registra uma função chamada após cada troca de snapshot"""
+        self._listeners.append(callback)
+    
+    def reload(self) -> bool:
+        """Relê o arquivo; troca o snapshot apenas se a nova versão for válida"""
+        self._stamp = self._file_stamp()
+        
+        try:
+            snapshot = ConfigSnapshot(self._read(), version=self.snapshot.version + 1)
+        except (OSError, ConfigError) as e:
+            print(f"Configuração não recarregada, mantendo a versão atual: {e}")
+            return False
+        
+        self.snapshot = snapshot
+        print(f"Configuração recarregada (versão {snapshot.version}).")
+        
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Erro ao aplicar nova configuração: {e}")
+        
+        return True
+    
+    async def watch(self, interval: float = 5.0):
+        """Verifica periodicamente se o arquivo mudou e recarrega"""
+        while True:
+            await asyncio.sleep(interval)
+            if self._file_stamp() != self._stamp:
+                self.reload()
@@ -1,15 +1,103 @@
 import aiosqlite
 import json
-from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 
+from utils.metrics import DB_SECONDS, instrument_methods
+from utils.records import GuildConfig, LogOutboxEntry, Panel, Ticket, TicketLog
+from utils.timeutils import ms_to_day, now_ms
+
+# Versão do esquema (PRAGMA user_version)
+# 1: timestamps em milissegundos (INTEGER) em tickets, panels e ticket_logs
+SCHEMA_VERSION = 1
+
+TICKETS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        ticket_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER,
+        channel_id INTEGER UNIQUE,
+        user_id INTEGER,
+        category TEXT,
+        reason TEXT,
+        description TEXT,
+        urgency TEXT,
+        claimed_by INTEGER,
+        status TEXT DEFAULT 'open',
+        created_at INTEGER,
+        closed_at INTEGER,
+        close_reason TEXT
+    )
+"""
+
+PANELS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        panel_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER,
+        channel_id INTEGER,
+        message_id INTEGER UNIQUE,
+        panel_type TEXT,
+        created_at INTEGER
+    )
+"""
+
+TICKET_LOGS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticket_id INTEGER,
+        user_id INTEGER,
+        action TEXT,
+        details TEXT,
+        timestamp INTEGER
+    )
+"""
+
+# Índices para filtros e ordenação por intervalo de tempo
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status)",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_user ON tickets (guild_id, user_id, status)",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets (guild_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_tickets_closed ON tickets (guild_id, closed_at)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_logs_ticket ON ticket_logs (ticket_id, action)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_logs_timeline ON ticket_logs (ticket_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_ticket_logs_timestamp ON ticket_logs (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_panels_guild ON panels (guild_id)",
+    "CREATE INDEX IF NOT EXISTS idx_log_outbox_due ON log_outbox (next_attempt_at)",
+    "CREATE INDEX IF NOT EXISTS idx_log_outbox_channel ON log_outbox (channel_id, next_attempt_at)",
+)
+
+# Espera máxima (segundos) por uma escrita de outro processo do cluster antes de
+# falhar com "database is locked". O SQLite tem um único escritor por vez: com WAL
+# as leituras não esperam, e as escritas (curtas) entram em fila por esse tempo.
+DB_BUSY_TIMEOUT = 30.0
+
+# Soma os contadores de uma linha de `daily_rollups` que já existe
+ROLLUP_UPSERT = """
+    ON CONFLICT(guild_id, day, category, urgency, staff_id) DO UPDATE SET
+        opened = opened + excluded.opened,
+        claimed = claimed + excluded.claimed,
+        closed = closed + excluded.closed,
+        first_response_total = first_response_total + excluded.first_response_total,
+        first_response_count = first_response_count + excluded.first_response_count,
+        resolution_total = resolution_total + excluded.resolution_total,
+        resolution_count = resolution_count + excluded.resolution_count"""
+
+# Converte um timestamp ISO (UTC) em milissegundos no SQLite
+ISO_TO_MS = "CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)"
+
+@instrument_methods(DB_SECONDS)
 class Database:
     def __init__(self, db_path: str = "data/tickets.db"):
         self.db_path = db_path
+    
+    def _connect(self) -> aiosqlite.Connection:
+        """Abre uma conexão com o banco (usada com `async with`)"""
+        return aiosqlite.connect(self.db_path, timeout=DB_BUSY_TIMEOUT)
         
     async def init_db(self):
         """Inicializa o banco de dados com as tabelas necessárias"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            # WAL permite leituras enquanto outro processo do cluster escreve
+            await db.execute("PRAGMA journal_mode = WAL")
+            
             # Tabela de configurações do servidor
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS guild_config (
@@ -22,74 +110,199 @@ class Database:
                 )
             """)
             
-            # Tabela de tickets
+            # Tabelas de tickets, painéis fixos e logs de ações
+            await db.execute(TICKETS_SCHEMA.format(table="tickets"))
+            await db.execute(PANELS_SCHEMA.format(table="panels"))
+            await db.execute(TICKET_LOGS_SCHEMA.format(table="ticket_logs"))
+            
+            # Tabela de última atividade dos tickets abertos
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS ticket_activity (
+                    channel_id INTEGER PRIMARY KEY,
+                    ticket_id INTEGER,
+                    last_activity INTEGER,
+                    warned INTEGER DEFAULT 0
+                )
+            """)
+            
+            # Tabelas de estatísticas agregadas de mensagens
             await db.execute("""
-                CREATE TABLE IF NOT EXISTS tickets (
-                    ticket_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                CREATE TABLE IF NOT EXISTS ticket_stats (
+                    ticket_id INTEGER PRIMARY KEY,
                     guild_id INTEGER,
-                    channel_id INTEGER UNIQUE,
+                    messages INTEGER DEFAULT 0,
+                    characters INTEGER DEFAULT 0,
+                    first_staff_response_at INTEGER,
+                    last_message_at INTEGER
+                )
+            """)
+            
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS ticket_participants (
+                    ticket_id INTEGER,
                     user_id INTEGER,
+                    messages INTEGER DEFAULT 0,
+                    characters INTEGER DEFAULT 0,
+                    PRIMARY KEY (ticket_id, user_id)
+                ) WITHOUT ROWID
+            """)
+            
+            # Sketches de métricas de SLA
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS analytics_sketches (
+                    guild_id INTEGER,
+                    metric TEXT,
+                    dimension TEXT,
+                    dim_key TEXT,
+                    data TEXT,
+                    PRIMARY KEY (guild_id, metric, dimension, dim_key)
+                ) WITHOUT ROWID
+            """)
+            
+            # Agregados diários para relatórios
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS daily_rollups (
+                    guild_id INTEGER,
+                    day TEXT,
                     category TEXT,
-                    reason TEXT,
-                    description TEXT,
                     urgency TEXT,
-                    claimed_by INTEGER,
-                    status TEXT DEFAULT 'open',
-                    created_at TEXT,
-                    closed_at TEXT,
-                    close_reason TEXT
+                    staff_id INTEGER DEFAULT 0,
+                    opened INTEGER DEFAULT 0,
+                    claimed INTEGER DEFAULT 0,
+                    closed INTEGER DEFAULT 0,
+                    first_response_total REAL DEFAULT 0,
+                    first_response_count INTEGER DEFAULT 0,
+                    resolution_total REAL DEFAULT 0,
+                    resolution_count INTEGER DEFAULT 0,
+                    PRIMARY KEY (guild_id, day, category, urgency, staff_id)
+                ) WITHOUT ROWID
+            """)
+            
+            # Categorias de ticket de cada servidor
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS guild_categories (
+                    guild_id INTEGER,
+                    category_key TEXT,
+                    name TEXT,
+                    emoji TEXT,
+                    description TEXT,
+                    target_category_id INTEGER,
+                    sla_minutes INTEGER,
+                    position INTEGER DEFAULT 0,
+                    PRIMARY KEY (guild_id, category_key)
+                ) WITHOUT ROWID
+            """)
+            
+            # Último número de ticket usado em cada servidor
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS ticket_counters (
+                    guild_id INTEGER PRIMARY KEY,
+                    last_number INTEGER NOT NULL
                 )
             """)
             
-            # Tabela de painéis fixos
+            # Logs aguardando envio ao canal de logs (embed em JSON e anexo opcional)
             await db.execute("""
-                CREATE TABLE IF NOT EXISTS panels (
-                    panel_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                CREATE TABLE IF NOT EXISTS log_outbox (
+                    outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
                     guild_id INTEGER,
                     channel_id INTEGER,
-                    message_id INTEGER UNIQUE,
-                    panel_type TEXT,
-                    created_at TEXT
+                    embed TEXT,
+                    filename TEXT,
+                    file_data BLOB,
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at INTEGER,
+                    created_at INTEGER
                 )
             """)
             
-            # Tabela de logs de ações
+            # Hash da árvore de comandos sincronizada por escopo
             await db.execute("""
-                CREATE TABLE IF NOT EXISTS ticket_logs (
-                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticket_id INTEGER,
-                    user_id INTEGER,
-                    action TEXT,
-                    details TEXT,
-                    timestamp TEXT
+                CREATE TABLE IF NOT EXISTS command_sync (
+                    scope TEXT PRIMARY KEY,
+                    tree_hash TEXT NOT NULL,
+                    synced_at INTEGER
                 )
             """)
             
             await db.commit()
+            
+            # Migrações de esquema
+            async with db.execute("PRAGMA user_version") as cursor:
+                version = (await cursor.fetchone())[0]
+            
+            if version < 1:
+                await self._migrate_epoch_timestamps(db)
+            
+            if version < SCHEMA_VERSION:
+                await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            
+            for index in INDEXES:
+                await db.execute(index)
+            
+            await db.commit()
+    
+    async def _migrate_epoch_timestamps(self, db):
+        """Converte os timestamps ISO (TEXT) para milissegundos (INTEGER)"""
+        async with db.execute("PRAGMA table_info(tickets)") as cursor:
+            columns = {row[1]: row[2] for row in await cursor.fetchall()}
+        
+        # Banco criado já no formato novo
+        if columns.get("created_at", "").upper() == "INTEGER":
+            return
+        
+        tables = (
+            ("tickets", TICKETS_SCHEMA, ("created_at", "closed_at")),
+            ("panels", PANELS_SCHEMA, ("created_at",)),
+            ("ticket_logs", TICKET_LOGS_SCHEMA, ("timestamp",)),
+        )
+        
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            for table, schema, time_columns in tables:
+                async with db.execute(f"PRAGMA table_info({table})") as cursor:
+                    names = [row[1] for row in await cursor.fetchall()]
+                
+                selected = ", ".join(
+                    ISO_TO_MS.format(column=name) if name in time_columns else name
+                    for name in names
+                )
+                
+                await db.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+                await db.execute(schema.format(table=table))
+                await db.execute(
+                    f"INSERT INTO {table} ({', '.join(names)}) SELECT {selected} FROM {table}_legacy"
+                )
+                await db.execute(f"DROP TABLE {table}_legacy")
+            
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        
+        print("Migração concluída: timestamps convertidos para milissegundos.")
     
     # ===== CONFIGURAÇÕES DO SERVIDOR =====
-    async def get_guild_config(self, guild_id: int) -> Optional[Dict]:
+    async def get_guild_config(self, guild_id: int) -> Optional[GuildConfig]:
         """Obtém a configuração de um servidor"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            db.row_factory = GuildConfig.from_row
             async with db.execute(
-                "SELECT * FROM guild_config WHERE guild_id = ?", 
+                f"SELECT {GuildConfig.COLUMNS} FROM guild_config WHERE guild_id = ?", 
                 (guild_id,)
             ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return {
-                        "guild_id": row[0],
-                        "staff_role_id": row[1],
-                        "log_channel_id": row[2],
-                        "open_category_id": row[3],
-                        "closed_category_id": row[4],
-                        "config_data": json.loads(row[5]) if row[5] else {}
-                    }
-                return None
+                return await cursor.fetchone()
+    
+    async def get_guild_configs(self) -> List[GuildConfig]:
+        """Obtém a configuração de todos os servidores (carga na inicialização)"""
+        async with self._connect() as db:
+            db.row_factory = GuildConfig.from_row
+            async with db.execute(f"SELECT {GuildConfig.COLUMNS} FROM guild_config") as cursor:
+                return await cursor.fetchall()
     
     async def set_guild_config(self, guild_id: int, **kwargs):
         """Define ou atualiza configurações do servidor"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             config = await self.get_guild_config(guild_id)
             
             if config:
@@ -123,67 +336,177 @@ class Database:
             
             await db.commit()
     
+    # ===== CATEGORIAS DO SERVIDOR =====
+    async def get_guild_categories(self, guild_id: int) -> List[Dict]:
+        """Obtém as categorias de ticket de um servidor, na ordem de exibição"""
+        async with self._connect() as db:
+            async with db.execute(
+                """SELECT category_key, name, emoji, description, target_category_id, sla_minutes, position
+                   FROM guild_categories WHERE guild_id = ?
+                   ORDER BY position, category_key""",
+                (guild_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        "category_key": row[0],
+                        "name": row[1],
+                        "emoji": row[2],
+                        "description": row[3],
+                        "target_category_id": row[4],
+                        "sla_minutes": row[5],
+                        "position": row[6]
+                    }
+                    for row in rows
+                ]
+    
+    async def set_guild_category(self, guild_id: int, category_key: str, name: str,
+                                 emoji: Optional[str] = None, description: Optional[str] = None,
+                                 target_category_id: Optional[int] = None,
+                                 sla_minutes: Optional[int] = None, position: Optional[int] = None):
+        """Cria ou atualiza uma categoria de ticket do servidor"""
+        async with self._connect() as db:
+            if position is None:
+                async with db.execute(
+                    "SELECT COALESCE(MAX(position) + 1, 0) FROM guild_categories WHERE guild_id = ?",
+                    (guild_id,)
+                ) as cursor:
+                    position = (await cursor.fetchone())[0]
+            
+            await db.execute(
+                """INSERT INTO guild_categories
+                   (guild_id, category_key, name, emoji, description, target_category_id, sla_minutes, position)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(guild_id, category_key) DO UPDATE SET
+                       name = excluded.name,
+                       emoji = excluded.emoji,
+                       description = excluded.description,
+                       target_category_id = excluded.target_category_id,
+                       sla_minutes = excluded.sla_minutes""",
+                (guild_id, category_key, name, emoji, description, target_category_id, sla_minutes, position)
+            )
+            await db.commit()
+    
+    async def delete_guild_category(self, guild_id: int, category_key: str) -> bool:
+        """Remove uma categoria de ticket do servidor"""
+        async with self._connect() as db:
+            cursor = await db.execute(
+                "DELETE FROM guild_categories WHERE guild_id = ? AND category_key = ?",
+                (guild_id, category_key)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+    
+    # ===== SINCRONIZAÇÃO DE COMANDOS =====
+    async def get_command_hash(self, scope: str) -> Optional[str]:
+        """Obtém o hash da última árvore de comandos sincronizada em um escopo"""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT tree_hash FROM command_sync WHERE scope = ?",
+                (scope,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+    
+    async def set_command_hash(self, scope: str, tree_hash: str):
+        """Registra o hash da árvore de comandos sincronizada em um escopo"""
+        async with self._connect() as db:
+            await db.execute(
+                """INSERT INTO command_sync (scope, tree_hash, synced_at) VALUES (?, ?, ?)
+                   ON CONFLICT(scope) DO UPDATE SET
+                       tree_hash = excluded.tree_hash,
+                       synced_at = excluded.synced_at""",
+                (scope, tree_hash, now_ms())
+            )
+            await db.commit()
+    
     # ===== TICKETS =====
     async def create_ticket(self, guild_id: int, channel_id: int, user_id: int, 
                            category: str, reason: str, description: str, urgency: str) -> int:
         """Cria um novo ticket e retorna o ID"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """INSERT INTO tickets 
                    (guild_id, channel_id, user_id, category, reason, description, urgency, created_at)
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
                 (guild_id, channel_id, user_id, category, reason, description, urgency, 
-                 datetime.utcnow().isoformat())
+                 now_ms())
             )
             await db.commit()
             return cursor.lastrowid
     
-    async def get_ticket_by_channel(self, channel_id: int) -> Optional[Dict]:
+    async def next_ticket_number(self, guild_id: int) -> int:
+        """Reserva o próximo número de ticket de um servidor.
+        
+        O incremento e a leitura acontecem na mesma transação de escrita,
+        então processos diferentes nunca recebem o mesmo número.
+        """
+        async with self._connect() as db:
+            await db.execute(
+                """INSERT INTO ticket_counters (guild_id, last_number)
+                   VALUES (?, (SELECT COUNT(*) FROM tickets WHERE guild_id = ?) + 1)
+                   ON CONFLICT(guild_id) DO UPDATE SET last_number = last_number + 1""",
+                (guild_id, guild_id)
+            )
+            async with db.execute(
+                "SELECT last_number FROM ticket_counters WHERE guild_id = ?",
+                (guild_id,)
+            ) as cursor:
+                number = (await cursor.fetchone())[0]
+            await db.commit()
+            return number
+    
+    async def get_ticket_by_channel(self, channel_id: int) -> Optional[Ticket]:
         """Obtém informações de um ticket pelo ID do canal"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            db.row_factory = Ticket.from_row
             async with db.execute(
-                "SELECT * FROM tickets WHERE channel_id = ?", 
+                f"SELECT {Ticket.COLUMNS} FROM tickets WHERE channel_id = ?", 
                 (channel_id,)
             ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return {
-                        "ticket_id": row[0],
-                        "guild_id": row[1],
-                        "channel_id": row[2],
-                        "user_id": row[3],
-                        "category": row[4],
-                        "reason": row[5],
-                        "description": row[6],
-                        "urgency": row[7],
-                        "claimed_by": row[8],
-                        "status": row[9],
-                        "created_at": row[10],
-                        "closed_at": row[11],
-                        "close_reason": row[12]
-                    }
-                return None
+                return await cursor.fetchone()
     
-    async def get_user_open_tickets(self, guild_id: int, user_id: int) -> List[Dict]:
+    async def get_user_open_tickets(self, guild_id: int, user_id: int) -> List[Ticket]:
         """Obtém todos os tickets abertos de um usuário"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            db.row_factory = Ticket.from_row
             async with db.execute(
-                "SELECT * FROM tickets WHERE guild_id = ? AND user_id = ? AND status = 'open'",
+                f"SELECT {Ticket.COLUMNS} FROM tickets WHERE guild_id = ? AND user_id = ? AND status = 'open'",
                 (guild_id, user_id)
             ) as cursor:
-                rows = await cursor.fetchall()
-                return [
-                    {
-                        "ticket_id": row[0],
-                        "channel_id": row[2],
-                        "category": row[4]
-                    }
-                    for row in rows
-                ]
+                return await cursor.fetchall()
+    
+    async def get_tickets_created_between(self, guild_id: int, start_ms: int, end_ms: int,
+                                          limit: Optional[int] = None) -> List[Ticket]:
+        """Obtém os tickets criados em um intervalo [início, fim) em milissegundos"""
+        query = (
+            f"SELECT {Ticket.COLUMNS} "
+            "FROM tickets WHERE guild_id = ? AND created_at >= ? AND created_at < ? "
+            "ORDER BY created_at ASC"
+        )
+        params = [guild_id, start_ms, end_ms]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        async with self._connect() as db:
+            db.row_factory = Ticket.from_row
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+    
+    async def count_tickets_closed_between(self, guild_id: int, start_ms: int, end_ms: int) -> int:
+        """Conta os tickets fechados em um intervalo [início, fim) em milissegundos"""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT COUNT(*) FROM tickets WHERE guild_id = ? AND closed_at >= ? AND closed_at < ?",
+                (guild_id, start_ms, end_ms)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0]
     
     async def claim_ticket(self, channel_id: int, staff_id: int):
         """Marca um ticket como claimed por um staff"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "UPDATE tickets SET claimed_by = ? WHERE channel_id = ?",
                 (staff_id, channel_id)
@@ -192,79 +515,480 @@ class Database:
     
     async def disclaim_ticket(self, channel_id: int):
         """Remove o claim de um ticket"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "UPDATE tickets SET claimed_by = NULL WHERE channel_id = ?",
                 (channel_id,)
             )
             await db.commit()
     
-    async def close_ticket(self, channel_id: int, close_reason: str = None):
-        """Fecha um ticket"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE tickets SET status = 'closed', closed_at = ?, close_reason = ? WHERE channel_id = ?",
-                (datetime.utcnow().isoformat(), close_reason, channel_id)
+    async def close_ticket(self, channel_id: int, close_reason: str = None) -> bool:
+        """Fecha um ticket e retorna se ele estava aberto"""
+        async with self._connect() as db:
+            cursor = await db.execute(
+                """UPDATE tickets SET status = 'closed', closed_at = ?, close_reason = ?
+                   WHERE channel_id = ? AND status = 'open'""",
+                (now_ms(), close_reason, channel_id)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+    
+    async def get_open_ticket_channels(self) -> List[Tuple[int, int, int]]:
+        """Obtém (ticket_id, guild_id, channel_id) de todos os tickets abertos"""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT ticket_id, guild_id, channel_id FROM tickets WHERE status = 'open'"
+            ) as cursor:
+                return await cursor.fetchall()
+    
+    async def close_tickets(self, channel_ids: List[int], close_reason: str = None) -> List[Ticket]:
+        """Fecha vários tickets em uma única transação e retorna os que estavam abertos.
+        
+        Os fechamentos entram nos agregados diários na mesma transação, como
+        `rebuild_rollups` os contaria (staff do claim, ou nenhum).
+        """
+        if not channel_ids:
+            return []
+        
+        closed_at = now_ms()
+        tickets: List[Ticket] = []
+        async with self._connect() as db:
+            # A trava de escrita vale desde a leitura: outro processo não fecha os mesmos tickets no meio
+            await db.execute("BEGIN IMMEDIATE")
+            db.row_factory = Ticket.from_row
+            for start in range(0, len(channel_ids), 500):
+                chunk = channel_ids[start:start + 500]
+                async with db.execute(
+                    f"""SELECT {Ticket.COLUMNS} FROM tickets
+                        WHERE channel_id IN ({', '.join('?' * len(chunk))}) AND status = 'open'""",
+                    chunk
+                ) as cursor:
+                    tickets.extend(await cursor.fetchall())
+            
+            # Um incremento por (servidor, categoria, urgência, staff)
+            rollups: Dict[tuple, list] = {}
+            for ticket in tickets:
+                counters = rollups.setdefault(
+                    (ticket.guild_id, ticket.category, ticket.urgency, ticket.claimed_by or 0), [0, 0.0, 0]
+                )
+                counters[0] += 1
+                if ticket.created_at is not None:
+                    counters[1] += (closed_at - ticket.created_at) / 1000
+                    counters[2] += 1
+            
+            day = ms_to_day(closed_at)
+            await db.executemany(
+                """INSERT INTO daily_rollups
+                   (guild_id, day, category, urgency, staff_id, closed, resolution_total, resolution_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""" + ROLLUP_UPSERT,
+                [(guild_id, day, category, urgency, staff_id, *counters)
+                 for (guild_id, category, urgency, staff_id), counters in rollups.items()]
+            )
+            await db.executemany(
+                """UPDATE tickets SET status = 'closed', closed_at = ?, close_reason = ?
+                   WHERE ticket_id = ?""",
+                [(closed_at, close_reason, ticket.ticket_id) for ticket in tickets]
             )
             await db.commit()
+        return tickets
     
     # ===== PAINÉIS =====
     async def create_panel(self, guild_id: int, channel_id: int, message_id: int, panel_type: str):
         """Registra um painel fixo"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """INSERT INTO panels (guild_id, channel_id, message_id, panel_type, created_at)
                    VALUES (?, ?, ?, ?, ?)""",
-                (guild_id, channel_id, message_id, panel_type, datetime.utcnow().isoformat())
+                (guild_id, channel_id, message_id, panel_type, now_ms())
             )
             await db.commit()
     
-    async def get_panel(self, message_id: int) -> Optional[Dict]:
+    async def get_panel(self, message_id: int) -> Optional[Panel]:
         """Obtém informações de um painel"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            db.row_factory = Panel.from_row
             async with db.execute(
-                "SELECT * FROM panels WHERE message_id = ?",
+                f"SELECT {Panel.COLUMNS} FROM panels WHERE message_id = ?",
                 (message_id,)
             ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return {
-                        "panel_id": row[0],
-                        "guild_id": row[1],
-                        "channel_id": row[2],
-                        "message_id": row[3],
-                        "panel_type": row[4],
-                        "created_at": row[5]
-                    }
-                return None
+                return await cursor.fetchone()
     
+    async def get_panels(self, guild_ids: List[int]) -> List[Panel]:
+        """Obtém todos os painéis dos servidores informados"""
+        panels = []
+        async with self._connect() as db:
+            db.row_factory = Panel.from_row
+            # Em lotes, abaixo do limite de parâmetros por instrução do SQLite
+            for start in range(0, len(guild_ids), 500):
+                chunk = guild_ids[start:start + 500]
+                async with db.execute(
+                    f"SELECT {Panel.COLUMNS} FROM panels WHERE guild_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ) as cursor:
+                    panels.extend(await cursor.fetchall())
+        return panels
+    
+    async def delete_panels(self, message_ids: List[int]):
+        """Remove painéis cujas mensagens não existem mais"""
+        if not message_ids:
+            return
+        
+        async with self._connect() as db:
+            await db.executemany("DELETE FROM panels WHERE message_id = ?", [(i,) for i in message_ids])
+            await db.commit()
+
     # ===== LOGS =====
     async def add_log(self, ticket_id: int, user_id: int, action: str, details: str = None):
         """Adiciona um log de ação em um ticket"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """INSERT INTO ticket_logs (ticket_id, user_id, action, details, timestamp)
                    VALUES (?, ?, ?, ?, ?)""",
-                (ticket_id, user_id, action, details, datetime.utcnow().isoformat())
+                (ticket_id, user_id, action, details, now_ms())
             )
             await db.commit()
     
-    async def get_ticket_logs(self, ticket_id: int) -> List[Dict]:
+    async def has_log(self, ticket_id: int, action: str) -> bool:
+        """Verifica se um ticket já possui um log com a ação informada"""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT 1 FROM ticket_logs WHERE ticket_id = ? AND action = ? LIMIT 1",
+                (ticket_id, action)
+            ) as cursor:
+                return await cursor.fetchone() is not None
+    
+    async def get_ticket_logs(self, ticket_id: int) -> List[TicketLog]:
         """Obtém todos os logs de um ticket"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            db.row_factory = TicketLog.from_row
             async with db.execute(
-                "SELECT * FROM ticket_logs WHERE ticket_id = ? ORDER BY timestamp ASC",
+                f"SELECT {TicketLog.COLUMNS} FROM ticket_logs WHERE ticket_id = ? ORDER BY timestamp ASC",
                 (ticket_id,)
             ) as cursor:
+                return await cursor.fetchall()
+    
+    
+    # ===== OUTBOX DE LOGS =====
+    async def enqueue_log(self, guild_id: int, channel_id: int, embed: str,
+                          filename: Optional[str] = None, file_data: Optional[bytes] = None) -> int:
+        """Guarda um log para envio; nunca fica à frente de logs do canal que aguardam nova tentativa"""
+        now = now_ms()
+        async with self._connect() as db:
+            cursor = await db.execute(
+                """INSERT INTO log_outbox (guild_id, channel_id, embed, filename, file_data, next_attempt_at, created_at)
+                   VALUES (?, ?, ?, ?, ?, MAX(?, COALESCE((SELECT MAX(next_attempt_at) FROM log_outbox
+                                                          WHERE channel_id = ?), 0)), ?)""",
+                (guild_id, channel_id, embed, filename, file_data, now, channel_id, now)
+            )
+            await db.commit()
+            return cursor.lastrowid
+    
+    async def get_due_logs(self, now: int) -> List[LogOutboxEntry]:
+        """Obtém os logs prontos para envio (sem o conteúdo dos anexos), na ordem em que foram gerados"""
+        async with self._connect() as db:
+            db.row_factory = LogOutboxEntry.from_row
+            async with db.execute(
+                f"""SELECT {LogOutboxEntry.COLUMNS} FROM log_outbox
+                    WHERE next_attempt_at <= ? ORDER BY outbox_id""",
+                (now,)
+            ) as cursor:
+                return await cursor.fetchall()
+    
+    async def get_log_file(self, outbox_id: int) -> Optional[bytes]:
+        """Obtém o conteúdo do anexo de um log"""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT file_data FROM log_outbox WHERE outbox_id = ?", (outbox_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+    
+    async def delete_logs(self, outbox_ids: List[int]):
+        """Remove logs enviados (ou descartados)"""
+        if not outbox_ids:
+            return
+        
+        async with self._connect() as db:
+            await db.executemany("DELETE FROM log_outbox WHERE outbox_id = ?", [(i,) for i in outbox_ids])
+            await db.commit()
+    
+    async def reschedule_logs(self, channel_id: int, outbox_ids: List[int], next_attempt_at: int):
+        """Agenda uma nova tentativa para os logs que falharam e adia os seguintes do mesmo canal"""
+        async with self._connect() as db:
+            await db.executemany(
+                "UPDATE log_outbox SET attempts = attempts + 1 WHERE outbox_id = ?",
+                [(i,) for i in outbox_ids]
+            )
+            await db.execute(
+                "UPDATE log_outbox SET next_attempt_at = ? WHERE channel_id = ? AND next_attempt_at < ?",
+                (next_attempt_at, channel_id, next_attempt_at)
+            )
+            await db.commit()
+    
+    
+    # ===== ATIVIDADE =====
+    async def get_open_ticket_activity(self, guild_id: Optional[int] = None) -> List[Dict]:
+        """Obtém os tickets abertos (de todos os servidores ou de um só) com sua última atividade"""
+        query = """SELECT t.ticket_id, t.guild_id, t.channel_id, t.user_id, t.category,
+                          t.created_at, a.last_activity, a.warned
+                   FROM tickets t
+                   LEFT JOIN ticket_activity a ON a.channel_id = t.channel_id
+                   WHERE t.status = 'open'"""
+        params = ()
+        if guild_id is not None:
+            query += " AND t.guild_id = ?"
+            params = (guild_id,)
+        
+        async with self._connect() as db:
+            async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
                 return [
                     {
-                        "log_id": row[0],
-                        "ticket_id": row[1],
-                        "user_id": row[2],
-                        "action": row[3],
-                        "details": row[4],
-                        "timestamp": row[5]
+                        "ticket_id": row[0],
+                        "guild_id": row[1],
+                        "channel_id": row[2],
+                        "user_id": row[3],
+                        "category": row[4],
+                        "created_at": row[5],
+                        "last_activity": row[6],
+                        "warned": row[7] or 0
                     }
                     for row in rows
                 ]
+    
+    async def save_ticket_activity(self, rows: List[tuple], removed_channel_ids=()):
+        """Salva em lote a última atividade dos tickets e remove os encerrados"""
+        async with self._connect() as db:
+            if rows:
+                await db.executemany(
+                    """INSERT INTO ticket_activity (channel_id, ticket_id, last_activity, warned)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT(channel_id) DO UPDATE SET
+                           ticket_id = excluded.ticket_id,
+                           last_activity = excluded.last_activity,
+                           warned = excluded.warned""",
+                    rows
+                )
+            if removed_channel_ids:
+                await db.executemany(
+                    "DELETE FROM ticket_activity WHERE channel_id = ?",
+                    [(channel_id,) for channel_id in removed_channel_ids]
+                )
+            await db.commit()
+    
+    # ===== ESTATÍSTICAS DE MENSAGENS =====
+    async def save_ticket_stats(self, stats_list: List):
+        """Soma em lote os contadores de mensagens acumulados em memória"""
+        async with self._connect() as db:
+            await db.executemany(
+                """INSERT INTO ticket_stats
+                   (ticket_id, guild_id, messages, characters, first_staff_response_at, last_message_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(ticket_id) DO UPDATE SET
+                       messages = messages + excluded.messages,
+                       characters = characters + excluded.characters,
+                       first_staff_response_at = COALESCE(first_staff_response_at, excluded.first_staff_response_at),
+                       last_message_at = MAX(COALESCE(last_message_at, 0), COALESCE(excluded.last_message_at, 0))""",
+                [
+                    (s.ticket_id, s.guild_id, s.messages, s.characters,
+                     s.first_staff_response_at, s.last_message_at)
+                    for s in stats_list
+                ]
+            )
+            await db.executemany(
+                """INSERT INTO ticket_participants (ticket_id, user_id, messages, characters)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(ticket_id, user_id) DO UPDATE SET
+                       messages = messages + excluded.messages,
+                       characters = characters + excluded.characters""",
+                [
+                    (s.ticket_id, user_id, messages, characters)
+                    for s in stats_list
+                    for user_id, (messages, characters) in s.participants.items()
+                ]
+            )
+            await db.commit()
+    
+    async def get_ticket_stats(self, ticket_id: int) -> Optional[Dict]:
+        """Obtém as estatísticas de mensagens de um ticket"""
+        async with self._connect() as db:
+            async with db.execute(
+                "SELECT * FROM ticket_stats WHERE ticket_id = ?",
+                (ticket_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+            
+            async with db.execute(
+                "SELECT user_id, messages, characters FROM ticket_participants WHERE ticket_id = ?",
+                (ticket_id,)
+            ) as cursor:
+                participants = await cursor.fetchall()
+            
+            return {
+                "ticket_id": row[0],
+                "guild_id": row[1],
+                "messages": row[2],
+                "characters": row[3],
+                "first_staff_response_at": row[4],
+                "last_message_at": row[5],
+                "participants": {
+                    user_id: {"messages": messages, "characters": characters}
+                    for user_id, messages, characters in participants
+                }
+            }
+    
+    async def get_open_tickets_with_staff_response(self, guild_id: Optional[int] = None) -> List[tuple]:
+        """Obtém (guild_id, ticket_id) dos tickets abertos que já tiveram resposta da equipe"""
+        query = """SELECT t.guild_id, s.ticket_id FROM ticket_stats s
+                   JOIN tickets t ON t.ticket_id = s.ticket_id
+                   WHERE t.status = 'open' AND s.first_staff_response_at IS NOT NULL"""
+        params = ()
+        if guild_id is not None:
+            query += " AND t.guild_id = ?"
+            params = (guild_id,)
+        
+        async with self._connect() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+    
+    # ===== MÉTRICAS DE SLA =====
+    async def get_analytics_sketches(self, guild_id: Optional[int] = None) -> List[tuple]:
+        """Obtém os sketches de métricas persistidos (de todos os servidores ou de um só)"""
+        query = "SELECT guild_id, metric, dimension, dim_key, data FROM analytics_sketches"
+        params = ()
+        if guild_id is not None:
+            query += " WHERE guild_id = ?"
+            params = (guild_id,)
+        
+        async with self._connect() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+    
+    async def save_analytics_sketches(self, rows: List[tuple]):
+        """Salva em lote os sketches de métricas alterados"""
+        async with self._connect() as db:
+            await db.executemany(
+                """INSERT OR REPLACE INTO analytics_sketches (guild_id, metric, dimension, dim_key, data)
+                   VALUES (?, ?, ?, ?, ?)""",
+                rows
+            )
+            await db.commit()
+    
+    # ===== RELATÓRIOS DIÁRIOS =====
+    async def increment_rollup(self, guild_id: int, day: str, category: str, urgency: str,
+                               staff_id: int = 0, opened: int = 0, claimed: int = 0, closed: int = 0,
+                               first_response: Optional[float] = None,
+                               resolution: Optional[float] = None):
+        """Incrementa os contadores do agregado diário"""
+        async with self._connect() as db:
+            await db.execute(
+                """INSERT INTO daily_rollups
+                   (guild_id, day, category, urgency, staff_id, opened, claimed, closed,
+                    first_response_total, first_response_count, resolution_total, resolution_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""" + ROLLUP_UPSERT,
+                (
+                    guild_id, day, category, urgency, staff_id or 0, opened, claimed, closed,
+                    first_response or 0, 1 if first_response is not None else 0,
+                    resolution or 0, 1 if resolution is not None else 0
+                )
+            )
+            await db.commit()
+    
+    async def get_rollup_report(self, guild_id: int, start_day: str, end_day: str,
+                                group_by: Optional[str] = None) -> List[Dict]:
+        """Soma os agregados diários de um intervalo de datas (inclusivo)"""
+        group_column = {
+            "category": "category",
+            "urgency": "urgency",
+            "staff": "staff_id"
+        }.get(group_by)
+        
+        select_key = group_column if group_column else "'all'"
+        group_clause = f"GROUP BY {group_column}" if group_column else ""
+        
+        async with self._connect() as db:
+            async with db.execute(
+                f"""SELECT {select_key}, SUM(opened), SUM(claimed), SUM(closed),
+                           SUM(first_response_total), SUM(first_response_count),
+                           SUM(resolution_total), SUM(resolution_count)
+                    FROM daily_rollups
+                    WHERE guild_id = ? AND day BETWEEN ? AND ?
+                    {group_clause}""",
+                (guild_id, start_day, end_day)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        "key": row[0],
+                        "opened": row[1] or 0,
+                        "claimed": row[2] or 0,
+                        "closed": row[3] or 0,
+                        "first_response_avg": row[4] / row[5] if row[5] else None,
+                        "resolution_avg": row[6] / row[7] if row[7] else None
+                    }
+                    for row in rows
+                    if row[1] is not None
+                ]
+    
+    async def rebuild_rollups(self, guild_id: int) -> int:
+        """Recalcula todos os agregados diários de um servidor a partir do histórico"""
+        async with self._connect() as db:
+            await db.execute("DELETE FROM daily_rollups WHERE guild_id = ?", (guild_id,))
+            
+            # Tickets abertos por dia de criação
+            await db.execute(
+                """INSERT INTO daily_rollups (guild_id, day, category, urgency, staff_id, opened)
+                   SELECT guild_id, date(created_at / 1000, 'unixepoch'), category, urgency, 0, COUNT(*)
+                   FROM tickets
+                   WHERE guild_id = ? AND created_at IS NOT NULL
+                   GROUP BY date(created_at / 1000, 'unixepoch'), category, urgency""" + ROLLUP_UPSERT,
+                (guild_id,)
+            )
+            
+            # Claims por dia e staff (o primeiro claim de cada ticket conta como primeira resposta)
+            await db.execute(
+                """INSERT INTO daily_rollups
+                   (guild_id, day, category, urgency, staff_id, claimed, first_response_total, first_response_count)
+                   SELECT t.guild_id, date(l.timestamp / 1000, 'unixepoch'), t.category, t.urgency, l.user_id, COUNT(*),
+                          SUM(CASE WHEN l.timestamp = f.first_claim
+                                   THEN (l.timestamp - t.created_at) / 1000.0 ELSE 0 END),
+                          SUM(CASE WHEN l.timestamp = f.first_claim THEN 1 ELSE 0 END)
+                   FROM ticket_logs l
+                   JOIN tickets t ON t.ticket_id = l.ticket_id
+                   JOIN (SELECT fl.ticket_id, MIN(fl.timestamp) AS first_claim
+                         FROM tickets ft
+                         JOIN ticket_logs fl ON fl.ticket_id = ft.ticket_id AND fl.action = 'claimed'
+                         WHERE ft.guild_id = ?
+                         GROUP BY fl.ticket_id) f
+                     ON f.ticket_id = l.ticket_id
+                   WHERE t.guild_id = ? AND l.action = 'claimed'
+                   GROUP BY date(l.timestamp / 1000, 'unixepoch'), t.category, t.urgency, l.user_id""" + ROLLUP_UPSERT,
+                (guild_id, guild_id)
+            )
+            
+            # Fechamentos por dia e staff responsável
+            await db.execute(
+                """INSERT INTO daily_rollups
+                   (guild_id, day, category, urgency, staff_id, closed, resolution_total, resolution_count)
+                   SELECT t.guild_id, date(t.closed_at / 1000, 'unixepoch'), t.category, t.urgency,
+                          COALESCE(t.claimed_by, (SELECT l.user_id FROM ticket_logs l
+                                                  WHERE l.ticket_id = t.ticket_id AND l.action = 'closed'
+                                                  LIMIT 1), 0) AS staff,
+                          COUNT(*),
+                          SUM((t.closed_at - t.created_at) / 1000.0),
+                          COUNT(*)
+                   FROM tickets t
+                   WHERE t.guild_id = ? AND t.status = 'closed' AND t.closed_at IS NOT NULL
+                   GROUP BY date(t.closed_at / 1000, 'unixepoch'), t.category, t.urgency, staff""" + ROLLUP_UPSERT,
+                (guild_id,)
+            )
+            
+            await db.commit()
+            
+            async with db.execute(
+                "SELECT COUNT(*) FROM daily_rollups WHERE guild_id = ?", (guild_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0]
@@ -2,6 +2,9 @@ import discord
 from datetime import datetime
 from typing import Optional
 
+from utils.records import Ticket
+from utils.timeutils import elapsed_seconds
+
 class EmbedBuilder:
     """Classe para criar embeds padronizados"""
     
@@ -65,6 +68,23 @@ class EmbedBuilder:
         
         return embed
     
+    def create_category_menu_embed(self) -> discord.Embed:
+        """Cria o embed do painel com menu de categorias"""
+        embed = discord.Embed(
+            title="📩 Sistema de Tickets - Escolha a Categoria",
+            description=(
+                "**Bem-vindo ao sistema de suporte!**\n\n"
+                "Selecione abaixo a categoria que melhor descreve seu ticket.\n"
+                "Após selecionar, você preencherá um formulário com mais detalhes."
+            ),
+            color=self.color,
+            timestamp=datetime.utcnow()
+        )
+        
+        embed.set_footer(text=f"{self.bot_name} • Ticket System")
+        
+        return embed
+    
     def create_panel_embed(self, category: Optional[str] = None, 
                           category_info: Optional[dict] = None) -> discord.Embed:
         """Cria o embed do painel fixo"""
@@ -102,7 +122,7 @@ class EmbedBuilder:
         
         return embed
     
-    def create_log_embed(self, action: str, ticket_data: dict, 
+    def create_log_embed(self, action: str, ticket_data: Ticket, 
                         user: discord.User, **kwargs) -> discord.Embed:
         """Cria embed para logs de ações"""
         
@@ -130,13 +150,13 @@ class EmbedBuilder:
         
         embed.add_field(
             name="🎫 Ticket ID",
-            value=f"#{ticket_data.get('ticket_id', 'N/A')}",
+            value=f"#{ticket_data.ticket_id}",
             inline=True
         )
         
         embed.add_field(
             name="📂 Categoria",
-            value=ticket_data.get('category', 'N/A').capitalize(),
+            value=ticket_data.category.capitalize(),
             inline=True
         )
         
@@ -149,12 +169,12 @@ class EmbedBuilder:
         if action == "created":
             embed.add_field(
                 name="📝 Motivo",
-                value=ticket_data.get('reason', 'N/A'),
+                value=ticket_data.reason,
                 inline=False
             )
             embed.add_field(
                 name="⚡ Urgência",
-                value=ticket_data.get('urgency', 'N/A').capitalize(),
+                value=ticket_data.urgency.capitalize(),
                 inline=True
             )
         
@@ -176,21 +196,16 @@ class EmbedBuilder:
                     inline=False
                 )
             
-            created_at = ticket_data.get('created_at')
-            if created_at:
-                try:
-                    created = datetime.fromisoformat(created_at)
-                    duration = datetime.utcnow() - created
-                    hours = int(duration.total_seconds() // 3600)
-                    minutes = int((duration.total_seconds() % 3600) // 60)
-                    
-                    embed.add_field(
-                        name="⏱️ Tempo Aberto",
-                        value=f"{hours}h {minutes}m",
-                        inline=True
-                    )
-                except:
-                    pass
+            duration = elapsed_seconds(ticket_data.created_at)
+            if duration is not None:
+                hours = int(duration // 3600)
+                minutes = int((duration % 3600) // 60)
+                
+                embed.add_field(
+                    name="⏱️ Tempo Aberto",
+                    value=f"{hours}h {minutes}m",
+                    inline=True
+                )
         
         embed.set_footer(
             text=f"{self.bot_name} • Log System"
@@ -0,0 +1,43 @@
+from typing import Dict, List, Optional
+
+from utils.records import GuildConfig
+
+class GuildConfigCache:
+    """Cache das configurações (`guild_config`) de cada servidor.
+    
+    Lida a cada verificação de staff, abertura de ticket e envio de log, a
+    configuração é carregada de uma vez no aquecimento da inicialização e
+    depois mantida em memória. Servidores sem configuração também ficam em
+    cache (como None). Quem altera a configuração chama `invalidate`.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._cache: Dict[int, Optional[GuildConfig]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    async def get(self, guild_id: int) -> Optional[GuildConfig]:
+        """Obtém a configuração de um servidor (None se ele não foi configurado)"""
+        if guild_id in self._cache:
+            return self._cache[guild_id]
+        config = self._cache[guild_id] = await self.db.get_guild_config(guild_id)
+        return config
+    
+    async def load(self):
+        """Carrega as configurações de todos os servidores do banco de dados"""
+        configs = await self.db.get_guild_configs()
+        self._cache = {config.guild_id: config for config in configs}
+    
+    def invalidate(self, guild_id: int):
+        """Descarta o cache de um servidor (após alterar sua configuração)"""
+        self._cache.pop(guild_id, None)
+    
+    def guild_ids(self) -> List[int]:
+        """Servidores com configuração em memória"""
+        return list(self._cache)
+    
+    def evict_guild(self, guild_id: int):
+        """Descarta da memória a configuração de um servidor"""
+        self.invalidate(guild_id)
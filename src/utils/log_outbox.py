@@ -0,0 +1,196 @@
+import asyncio
+import io
+import json
+import time
+from typing import Dict, List, Optional
+
+import discord
+
+from utils.metrics import REST_SECONDS
+from utils.records import LogOutboxEntry
+from utils.timeutils import now_ms
+
+# Intervalo entre os envios ao canal de logs (segundos)
+LOG_FLUSH_SECONDS = 2.0
+
+# Limites do Discord por mensagem
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS = 6000
+
+# Novas tentativas: 5s, 10s, 20s... até 10 minutos; depois de MAX_ATTEMPTS o log é descartado
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+MAX_ATTEMPTS = 10
+
+# Sem permissão para gerenciar webhooks, o canal usa o envio pelo bot por 10 minutos antes de tentar de novo
+WEBHOOK_RETRY_SECONDS = 600
+
+class LogOutbox:
+    """Entrega dos logs ao canal de logs configurado de cada servidor.
+    
+    Os logs são gravados na tabela `log_outbox` e enviados pelo LogsCog a
+    cada `LOG_FLUSH_SECONDS`: os pendentes de um mesmo canal são agrupados
+    em mensagens de até 10 embeds (no máximo um anexo por mensagem). Falhas
+    são tentadas de novo com backoff exponencial e os logs pendentes de uma
+    execução anterior são enviados quando o bot volta.
+    
+    Com `logs.delivery = "webhook"` no config.json, os envios usam um webhook
+    do canal de logs (criado pelo bot e guardado em memória), que tem limites
+    de taxa próprios e não disputa com as mensagens dos tickets.
+    """
+    
+    def __init__(self, bot, db):
+        self.bot = bot
+        self.db = db
+        self._lock = asyncio.Lock()
+        # channel_id -> webhook do bot no canal de logs
+        self._webhooks: Dict[int, discord.Webhook] = {}
+        # channel_id -> instante (monotonic) até o qual o canal usa o envio pelo bot
+        self._webhook_unavailable: Dict[int, float] = {}
+    
+    async def send(self, guild: discord.Guild, embed: discord.Embed,
+                   filename: Optional[str] = None, data: Optional[bytes] = None) -> bool:
+        """Coloca um log na fila do canal de logs do servidor (False se não houver canal configurado)"""
+        config = await self.bot.guild_configs.get(guild.id)
+        if not config or not config.log_channel_id:
+            return False
+        
+        await self.db.enqueue_log(
+            guild.id,
+            config.log_channel_id,
+            json.dumps(embed.to_dict(), separators=(",", ":")),
+            filename,
+            data
+        )
+        return True
+    
+    async def flush(self):
+        """Envia os logs pendentes dos servidores deste processo"""
+        async with self._lock:
+            by_channel: Dict[int, List[LogOutboxEntry]] = {}
+            for entry in await self.db.get_due_logs(now_ms()):
+                # Com vários processos, cada um entrega apenas os logs dos seus shards
+                if self.bot.owns_guild(entry.guild_id):
+                    by_channel.setdefault(entry.channel_id, []).append(entry)
+            
+            if by_channel:
+                # Canais diferentes têm limites de taxa independentes
+                await asyncio.gather(*(
+                    self._deliver(channel_id, entries) for channel_id, entries in by_channel.items()
+                ))
+    
+    @staticmethod
+    def batches(entries: List[LogOutboxEntry], embeds: List[discord.Embed]) -> List[List[int]]:
+        """Agrupa os logs (índices de `entries`) em mensagens dentro dos limites do Discord"""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        characters = 0
+        has_file = False
+        for index, entry in enumerate(entries):
+            size = len(embeds[index])
+            if current and (len(current) == MAX_EMBEDS_PER_MESSAGE
+                            or characters + size > MAX_EMBED_CHARACTERS
+                            or (has_file and entry.filename)):
+                batches.append(current)
+                current, characters, has_file = [], 0, False
+            current.append(index)
+            characters += size
+            has_file = has_file or bool(entry.filename)
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _webhook(self, channel) -> Optional[discord.Webhook]:
+        """Webhook do bot no canal de logs, criado na primeira vez (None para enviar pelo bot)"""
+        webhook = self._webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+        # Canal fora do cache (ex.: logs pendentes logo após reiniciar)
+        if not hasattr(channel, "create_webhook"):
+            return None
+        if self._webhook_unavailable.get(channel.id, 0.0) > time.monotonic():
+            return None
+        
+        try:
+            # Reaproveita o webhook criado em uma execução anterior
+            for existing in await channel.webhooks():
+                if (existing.token and existing.user is not None and self.bot.user is not None
+                        and existing.user.id == self.bot.user.id):
+                    webhook = existing
+                    break
+            if webhook is None:
+                with REST_SECONDS.time("create_webhook"):
+                    webhook = await channel.create_webhook(
+                        name=f"{self.bot.embed_builder.bot_name} Logs",
+                        reason="Envio dos logs de tickets"
+                    )
+        except discord.HTTPException as e:
+            print(f"Webhook indisponível no canal de logs {channel.id}, enviando pelo bot: {e}")
+            self._webhook_unavailable[channel.id] = time.monotonic() + WEBHOOK_RETRY_SECONDS
+            return None
+        
+        self._webhooks[channel.id] = webhook
+        return webhook
+    
+    async def _deliver(self, channel_id: int, entries: List[LogOutboxEntry]):
+        guild_id = entries[0].guild_id
+        channel = self.bot.get_channel(channel_id) or self.bot.get_partial_messageable(channel_id, guild_id=guild_id)
+        embeds = [discord.Embed.from_dict(json.loads(entry.embed)) for entry in entries]
+        
+        webhook = None
+        if self.bot.config_service.snapshot.logs["delivery"] == "webhook":
+            webhook = await self._webhook(channel)
+        
+        for batch in self.batches(entries, embeds):
+            ids = [entries[index].outbox_id for index in batch]
+            file = None
+            for index in batch:
+                if entries[index].filename:
+                    data = await self.db.get_log_file(entries[index].outbox_id)
+                    file = discord.File(io.BytesIO(data or b""), filename=entries[index].filename)
+            
+            kwargs = {"embeds": [embeds[index] for index in batch]}
+            if file:
+                kwargs["file"] = file
+            
+            try:
+                if webhook is not None:
+                    with REST_SECONDS.time("send_log_webhook"):
+                        await webhook.send(
+                            username=self.bot.embed_builder.bot_name,
+                            avatar_url=self.bot.user.display_avatar.url if self.bot.user else None,
+                            **kwargs
+                        )
+                else:
+                    with REST_SECONDS.time("send_log"):
+                        await channel.send(**kwargs)
+            except discord.NotFound:
+                if webhook is not None:
+                    # O webhook foi apagado: um novo é criado na próxima tentativa
+                    self._webhooks.pop(channel_id, None)
+                    await self._retry_later(channel_id, [entries[index] for index in batch], "webhook apagado")
+                    return
+                # O canal de logs foi apagado: não há para onde enviar
+                print(f"Canal de logs {channel_id} não encontrado, {len(entries)} log(s) descartado(s).")
+                await self.db.delete_logs([entry.outbox_id for entry in entries])
+                return
+            except (discord.HTTPException, OSError) as e:
+                await self._retry_later(channel_id, [entries[index] for index in batch], e)
+                return
+            
+            await self.db.delete_logs(ids)
+    
+    async def _retry_later(self, channel_id: int, failed: List[LogOutboxEntry], error):
+        """Agenda uma nova tentativa (ou descarta os logs que já passaram do limite)"""
+        expired = [entry.outbox_id for entry in failed if entry.attempts + 1 >= MAX_ATTEMPTS]
+        if expired:
+            print(f"Erro ao enviar log ao canal {channel_id}, {len(expired)} log(s) descartado(s): {error}")
+            await self.db.delete_logs(expired)
+        
+        retrying = [entry for entry in failed if entry.outbox_id not in expired]
+        attempts = max((entry.attempts for entry in retrying), default=0)
+        delay = min(RETRY_BASE_SECONDS * 2 ** attempts, RETRY_MAX_SECONDS)
+        if retrying:
+            print(f"Erro ao enviar log ao canal {channel_id}, nova tentativa em {delay}s: {error}")
+        await self.db.reschedule_logs(channel_id, [entry.outbox_id for entry in retrying],
+                                      now_ms() + delay * 1000)
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import discord
+
+from utils.metrics import REST_SECONDS
+
+class MemberResolver:
+    """Resolve membros sem depender do cache completo de membros do discord.py.
+    
+    Com o cache de membros desativado (ver `cache` no config.json), o bot não
+    guarda todos os membros de cada servidor. Os poucos membros que os tickets
+    precisam são buscados com `fetch_member` e guardados em um LRU pequeno.
+    """
+    
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._cache: "OrderedDict[Tuple[int, int], discord.Member]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    def get(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """Obtém um membro apenas dos caches, sem chamadas à API"""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        
+        member = self._cache.get((guild.id, user_id))
+        if member is not None:
+            self._cache.move_to_end((guild.id, user_id))
+        return member
+    
+    async def resolve(self, guild: discord.Guild, user_id: Optional[int]) -> Optional[discord.Member]:
+        """Obtém um membro do cache ou da API; None se ele não estiver no servidor"""
+        if not user_id:
+            return None
+        
+        member = self.get(guild, user_id)
+        if member is not None:
+            return member
+        
+        try:
+            with REST_SECONDS.time("fetch_member"):
+                member = await guild.fetch_member(user_id)
+        except (discord.NotFound, discord.Forbidden):
+            return None
+        except discord.HTTPException as e:
+            print(f"Erro ao buscar membro {user_id}: {e}")
+            return None
+        
+        self.update(member)
+        return member
+    
+    def update(self, member: discord.Member):
+        """Guarda (ou atualiza) um membro no LRU"""
+        key = (member.guild.id, member.id)
+        self._cache[key] = member
+        self._cache.move_to_end(key)
+        
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+    
+    def refresh(self, member: discord.Member):
+        """Atualiza um membro apenas se ele já estiver no LRU"""
+        if (member.guild.id, member.id) in self._cache:
+            self._cache[(member.guild.id, member.id)] = member
+    
+    def forget(self, guild_id: int, user_id: int):
+        """Remove um membro do LRU (ex: saiu do servidor)"""
+        self._cache.pop((guild_id, user_id), None)
+    
+    def evict_guild(self, guild_id: int):
+        """Remove do LRU todos os membros de um servidor"""
+        for key in [key for key in self._cache if key[0] == guild_id]:
+            del self._cache[key]
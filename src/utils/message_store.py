@@ -0,0 +1,128 @@
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+import discord
+
+class CachedMessage:
+    """Cópia compacta de uma mensagem, apenas com o que a transcrição usa"""
+    
+    __slots__ = ("id", "author", "content", "has_embeds", "attachments")
+    
+    def __init__(self, id: int, author: str, content: str, has_embeds: bool, attachments: Tuple[str, ...]):
+        self.id = id
+        self.author = author
+        self.content = content
+        self.has_embeds = has_embeds
+        self.attachments = attachments
+    
+    @classmethod
+    def from_message(cls, message: discord.Message) -> "CachedMessage":
+        return cls(
+            message.id,
+            f"{message.author.name}#{message.author.discriminator}",
+            message.content,
+            bool(message.embeds),
+            tuple(attachment.filename for attachment in message.attachments)
+        )
+    
+    @property
+    def created_at(self) -> datetime:
+        # A data de criação vem do próprio ID (snowflake), sem ocupar memória
+        return discord.utils.snowflake_time(self.id)
+
+
+class TicketMessages:
+    """Mensagens recentes de um canal de ticket"""
+    
+    __slots__ = ("guild_id", "messages", "complete")
+    
+    def __init__(self, guild_id: int, max_size: int, complete: bool):
+        self.guild_id = guild_id
+        self.messages: Deque[CachedMessage] = deque(maxlen=max_size)
+        # True enquanto o anel contém todas as mensagens desde a criação do canal
+        self.complete = complete
+
+
+class TicketMessageStore:
+    """Cache de mensagens apenas dos canais de ticket.
+    
+    Substitui o cache global de mensagens do discord.py (`max_messages`): cada
+    ticket guarda um anel limitado das mensagens mais recentes e os demais
+    canais são ignorados. A transcrição usa o anel e só busca na API as
+    mensagens mais antigas que ele.
+    """
+    
+    def __init__(self, max_per_ticket: int = 200):
+        self.max_per_ticket = max_per_ticket
+        self._tickets: Dict[int, TicketMessages] = {}
+    
+    def __len__(self) -> int:
+        return len(self._tickets)
+    
+    def open(self, guild_id: int, channel_id: int, complete: bool = True) -> TicketMessages:
+        """Passa a guardar as mensagens de um canal de ticket"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None:
+            ticket = self._tickets[channel_id] = TicketMessages(guild_id, self.max_per_ticket, complete)
+        return ticket
+    
+    def record(self, message: discord.Message, create: bool = False) -> bool:
+        """Guarda uma mensagem se o canal for um ticket acompanhado.
+        
+        Com `create`, começa a acompanhar o canal (sem o histórico anterior).
+        """
+        ticket = self._tickets.get(message.channel.id)
+        if ticket is None:
+            if not create:
+                return False
+            ticket = self.open(message.guild.id, message.channel.id, complete=False)
+        
+        if len(ticket.messages) == ticket.messages.maxlen:
+            # A mensagem mais antiga sai do anel
+            ticket.complete = False
+        ticket.messages.append(CachedMessage.from_message(message))
+        return True
+    
+    def edit(self, channel_id: int, message_id: int, content: str):
+        """Atualiza o conteúdo de uma mensagem guardada"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None:
+            return
+        
+        for cached in reversed(ticket.messages):
+            if cached.id == message_id:
+                cached.content = content
+                return
+    
+    def delete(self, channel_id: int, message_ids):
+        """Remove mensagens apagadas"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None:
+            return
+        
+        message_ids = set(message_ids)
+        remaining = [cached for cached in ticket.messages if cached.id not in message_ids]
+        if len(remaining) != len(ticket.messages):
+            ticket.messages.clear()
+            ticket.messages.extend(remaining)
+    
+    def get(self, channel_id: int) -> Optional[TicketMessages]:
+        """Obtém as mensagens guardadas de um canal"""
+        return self._tickets.get(channel_id)
+    
+    def drop(self, channel_id: int):
+        """Descarta as mensagens de um canal (ticket deletado)"""
+        self._tickets.pop(channel_id, None)
+    
+    def evict_guild(self, guild_id: int):
+        """Descarta as mensagens de todos os tickets de um servidor"""
+        for channel_id in [channel_id for channel_id, ticket in self._tickets.items() if ticket.guild_id == guild_id]:
+            del self._tickets[channel_id]
+    
+    def snapshot(self, channel_id: int) -> Tuple[List[CachedMessage], bool]:
+        """Cópia das mensagens guardadas e se elas cobrem todo o canal"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None:
+            return [], False
+        return list(ticket.messages), ticket.complete
@@ -0,0 +1,285 @@
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from utils.traces import TRACES
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico, com um valor por combinação de labels"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+    
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def get(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+    
+    def render(self) -> Iterator[str]:
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge:
+    """Valor instantâneo; pode ser lido de uma função no momento da coleta"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+    
+    def set(self, value: float, *labels):
+        self._values[labels] = value
+    
+    def set_function(self, function: Callable[[], float]):
+        """Lê o valor de `function` a cada coleta (apenas gauges sem labels)"""
+        self._function = function
+    
+    def get(self, *labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(labels, 0.0)
+    
+    def render(self) -> Iterator[str]:
+        if self._function is not None:
+            yield f"{self.name} {_format_value(self._function())}"
+            return
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+    
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    """Mede a duração de um bloco `with` e registra no histograma"""
+    
+    __slots__ = ("histogram", "labels", "start")
+    
+    def __init__(self, histogram: "Histogram", labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        status = "error" if exc_type is not None else "ok"
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels, status)
+        return False
+
+
+class Histogram:
+    """Histograma de latência com buckets fixos.
+    
+    Cada observação custa uma busca binária e três somas; os buckets
+    cumulativos do formato Prometheus só são calculados na coleta.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, _HistogramSeries] = {}
+    
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+    
+    def time(self, *labels) -> _Timer:
+        """Context manager que registra a duração com um label final `status` (ok/error)"""
+        return _Timer(self, labels)
+    
+    def get(self, *labels) -> Optional[_HistogramSeries]:
+        return self._series.get(labels)
+    
+    def render(self) -> Iterator[str]:
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series.sum)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {series.count}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas no endpoint /metrics"""
+    
+    def __init__(self):
+        self._metrics: List = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Exporta todas as métricas no formato de texto do Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HANDLER_SECONDS = REGISTRY.histogram(
+    "ticketbot_handler_seconds",
+    "Duração dos slash commands, botões, selects e modais",
+    ("kind", "name", "status")
+)
+DB_SECONDS = REGISTRY.histogram(
+    "ticketbot_db_seconds",
+    "Duração dos métodos do banco de dados",
+    ("method", "status")
+)
+REST_SECONDS = REGISTRY.histogram(
+    "ticketbot_rest_seconds",
+    "Duração das chamadas à API REST do Discord feitas pelo TicketManager",
+    ("call", "status")
+)
+
+def instrument(kind: str, name: Optional[str] = None):
+    """Decorator que mede a duração de um callback assíncrono (botão, select, modal).
+    
+    Deve ficar abaixo de `@discord.ui.button`/`@discord.ui.select`.
+    """
+    def decorator(function):
+        metric_name = name or function.__name__
+        
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            # Os callbacks recebem (self, interaction, ...)
+            TRACES.record_handler(kind, metric_name, args[1] if len(args) > 1 else None)
+            with HANDLER_SECONDS.time(kind, metric_name):
+                return await function(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
+
+
+def instrument_methods(histogram: Histogram):
+    """Decorator de classe que mede todos os métodos assíncronos públicos"""
+    def decorator(cls):
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith("_") or not asyncio.iscoroutinefunction(value):
+                continue
+            setattr(cls, attribute, _timed_method(histogram, attribute, value))
+        return cls
+    
+    return decorator
+
+
+def _timed_method(histogram: Histogram, name: str, function):
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        with histogram.time(name):
+            return await function(*args, **kwargs)
+    
+    return wrapper
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """CommandTree que mede a duração de cada slash command.
+    
+    O início é marcado em `interaction.extras` no `interaction_check` e o fim
+    no evento `app_command_completion` (ou no `on_error`).
+    """
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["metrics_started"] = time.perf_counter()
+        if interaction.command is not None:
+            TRACES.record_handler("command", interaction.command.qualified_name, interaction)
+        return True
+    
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        observe_command(interaction, interaction.command, "error")
+        await super().on_error(interaction, error)
+
+
+def observe_command(interaction: discord.Interaction, command, status: str = "ok"):
+    """Registra a duração de um slash command iniciado no InstrumentedCommandTree"""
+    started = interaction.extras.pop("metrics_started", None)
+    if started is None or command is None:
+        return
+    HANDLER_SECONDS.observe(time.perf_counter() - started, "command", command.qualified_name, status)
+
+
+async def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Inicia o endpoint HTTP /metrics; retorna o runner para encerrá-lo depois"""
+    from aiohttp import web
+    
+    async def handle_metrics(request):
+        return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
+    
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -5,8 +5,9 @@ from typing import Optional
 class PermissionManager:
     """Gerenciador de permissões do bot"""
     
-    def __init__(self, db):
+    def __init__(self, db, guild_configs):
         self.db = db
+        self.guild_configs = guild_configs
     
     async def is_staff(self, member: discord.Member) -> bool:
         """Verifica se um membro é staff"""
@@ -15,9 +16,9 @@ class PermissionManager:
             return True
         
         # Verifica se tem o cargo de staff configurado
-        config = await self.db.get_guild_config(member.guild.id)
-        if config and config.get("staff_role_id"):
-            staff_role = member.guild.get_role(config["staff_role_id"])
+        config = await self.guild_configs.get(member.guild.id)
+        if config and config.staff_role_id:
+            staff_role = member.guild.get_role(config.staff_role_id)
             if staff_role and staff_role in member.roles:
                 return True
         
@@ -25,9 +26,9 @@ class PermissionManager:
     
     async def get_staff_role(self, guild: discord.Guild) -> Optional[discord.Role]:
         """Obtém o cargo de staff configurado"""
-        config = await self.db.get_guild_config(guild.id)
-        if config and config.get("staff_role_id"):
-            return guild.get_role(config["staff_role_id"])
+        config = await self.guild_configs.get(guild.id)
+        if config and config.staff_role_id:
+            return guild.get_role(config.staff_role_id)
         return None
     
     def create_ticket_overwrites(self, guild: discord.Guild, user: discord.User, 
@@ -90,8 +91,8 @@ def staff_only():
         db = Database()
         config = await db.get_guild_config(guild.id)
         
-        if config and config.get("staff_role_id"):
-            staff_role = guild.get_role(config["staff_role_id"])
+        if config and config.staff_role_id:
+            staff_role = guild.get_role(config.staff_role_id)
             if staff_role and staff_role in member.roles:
                 return True
         
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Tuple
+
+PROFILE_DIR = "data/profiles"
+
+# Folhas que indicam uma thread ociosa (event loop esperando I/O, thread em wait)
+IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(label: str) -> bool:
+    return any(f"({filename}:" in label for filename in IDLE_FILES)
+
+
+def _output_path(kind: str, extension: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_DIR, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+
+class CpuProfile:
+    """Resultado de uma amostragem: pilhas no formato "collapsed" do flamegraph"""
+    
+    def __init__(self, stacks: Counter, samples: int, duration: float, path: str):
+        self.stacks = stacks
+        self.samples = samples
+        self.duration = duration
+        self.path = path
+    
+    def top_functions(self, limit: int = 10) -> List[Tuple[str, int, int]]:
+        """Funções com mais amostras: (função, amostras próprias, amostras totais).
+        
+        Pilhas de threads ociosas são ignoradas.
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if not frames or _is_idle(frames[-1]):
+                continue
+            own[frames[-1]] += count
+            # Recursão conta uma vez por amostra
+            for frame in set(frames):
+                total[frame] += count
+        return [(frame, count, total[frame]) for frame, count in own.most_common(limit)]
+
+
+class MemoryDiff:
+    """Diferença entre dois snapshots do tracemalloc"""
+    
+    def __init__(self, stats: list, current: int, peak: int, duration: float, path: str):
+        self.stats = stats
+        self.current = current
+        self.peak = peak
+        self.duration = duration
+        self.path = path
+
+
+class Profiler:
+    """Perfis de CPU e memória sob demanda, sem reiniciar o bot.
+    
+    A CPU é medida por amostragem: uma thread lê a pilha de todas as outras
+    threads (`sys._current_frames`) a cada `interval` segundos, sem
+    instrumentar chamadas. A memória é medida comparando dois snapshots do
+    `tracemalloc`, ligado apenas durante a medição. Só um perfil roda por vez.
+    """
+    
+    def __init__(self, interval: float = 0.01, traceback_frames: int = 1):
+        self.interval = interval
+        self.traceback_frames = traceback_frames
+        self._lock = asyncio.Lock()
+    
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+    
+    async def profile_cpu(self, seconds: float) -> CpuProfile:
+        """Amostra as pilhas por `seconds` segundos e grava o arquivo .folded"""
+        async with self._lock:
+            started = time.perf_counter()
+            stacks, samples = await asyncio.to_thread(self._sample, seconds)
+            duration = time.perf_counter() - started
+            
+            path = _output_path("cpu", "folded")
+            with open(path, "w", encoding="utf-8") as file:
+                for stack, count in stacks.most_common():
+                    file.write(f"{stack} {count}\n")
+            
+            return CpuProfile(stacks, samples, duration, path)
+    
+    def _sample(self, seconds: float) -> Tuple[Counter, int]:
+        """Executado em uma thread separada, fora do event loop"""
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        
+        while time.monotonic() < deadline:
+            names: Dict[int, str] = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                stacks[";".join(reversed(labels))] += 1
+            
+            samples += 1
+            time.sleep(self.interval)
+        
+        return stacks, samples
+    
+    async def profile_memory(self, seconds: float, limit: int = 25) -> MemoryDiff:
+        """Compara snapshots do tracemalloc tirados com `seconds` segundos de intervalo"""
+        async with self._lock:
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start(self.traceback_frames)
+            
+            try:
+                started = time.perf_counter()
+                before = tracemalloc.take_snapshot()
+                await asyncio.sleep(seconds)
+                after = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                duration = time.perf_counter() - started
+            finally:
+                if started_here:
+                    tracemalloc.stop()
+            
+            # A comparação é pesada e não precisa do event loop
+            stats = await asyncio.to_thread(self._compare, before, after)
+            
+            path = _output_path("memory", "txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"# Intervalo: {duration:.1f}s • memória rastreada: {current} bytes (pico {peak})\n\n")
+                for stat in stats[:limit]:
+                    file.write(f"{stat.size_diff:+d} bytes ({stat.count_diff:+d} blocos), total {stat.size} bytes\n")
+                    for line in stat.traceback.format():
+                        file.write(f"    {line}\n")
+                    file.write("\n")
+            
+            return MemoryDiff(stats[:limit], current, peak, duration, path)
+    
+    @staticmethod
+    def _compare(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> list:
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        before = before.filter_traces(filters)
+        after = after.filter_traces(filters)
+        return after.compare_to(before, "lineno")
@@ -0,0 +1,114 @@
+import json
+from typing import Optional
+
+class Ticket:
+    """Linha da tabela `tickets`"""
+    
+    __slots__ = ("ticket_id", "guild_id", "channel_id", "user_id", "category", "reason", "description",
+                 "urgency", "claimed_by", "status", "created_at", "closed_at", "close_reason")
+    # Colunas na ordem dos slots, para os SELECTs que alimentam `from_row`
+    COLUMNS = ", ".join(__slots__)
+    
+    def __init__(self, ticket_id: int, guild_id: int, channel_id: int, user_id: int, category: str,
+                 reason: Optional[str], description: Optional[str], urgency: Optional[str],
+                 claimed_by: Optional[int], status: str, created_at: Optional[int],
+                 closed_at: Optional[int], close_reason: Optional[str]):
+        self.ticket_id = ticket_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.category = category
+        self.reason = reason
+        self.description = description
+        self.urgency = urgency
+        self.claimed_by = claimed_by
+        self.status = status
+        self.created_at = created_at
+        self.closed_at = closed_at
+        self.close_reason = close_reason
+    
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> "Ticket":
+        """Row factory do sqlite3 (`db.row_factory = Ticket.from_row`)"""
+        return cls(*row)
+
+
+class TicketLog:
+    """Linha da tabela `ticket_logs`"""
+    
+    __slots__ = ("log_id", "ticket_id", "user_id", "action", "details", "timestamp")
+    COLUMNS = ", ".join(__slots__)
+    
+    def __init__(self, log_id: int, ticket_id: int, user_id: int, action: str, details: Optional[str],
+                 timestamp: int):
+        self.log_id = log_id
+        self.ticket_id = ticket_id
+        self.user_id = user_id
+        self.action = action
+        self.details = details
+        self.timestamp = timestamp
+    
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> "TicketLog":
+        return cls(*row)
+
+
+class Panel:
+    """Linha da tabela `panels`"""
+    
+    __slots__ = ("panel_id", "guild_id", "channel_id", "message_id", "panel_type", "created_at")
+    COLUMNS = ", ".join(__slots__)
+    
+    def __init__(self, panel_id: int, guild_id: int, channel_id: int, message_id: int, panel_type: str,
+                 created_at: Optional[int]):
+        self.panel_id = panel_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.panel_type = panel_type
+        self.created_at = created_at
+    
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> "Panel":
+        return cls(*row)
+
+
+class GuildConfig:
+    """Linha da tabela `guild_config` (com `config_data` já decodificado)"""
+    
+    __slots__ = ("guild_id", "staff_role_id", "log_channel_id", "open_category_id", "closed_category_id",
+                 "config_data")
+    COLUMNS = ", ".join(__slots__)
+    
+    def __init__(self, guild_id: int, staff_role_id: Optional[int], log_channel_id: Optional[int],
+                 open_category_id: Optional[int], closed_category_id: Optional[int], config_data: dict):
+        self.guild_id = guild_id
+        self.staff_role_id = staff_role_id
+        self.log_channel_id = log_channel_id
+        self.open_category_id = open_category_id
+        self.closed_category_id = closed_category_id
+        self.config_data = config_data
+    
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> "GuildConfig":
+        return cls(*row[:5], json.loads(row[5]) if row[5] else {})
+
+
+class LogOutboxEntry:
+    """Linha da tabela `log_outbox` (sem o conteúdo do anexo, lido só no envio)"""
+    
+    __slots__ = ("outbox_id", "guild_id", "channel_id", "embed", "filename", "attempts")
+    COLUMNS = ", ".join(__slots__)
+    
+    def __init__(self, outbox_id: int, guild_id: int, channel_id: int, embed: str, filename: Optional[str],
+                 attempts: int):
+        self.outbox_id = outbox_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.embed = embed
+        self.filename = filename
+        self.attempts = attempts
+    
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> "LogOutboxEntry":
+        return cls(*row)
@@ -3,6 +3,11 @@ from datetime import datetime
 from typing import Optional
 import io
 
+from utils.message_store import CachedMessage
+from utils.metrics import REST_SECONDS, instrument
+from utils.records import Ticket
+from utils.timeutils import elapsed_seconds, ms_to_day, now_ms
+
 class TicketManager:
     """Gerenciador de operações de tickets"""
     
@@ -18,13 +23,16 @@ class TicketManager:
         """Cria um canal de ticket"""
         
         # Obtém configurações do servidor
-        config = await self.db.get_guild_config(guild.id)
+        config = await self.bot.guild_configs.get(guild.id)
         staff_role = await self.permission_manager.get_staff_role(guild)
         
-        # Define a categoria onde o ticket será criado
+        # Define a categoria onde o ticket será criado (a da categoria do ticket tem prioridade)
         category = None
-        if config and config.get("open_category_id"):
-            category = guild.get_channel(config["open_category_id"])
+        ticket_category = (await self.bot.category_registry.get(guild.id)).get(category_name)
+        if ticket_category and ticket_category.target_category_id:
+            category = guild.get_channel(ticket_category.target_category_id)
+        if not category and config and config.open_category_id:
+            category = guild.get_channel(config.open_category_id)
         
         # Cria as permissões do canal
         overwrites = self.permission_manager.create_ticket_overwrites(guild, user, staff_role)
@@ -35,12 +43,16 @@ class TicketManager:
         
         # Cria o canal
         try:
-            channel = await guild.create_text_channel(
-                name=channel_name,
-                category=category,
-                overwrites=overwrites,
-                topic=f"Ticket de {user.name} | Categoria: {category_name}"
-            )
+            with REST_SECONDS.time("create_text_channel"):
+                channel = await guild.create_text_channel(
+                    name=channel_name,
+                    category=category,
+                    overwrites=overwrites,
+                    topic=f"Ticket de {user.name} | Categoria: {category_name}"
+                )
+            
+            # Guarda as mensagens do ticket desde a primeira
+            self.bot.message_store.open(guild.id, channel.id)
             
             # Registra no banco de dados
             ticket_id = await self.db.create_ticket(
@@ -61,17 +73,39 @@ class TicketManager:
                 details=f"Categoria: {category_name}, Urgência: {urgency}"
             )
             
+            await self._record_rollup(guild.id, category_name, urgency, opened=1)
+            
+            # Passa a acompanhar a atividade do ticket
+            self.bot.activity_tracker.track(
+                ticket_id=ticket_id,
+                guild_id=guild.id,
+                channel_id=channel.id,
+                user_id=user.id,
+                category=category_name
+            )
+            
             return channel
             
         except Exception as e:
             print(f"Erro ao criar canal de ticket: {e}")
             return None
     
+    async def _record_rollup(self, guild_id: int, category: str, urgency: str, **counters):
+        """Atualiza o agregado diário do dia atual (UTC)"""
+        try:
+            await self.db.increment_rollup(
+                guild_id=guild_id,
+                day=ms_to_day(now_ms()),
+                category=category,
+                urgency=urgency,
+                **counters
+            )
+        except Exception as e:
+            print(f"Erro ao atualizar relatório diário: {e}")
+    
     async def _get_next_ticket_number(self, guild_id: int) -> int:
-        """Obtém o próximo número de ticket disponível"""
-        # Implementação simples - pode ser melhorada
-        import random
-        return random.randint(1, 9999)
+        """Obtém o próximo número de ticket do servidor (sequencial)"""
+        return await self.db.next_ticket_number(guild_id)
     
     async def send_ticket_message(self, channel: discord.TextChannel, user: discord.User,
                                  category: str, reason: str, description: str, urgency: str):
@@ -97,48 +131,106 @@ class TicketManager:
             f"**Aguarde o atendimento de um membro da equipe.**"
         )
         
-        await channel.send(content=welcome_msg)
-        await channel.send(embed=embed, view=view)
+        # Informa o tempo de resposta esperado da categoria (SLA)
+        ticket_category = (await self.bot.category_registry.get(channel.guild.id)).get(category)
+        if ticket_category and ticket_category.sla_minutes:
+            welcome_msg += f"\n⏱️ Tempo de resposta esperado: **{ticket_category.sla_minutes} minutos**."
+        
+        with REST_SECONDS.time("send_message"):
+            await channel.send(content=welcome_msg)
+        with REST_SECONDS.time("send_message"):
+            await channel.send(embed=embed, view=view)
     
     async def generate_transcript(self, channel: discord.TextChannel) -> io.BytesIO:
-        """Gera uma transcrição do canal em formato TXT"""
+        """Gera uma transcrição do canal em formato TXT.
+        
+        Cada mensagem é escrita no arquivo assim que chega, sem acumular o
+        histórico nem a transcrição inteira em memória.
+        """
+        
+        transcript_file = io.BytesIO()
+        writer = io.TextIOWrapper(transcript_file, encoding='utf-8', newline='\n')
+        
+        writer.write(f"Transcrição do Ticket: {channel.name}\n")
+        writer.write(f"Canal ID: {channel.id}\n")
+        writer.write(f"Criado em: {channel.created_at.strftime('%d/%m/%Y %H:%M:%S')} UTC\n")
+        writer.write("=" * 80 + "\n\n")
+        
+        # As mensagens recentes vêm do cache do ticket; a API só é consultada
+        # para as mensagens anteriores a ele (ou para todas, sem cache)
+        cached, complete = self.bot.message_store.snapshot(channel.id)
+        
+        if not complete:
+            before = discord.Object(id=cached[0].id) if cached else None
+            with REST_SECONDS.time("history"):
+                async for message in channel.history(limit=None, before=before, oldest_first=True):
+                    writer.write(self._format_transcript_message(CachedMessage.from_message(message)))
+        for msg in cached:
+            writer.write(self._format_transcript_message(msg))
+        
+        writer.write("=" * 80 + "\n")
+        writer.write(f"Fim da transcrição - {datetime.utcnow().strftime('%d/%m/%Y %H:%M:%S')} UTC\n")
+        
+        # Solta o BytesIO sem fechá-lo junto com o writer
+        writer.flush()
+        writer.detach()
+        transcript_file.seek(0)
         
-        transcript = f"Transcrição do Ticket: {channel.name}\n"
-        transcript += f"Canal ID: {channel.id}\n"
-        transcript += f"Criado em: {channel.created_at.strftime('%d/%m/%Y %H:%M:%S')} UTC\n"
-        transcript += "=" * 80 + "\n\n"
+        return transcript_file
+    
+    @staticmethod
+    def _format_transcript_message(msg: CachedMessage) -> str:
+        """Bloco de uma mensagem na transcrição"""
+        lines = [f"[{msg.created_at.strftime('%d/%m/%Y %H:%M:%S')}] {msg.author}:"]
         
-        # Obtém todas as mensagens do canal
-        messages = []
-        async for message in channel.history(limit=None, oldest_first=True):
-            messages.append(message)
+        if msg.content:
+            lines.append(msg.content)
         
-        for msg in messages:
-            timestamp = msg.created_at.strftime("%d/%m/%Y %H:%M:%S")
-            author = f"{msg.author.name}#{msg.author.discriminator}"
-            
-            transcript += f"[{timestamp}] {author}:\n"
-            
-            if msg.content:
-                transcript += f"{msg.content}\n"
-            
-            if msg.embeds:
-                transcript += "[Embed anexado]\n"
-            
-            if msg.attachments:
-                for attachment in msg.attachments:
-                    transcript += f"[Anexo: {attachment.filename}]\n"
-            
-            transcript += "\n"
+        if msg.has_embeds:
+            lines.append("[Embed anexado]")
         
-        transcript += "=" * 80 + "\n"
-        transcript += f"Fim da transcrição - {datetime.utcnow().strftime('%d/%m/%Y %H:%M:%S')} UTC\n"
+        for filename in msg.attachments:
+            lines.append(f"[Anexo: {filename}]")
         
-        # Converte para BytesIO
-        transcript_file = io.BytesIO(transcript.encode('utf-8'))
-        transcript_file.seek(0)
+        lines.append("\n")
+        return "\n".join(lines)
+    
+    async def claim_ticket(self, channel: discord.TextChannel, staff: discord.Member, ticket_data: Ticket):
+        """Marca um ticket como assumido por um staff"""
         
-        return transcript_file
+        # Apenas o primeiro claim conta como primeira resposta
+        first_claim = not await self.db.has_log(ticket_data.ticket_id, "claimed")
+        
+        await self.db.claim_ticket(channel.id, staff.id)
+        
+        # Adiciona log
+        await self.db.add_log(
+            ticket_id=ticket_data.ticket_id,
+            user_id=staff.id,
+            action="claimed",
+            details=f"Assumido por {staff.name}"
+        )
+        
+        first_response = None
+        if first_claim:
+            first_response = elapsed_seconds(ticket_data.created_at)
+            self.bot.analytics.record_first_response(ticket_data, staff.id)
+        
+        await self._record_rollup(
+            ticket_data.guild_id, ticket_data.category, ticket_data.urgency,
+            staff_id=staff.id, claimed=1, first_response=first_response
+        )
+    
+    async def record_close(self, ticket_data: Ticket, closer_id: Optional[int]):
+        """Contabiliza um ticket que acabou de ser fechado no banco (estado em memória, SLA e agregado diário)"""
+        self.bot.activity_tracker.untrack(ticket_data.channel_id)
+        self.bot.ticket_stats.forget(ticket_data.guild_id, ticket_data.ticket_id)
+        self.bot.analytics.record_close(ticket_data, closer_id)
+        await self._record_rollup(
+            ticket_data.guild_id, ticket_data.category, ticket_data.urgency,
+            staff_id=ticket_data.claimed_by or closer_id, closed=1,
+            resolution=elapsed_seconds(ticket_data.created_at)
+        )
     
     async def close_ticket(self, channel: discord.TextChannel, closer: discord.Member, 
                           reason: Optional[str] = None):
@@ -149,28 +241,38 @@ class TicketManager:
         if not ticket_data:
             return False
         
-        # Atualiza no banco de dados
-        await self.db.close_ticket(channel.id, reason)
+        # O botão de fechar continua na mensagem: um ticket já fechado não pode
+        # ser contado de novo nas métricas de SLA nem gerar outro log
+        if ticket_data.status != "open":
+            return False
+        
+        # Atualiza no banco de dados; se outro fechamento simultâneo chegou antes,
+        # os rollups diários (e as métricas) já contaram este ticket
+        if not await self.db.close_ticket(channel.id, reason):
+            return False
+        await self.record_close(ticket_data, closer.id)
         
         # Adiciona log
         await self.db.add_log(
-            ticket_id=ticket_data['ticket_id'],
+            ticket_id=ticket_data.ticket_id,
             user_id=closer.id,
             action="closed",
             details=reason
         )
         
         # Move para categoria de fechados (se configurado)
-        config = await self.db.get_guild_config(channel.guild.id)
-        if config and config.get("closed_category_id"):
-            closed_category = channel.guild.get_channel(config["closed_category_id"])
+        config = await self.bot.guild_configs.get(channel.guild.id)
+        if config and config.closed_category_id:
+            closed_category = channel.guild.get_channel(config.closed_category_id)
             if closed_category:
-                await channel.edit(category=closed_category)
+                with REST_SECONDS.time("edit_channel"):
+                    await channel.edit(category=closed_category)
         
         # Atualiza permissões (remove acesso do usuário)
-        user = channel.guild.get_member(ticket_data['user_id'])
+        user = await self.bot.members.resolve(channel.guild, ticket_data.user_id)
         if user:
-            await channel.set_permissions(user, view_channel=False)
+            with REST_SECONDS.time("set_permissions"):
+                await channel.set_permissions(user, view_channel=False)
         
         # Envia mensagem de fechamento
         embed = self.embed_builder.create_info_embed(
@@ -182,7 +284,8 @@ class TicketManager:
             )
         )
         
-        await channel.send(embed=embed)
+        with REST_SECONDS.time("send_message"):
+            await channel.send(embed=embed)
         
         return True
     
@@ -197,37 +300,35 @@ class TicketManager:
         # Gera transcrição
         transcript = await self.generate_transcript(channel)
         
-        # Envia para canal de logs
-        config = await self.db.get_guild_config(channel.guild.id)
-        if config and config.get("log_channel_id"):
-            log_channel = channel.guild.get_channel(config["log_channel_id"])
-            if log_channel:
-                user = channel.guild.get_member(ticket_data['user_id'])
-                
-                embed = self.embed_builder.create_log_embed(
-                    action="deleted",
-                    ticket_data=ticket_data,
-                    user=user or deleter,
-                    reason=ticket_data.get('close_reason')
-                )
-                
-                file = discord.File(
-                    transcript,
-                    filename=f"transcript-{channel.name}.txt"
-                )
-                
-                await log_channel.send(embed=embed, file=file)
+        # Envia para canal de logs (pela fila de logs, que agrupa e tenta de novo)
+        user = await self.bot.members.resolve(channel.guild, ticket_data.user_id)
+        embed = self.embed_builder.create_log_embed(
+            action="deleted",
+            ticket_data=ticket_data,
+            user=user or deleter,
+            reason=ticket_data.close_reason
+        )
+        await self.bot.log_outbox.send(
+            channel.guild,
+            embed,
+            filename=f"transcript-{channel.name}.txt",
+            data=transcript.getvalue()
+        )
         
         # Adiciona log
         await self.db.add_log(
-            ticket_id=ticket_data['ticket_id'],
+            ticket_id=ticket_data.ticket_id,
             user_id=deleter.id,
             action="deleted",
             details="Canal deletado"
         )
         
         # Deleta o canal
-        await channel.delete(reason=f"Ticket deletado por {deleter.name}")
+        self.bot.activity_tracker.untrack(channel.id)
+        self.bot.ticket_stats.forget(ticket_data.guild_id, ticket_data.ticket_id)
+        self.bot.message_store.drop(channel.id)
+        with REST_SECONDS.time("delete_channel"):
+            await channel.delete(reason=f"Ticket deletado por {deleter.name}")
         
         return True
 
@@ -243,6 +344,7 @@ class TicketControlView(discord.ui.View):
         self.permission_manager = permission_manager
     
     @discord.ui.button(label="Claim", style=discord.ButtonStyle.primary, emoji="✋", custom_id="ticket_claim")
+    @instrument("button", "ticket_claim")
     async def claim_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Botão para staff assumir o ticket"""
         
@@ -264,8 +366,8 @@ class TicketControlView(discord.ui.View):
             return
         
         # Verifica se já está claimed
-        if ticket_data['claimed_by']:
-            claimer = interaction.guild.get_member(ticket_data['claimed_by'])
+        if ticket_data.claimed_by:
+            claimer = await self.bot.members.resolve(interaction.guild, ticket_data.claimed_by)
             await interaction.response.send_message(
                 embed=self.embed_builder.create_error_embed(
                     "Ticket já Assumido",
@@ -276,24 +378,16 @@ class TicketControlView(discord.ui.View):
             return
         
         # Marca como claimed
-        await self.db.claim_ticket(interaction.channel.id, interaction.user.id)
-        
-        # Adiciona log
-        await self.db.add_log(
-            ticket_id=ticket_data['ticket_id'],
-            user_id=interaction.user.id,
-            action="claimed",
-            details=f"Assumido por {interaction.user.name}"
-        )
+        await self.bot.ticket_manager.claim_ticket(interaction.channel, interaction.user, ticket_data)
         
         # Atualiza o embed
-        user = interaction.guild.get_member(ticket_data['user_id'])
+        user = await self.bot.members.resolve(interaction.guild, ticket_data.user_id)
         embed = self.embed_builder.create_ticket_embed(
             user=user,
-            category=ticket_data['category'],
-            reason=ticket_data['reason'],
-            description=ticket_data['description'],
-            urgency=ticket_data['urgency'],
+            category=ticket_data.category,
+            reason=ticket_data.reason,
+            description=ticket_data.description,
+            urgency=ticket_data.urgency,
             claimed_by=interaction.user
         )
         
@@ -313,6 +407,7 @@ class TicketControlView(discord.ui.View):
     
     @discord.ui.button(label="Disclaim", style=discord.ButtonStyle.secondary, emoji="↩️", 
                       custom_id="ticket_disclaim", disabled=True)
+    @instrument("button", "ticket_disclaim")
     async def disclaim_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Botão para staff liberar o ticket"""
         
@@ -334,7 +429,7 @@ class TicketControlView(discord.ui.View):
             return
         
         # Verifica se o ticket está claimed
-        if not ticket_data['claimed_by']:
+        if not ticket_data.claimed_by:
             await interaction.response.send_message(
                 embed=self.embed_builder.create_error_embed(
                     "Ticket Não Assumido",
@@ -345,8 +440,8 @@ class TicketControlView(discord.ui.View):
             return
         
         # **VERIFICAÇÃO DE AUTORIZAÇÃO DE DESCLAIM**
-        if ticket_data['claimed_by'] != interaction.user.id:
-            claimer = interaction.guild.get_member(ticket_data['claimed_by'])
+        if ticket_data.claimed_by != interaction.user.id:
+            claimer = await self.bot.members.resolve(interaction.guild, ticket_data.claimed_by)
             claimer_mention = claimer.mention if claimer else "Staff Desconhecido"
             await interaction.response.send_message(
                 embed=self.embed_builder.create_error_embed(
@@ -362,20 +457,20 @@ class TicketControlView(discord.ui.View):
         
         # Adiciona log
         await self.db.add_log(
-            ticket_id=ticket_data['ticket_id'],
+            ticket_id=ticket_data.ticket_id,
             user_id=interaction.user.id,
             action="disclaimed",
             details=f"Liberado por {interaction.user.name}"
         )
         
         # Atualiza o embed
-        user = interaction.guild.get_member(ticket_data['user_id'])
+        user = await self.bot.members.resolve(interaction.guild, ticket_data.user_id)
         embed = self.embed_builder.create_ticket_embed(
             user=user,
-            category=ticket_data['category'],
-            reason=ticket_data['reason'],
-            description=ticket_data['description'],
-            urgency=ticket_data['urgency']
+            category=ticket_data.category,
+            reason=ticket_data.reason,
+            description=ticket_data.description,
+            urgency=ticket_data.urgency
         )
         
         # Reativa botão de claim
@@ -393,6 +488,7 @@ class TicketControlView(discord.ui.View):
         )
     
     @discord.ui.button(label="Fechar", style=discord.ButtonStyle.danger, emoji="🔒", custom_id="ticket_close")
+    @instrument("button", "ticket_close")
     async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Botão para fechar o ticket"""
         
@@ -412,6 +508,7 @@ class TicketControlView(discord.ui.View):
         await interaction.response.send_modal(modal)
     
     @discord.ui.button(label="Deletar", style=discord.ButtonStyle.danger, emoji="🗑️", custom_id="ticket_delete")
+    @instrument("button", "ticket_delete")
     async def delete_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Botão para deletar o ticket"""
         
@@ -460,6 +557,7 @@ class CloseTicketModal(discord.ui.Modal, title="Fechar Ticket"):
         self.embed_builder = embed_builder
         self.permission_manager = permission_manager
     
+    @instrument("modal", "ticket_close")
     async def on_submit(self, interaction: discord.Interaction):
         from utils.ticket_manager import TicketManager
         
@@ -483,7 +581,7 @@ class CloseTicketModal(discord.ui.Modal, title="Fechar Ticket"):
             await interaction.response.send_message(
                 embed=self.embed_builder.create_error_embed(
                     "Erro",
-                    "Não foi possível fechar o ticket."
+                    "Não foi possível fechar o ticket (ele já foi fechado ou não existe)."
                 ),
                 ephemeral=True
             )
@@ -500,6 +598,7 @@ class ConfirmDeleteView(discord.ui.View):
         self.permission_manager = permission_manager
     
     @discord.ui.button(label="Confirmar", style=discord.ButtonStyle.danger, emoji="✅")
+    @instrument("button", "ticket_delete_confirm")
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         from utils.ticket_manager import TicketManager
         
@@ -516,6 +615,7 @@ class ConfirmDeleteView(discord.ui.View):
         await ticket_manager.delete_ticket(interaction.channel, interaction.user)
     
     @discord.ui.button(label="Cancelar", style=discord.ButtonStyle.secondary, emoji="❌")
+    @instrument("button", "ticket_delete_cancel")
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_message(
             embed=self.embed_builder.create_info_embed(
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional, Set
+
+from utils.timeutils import now_ms
+
+class PendingStats:
+    """Contadores acumulados de um ticket desde o último flush"""
+    
+    __slots__ = ("ticket_id", "guild_id", "messages", "characters", "first_staff_response_at",
+                 "last_message_at", "participants")
+    
+    def __init__(self, ticket_id: int, guild_id: int):
+        self.ticket_id = ticket_id
+        self.guild_id = guild_id
+        self.messages = 0
+        self.characters = 0
+        self.first_staff_response_at: Optional[int] = None
+        self.last_message_at: Optional[int] = None
+        # user_id -> [mensagens, caracteres]
+        self.participants: Dict[int, list] = {}
+
+
+class TicketStatsCollector:
+    """Contadores de mensagens por ticket mantidos em memória.
+    
+    Substitui o antigo registro de uma linha em `ticket_logs` por mensagem:
+    as mensagens são somadas por ticket e participante e gravadas em lote
+    nas tabelas `ticket_stats` e `ticket_participants`.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._pending: Dict[int, PendingStats] = {}
+        # guild_id -> tickets abertos que já tiveram resposta da equipe
+        self._responded: Dict[int, Set[int]] = {}
+    
+    @staticmethod
+    def now() -> int:
+        """Timestamp atual em milissegundos"""
+        return now_ms()
+    
+    def has_staff_response(self, guild_id: int, ticket_id: int) -> bool:
+        """Indica se o ticket já recebeu a primeira resposta da equipe"""
+        return ticket_id in self._responded.get(guild_id, ())
+    
+    def record_message(self, ticket_id: int, guild_id: int, user_id: int, characters: int,
+                       staff_response: bool = False, timestamp: Optional[int] = None):
+        """Contabiliza uma mensagem enviada em um ticket"""
+        timestamp = timestamp if timestamp is not None else self.now()
+        
+        stats = self._pending.get(ticket_id)
+        if stats is None:
+            stats = self._pending[ticket_id] = PendingStats(ticket_id, guild_id)
+        
+        stats.messages += 1
+        stats.characters += characters
+        stats.last_message_at = timestamp
+        
+        counters = stats.participants.get(user_id)
+        if counters is None:
+            stats.participants[user_id] = [1, characters]
+        else:
+            counters[0] += 1
+            counters[1] += characters
+        
+        if staff_response and not self.has_staff_response(guild_id, ticket_id):
+            stats.first_staff_response_at = timestamp
+            self._responded.setdefault(guild_id, set()).add(ticket_id)
+    
+    def forget(self, guild_id: int, ticket_id: int):
+        """Libera o estado em memória de um ticket encerrado"""
+        responded = self._responded.get(guild_id)
+        if responded is not None:
+            responded.discard(ticket_id)
+            if not responded:
+                del self._responded[guild_id]
+    
+    def guild_ids(self) -> List[int]:
+        """Servidores com estado em memória"""
+        return list(self._responded)
+    
+    def evict_guild(self, guild_id: int):
+        """Descarta da memória o estado de um servidor (chame flush antes)"""
+        self._responded.pop(guild_id, None)
+        for ticket_id in [ticket_id for ticket_id, stats in self._pending.items() if stats.guild_id == guild_id]:
+            del self._pending[ticket_id]
+    
+    async def load(self, guild_id: Optional[int] = None):
+        """Carrega quais tickets abertos (de todos os servidores ou de um só) já tiveram resposta"""
+        rows = await self.db.get_open_tickets_with_staff_response(guild_id)
+        
+        if guild_id is None:
+            self._responded = {}
+        else:
+            self._responded.pop(guild_id, None)
+        
+        for row_guild_id, ticket_id in rows:
+            self._responded.setdefault(row_guild_id, set()).add(ticket_id)
+    
+    async def flush(self):
+        """Grava os contadores acumulados no banco de dados"""
+        if not self._pending:
+            return
+        
+        pending, self._pending = self._pending, {}
+        
+        try:
+            await self.db.save_ticket_stats(list(pending.values()))
+        except Exception:
+            # Devolve os contadores para a próxima tentativa
+            for ticket_id, stats in pending.items():
+                self._merge(stats)
+            raise
+    
+    def _merge(self, stats: PendingStats):
+        """Soma contadores não gravados aos acumulados atuais"""
+        current = self._pending.get(stats.ticket_id)
+        if current is None:
+            self._pending[stats.ticket_id] = stats
+            return
+        
+        current.messages += stats.messages
+        current.characters += stats.characters
+        current.first_staff_response_at = stats.first_staff_response_at or current.first_staff_response_at
+        current.last_message_at = max(current.last_message_at or 0, stats.last_message_at or 0) or None
+        
+        for user_id, (messages, characters) in stats.participants.items():
+            counters = current.participants.setdefault(user_id, [0, 0])
+            counters[0] += messages
+            counters[1] += characters
@@ -0,0 +1,41 @@
+import time
+from datetime import date, datetime, timezone
+from typing import Optional
+
+HOUR_MS = 60 * 60 * 1000
+
+def now_ms() -> int:
+    """Timestamp atual em milissegundos desde a época Unix (UTC)"""
+    return int(time.time() * 1000)
+
+
+def to_ms(value: datetime) -> int:
+    """Converte um datetime em milissegundos (datetimes sem fuso são tratados como UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def from_ms(value: Optional[int]) -> Optional[datetime]:
+    """Converte milissegundos em um datetime UTC"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def day_to_ms(value: date) -> int:
+    """Milissegundos do início (00:00 UTC) de um dia"""
+    return to_ms(datetime(value.year, value.month, value.day))
+
+
+def ms_to_day(value: int) -> str:
+    """Dia (AAAA-MM-DD, UTC) de um timestamp em milissegundos"""
+    return from_ms(value).date().isoformat()
+
+
+def elapsed_seconds(start_ms: Optional[int], end_ms: Optional[int] = None) -> Optional[float]:
+    """Segundos entre dois timestamps em milissegundos (fim padrão: agora)"""
+    if start_ms is None:
+        return None
+    end_ms = end_ms if end_ms is not None else now_ms()
+    return (end_ms - start_ms) / 1000
@@ -0,0 +1,168 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import discord
+
+# Versão do formato dos arquivos de trace
+TRACE_VERSION = 1
+
+class TraceRecorder:
+    """Grava interações e mensagens de tickets para serem reproduzidas depois.
+    
+    Desativado até `start()`. Nenhum conteúdo é gravado: os IDs do Discord
+    viram números sequenciais (o mesmo ID sempre recebe o mesmo número dentro
+    de uma gravação) e das mensagens só ficam o tamanho e a quantidade de
+    anexos e embeds. Os eventos são acumulados em memória e gravados a cada
+    `flush_interval` segundos em JSON Lines comprimido com gzip.
+    
+    Formato de cada linha (chaves curtas para manter o arquivo pequeno):
+        {"e": "start", "v": 1, "at": <epoch em segundos>}
+        {"e": "h", "t": <ms>, "k": <tipo>, "n": <handler>, "g": .., "c": .., "u": .., "v": [..]}
+        {"e": "m", "t": <ms>, "g": .., "c": .., "u": .., "o": <dono do ticket>, "b": 0|1, "l": .., "a": .., "m": ..}
+    """
+    
+    def __init__(self, flush_interval: float = 10.0):
+        self.flush_interval = flush_interval
+        self.path: Optional[str] = None
+        self.events = 0
+        self._started = 0.0
+        self._aliases: Dict[int, int] = {}
+        self._buffer: List[str] = []
+        self._flusher: Optional[asyncio.Task] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+    
+    def start(self, path: str):
+        """Começa a gravar em `path` (acrescentando uma nova sessão se o arquivo existir)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.events = 0
+        self._started = time.monotonic()
+        self._aliases.clear()
+        self._emit({"e": "start", "v": TRACE_VERSION, "at": int(time.time())})
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_periodically())
+    
+    async def stop(self):
+        """Para a gravação e grava os eventos pendentes"""
+        if not self.enabled:
+            return
+        
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        self.path = None
+    
+    def _alias(self, snowflake: Optional[int]) -> Optional[int]:
+        if snowflake is None:
+            return None
+        alias = self._aliases.get(snowflake)
+        if alias is None:
+            alias = self._aliases[snowflake] = len(self._aliases) + 1
+        return alias
+    
+    def _elapsed_ms(self) -> int:
+        return int((time.monotonic() - self._started) * 1000)
+    
+    def _emit(self, event: dict):
+        self._buffer.append(json.dumps(event, separators=(",", ":")))
+        self.events += 1
+    
+    def record_handler(self, kind: str, name: str, interaction: discord.Interaction):
+        """Registra a execução de um slash command, botão, select ou modal"""
+        if not self.enabled or interaction is None:
+            return
+        
+        event = {
+            "e": "h",
+            "t": self._elapsed_ms(),
+            "k": kind,
+            "n": name,
+            "g": self._alias(interaction.guild_id),
+            "c": self._alias(interaction.channel_id),
+            "u": self._alias(interaction.user.id),
+        }
+        # As opções dos selects são chaves de categoria, não dados do usuário
+        values = (getattr(interaction, "data", None) or {}).get("values")
+        if kind == "select" and values:
+            event["v"] = list(values)
+        self._emit(event)
+    
+    def record_message(self, message: discord.Message, owner_id: Optional[int] = None):
+        """Registra uma mensagem enviada em um canal de ticket"""
+        if not self.enabled:
+            return
+        
+        self._emit({
+            "e": "m",
+            "t": self._elapsed_ms(),
+            "g": self._alias(message.guild.id),
+            "c": self._alias(message.channel.id),
+            "u": self._alias(message.author.id),
+            "o": self._alias(owner_id),
+            "b": int(message.author.bot),
+            "l": len(message.content),
+            "a": len(message.attachments),
+            "m": len(message.embeds),
+        })
+    
+    async def flush(self):
+        """Grava no arquivo os eventos acumulados"""
+        if not self._buffer or not self.path:
+            return
+        
+        lines, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write, self.path, lines)
+        except OSError as e:
+            print(f"Erro ao gravar o trace em {self.path}: {e}")
+    
+    @staticmethod
+    def _write(path: str, lines: List[str]):
+        # Cada gravação acrescenta um membro gzip; o arquivo continua legível como um só
+        with gzip.open(path, "at", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+    
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+def read_trace(path: str, source: int = 0) -> List[dict]:
+    """Lê os eventos de um arquivo de trace, com os tempos de todas as sessões em sequência.
+    
+    Os IDs anônimos só valem dentro da sessão (e do arquivo) em que foram
+    gravados, então viram tuplas `(source, sessão, id)`.
+    """
+    events = []
+    session = offset = last = 0
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["e"] == "start":
+                # Nova sessão (bot reiniciado): continua a partir do último evento
+                session += 1
+                offset = last
+                continue
+            event["t"] += offset
+            for key in ("g", "c", "u", "o"):
+                if event.get(key) is not None:
+                    event[key] = (source, session, event[key])
+            last = event["t"]
+            events.append(event)
+    return events
+
+
+TRACES = TraceRecorder()
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import discord
+
+from utils.metrics import REGISTRY
+
+# Prazo do Discord para responder (ou adiar) uma interação
+ACK_WINDOW = 3.0
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "ticketbot_loop_lag_seconds",
+    "Atraso do event loop medido pelo watchdog",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_STALLS = REGISTRY.counter(
+    "ticketbot_loop_stalls_total",
+    "Vezes em que o event loop ficou bloqueado além do limite"
+)
+LATE_INTERACTIONS = REGISTRY.counter(
+    "ticketbot_late_interactions_total",
+    "Interações não respondidas dentro do prazo de 3 segundos do Discord",
+    ("type",)
+)
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+def _format_loop_stack(frame) -> str:
+    """Formata a pilha a partir do callback em execução, sem os frames internos do asyncio"""
+    frames = traceback.extract_stack(frame)
+    start = 0
+    for index, summary in enumerate(frames):
+        if summary.filename.startswith(_ASYNCIO_DIR):
+            start = index + 1
+    return "".join(traceback.format_list(frames[start:] or frames))
+
+
+class StallSnapshot:
+    """Pilha da thread do event loop capturada durante um bloqueio"""
+    
+    __slots__ = ("captured_at", "blocked_for", "duration", "stack")
+    
+    def __init__(self, captured_at: float, blocked_for: float, stack: str):
+        self.captured_at = captured_at
+        # Tempo bloqueado quando a pilha foi capturada
+        self.blocked_for = blocked_for
+        # Duração total do bloqueio (preenchida quando o loop volta a rodar)
+        self.duration: Optional[float] = None
+        self.stack = stack
+
+
+class LoopWatchdog:
+    """Mede continuamente o atraso do event loop e registra bloqueios.
+    
+    Uma tarefa no loop marca batimentos a cada `interval` segundos e mede o
+    quanto cada um atrasou. Uma thread separada observa esses batimentos e,
+    se o loop ficar parado por mais de `stall_threshold`, captura a pilha da
+    thread do loop, mostrando qual código (ou corrotina) o está bloqueando.
+    """
+    
+    def __init__(self, interval: float = 0.25, stall_threshold: float = 0.5, max_snapshots: int = 20):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.snapshots: Deque[StallSnapshot] = deque(maxlen=max_snapshots)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        # Interações sem resposta no prazo, por tipo
+        self.late_interactions: Dict[str, int] = {}
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._current_stall: Optional[StallSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    @property
+    def stalls(self) -> int:
+        return int(LOOP_STALLS.get())
+    
+    def start(self):
+        """Inicia o watchdog; deve ser chamado de dentro do event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Para a tarefa e a thread de monitoramento"""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+    
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - expected, 0.0)
+            
+            LOOP_LAG_SECONDS.observe(lag)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._last_beat = time.monotonic()
+            
+            stall = self._current_stall
+            if stall is not None:
+                stall.duration = lag
+                self._current_stall = None
+                print(f"Event loop voltou a responder após {lag * 1000:.0f} ms bloqueado.")
+    
+    def _monitor(self):
+        """Executado na thread do watchdog"""
+        while not self._stop.wait(self.interval):
+            blocked = time.monotonic() - self._last_beat - self.interval
+            if blocked < self.stall_threshold or self._current_stall is not None:
+                continue
+            
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = _format_loop_stack(frame) if frame else "(pilha indisponível)\n"
+            
+            snapshot = StallSnapshot(time.time(), blocked, stack)
+            self._current_stall = snapshot
+            self.snapshots.append(snapshot)
+            LOOP_STALLS.inc()
+            
+            print(f"Event loop bloqueado há {blocked * 1000:.0f} ms. Pilha atual:\n{stack}")
+    
+    def track_interaction(self, interaction: discord.Interaction):
+        """Verifica, ao fim do prazo de 3 segundos, se a interação foi respondida"""
+        if self._loop is None:
+            return
+        
+        age = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        remaining = ACK_WINDOW - age
+        if remaining <= 0:
+            # Já chegou atrasada (loop bloqueado ou fila de eventos longa)
+            self._count_late(interaction)
+            return
+        
+        self._loop.call_later(remaining, self._check_acknowledged, interaction)
+    
+    def _check_acknowledged(self, interaction: discord.Interaction):
+        if not interaction.response.is_done():
+            self._count_late(interaction)
+    
+    def _count_late(self, interaction: discord.Interaction):
+        kind = interaction.type.name
+        self.late_interactions[kind] = self.late_interactions.get(kind, 0) + 1
+        LATE_INTERACTIONS.inc(kind)
+    
+    def recent_snapshots(self) -> List[StallSnapshot]:
+        """Cópia dos bloqueios mais recentes (o mais novo por último)"""
+        return list(self.snapshots)